@@ -1,7 +1,18 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class NewsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'news'
     verbose_name = 'Новости'
+
+    def ready(self):
+        from yanews import auth  # noqa: F401
+
+        from . import signals  # noqa: F401
+
+        if settings.TEMPLATE_WARMUP:
+            from yanews.template_cache import warm_templates
+
+            warm_templates()
@@ -0,0 +1,21 @@
+import base64
+
+
+class CursorConverter:
+    """Курсор пагинации: пара (значение, pk) в url-safe base64."""
+
+    regex = '[-_A-Za-z0-9]+'
+
+    def to_python(self, value):
+        padding = '=' * (-len(value) % 4)
+        try:
+            decoded = base64.urlsafe_b64decode(value + padding).decode()
+            raw_value, pk = decoded.rsplit('|', 1)
+            return raw_value, int(pk)
+        except ValueError:
+            raise ValueError('Некорректный курсор.')
+
+    def to_url(self, value):
+        raw_value, pk = value
+        encoded = base64.urlsafe_b64encode(f'{raw_value}|{pk}'.encode())
+        return encoded.decode().rstrip('=')
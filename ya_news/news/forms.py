@@ -1,13 +1,11 @@
+from django import forms
 from django.core.exceptions import ValidationError
 from django.forms import ModelForm
 
 from .models import Comment
+from .moderation import bad_words
+from .transfer import FEED_FORMATS
 
-BAD_WORDS = (
-    'редиска',
-    'негодяй',
-    # Дополните список на своё усмотрение.
-)
 WARNING = 'Не ругайтесь!'
 
 
@@ -20,8 +18,16 @@ class CommentForm(ModelForm):
     def clean_text(self):
         """Не позволяем ругаться в комментариях."""
         text = self.cleaned_data['text']
-        lowered_text = text.lower()
-        for word in BAD_WORDS:
-            if word in lowered_text:
-                raise ValidationError(WARNING)
+        if bad_words.get_matcher().find(text):
+            raise ValidationError(WARNING)
         return text
+
+
+class NewsFeedForm(forms.Form):
+    """Загрузка ленты новостей из файла."""
+
+    file = forms.FileField(label='Файл')
+    format = forms.ChoiceField(
+        label='Формат',
+        choices=[(file_format, file_format) for file_format in FEED_FORMATS],
+    )
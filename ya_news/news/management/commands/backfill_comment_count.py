@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from news.models import News
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает News.comment_count по таблице комментариев.'
+
+    def handle(self, *args, **options):
+        updated = News.objects.sync_comment_count()
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано новостей: {updated}')
+        )
@@ -0,0 +1,54 @@
+import random
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+from news.moderation import BadWordsMatcher
+
+from .seed import random_words
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает поиск запрещённых слов циклом по списку '
+        'и автоматом Ахо — Корасик.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--terms', type=int, default=50_000)
+        parser.add_argument('--text-length', type=int, default=2_000)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        terms = random_words(rng, options['terms'], 5, 12)
+        words = random_words(rng, options['text_length'] // 6, 2, 10)
+        text = ' '.join(words)[:options['text_length']]
+
+        start = perf_counter()
+        matcher = BadWordsMatcher(terms)
+        build_time = perf_counter() - start
+
+        def loop():
+            lowered_text = text.lower()
+            return [term for term in terms if term in lowered_text]
+
+        loop_time = self.measure(loop, options['repeat'])
+        matcher_time = self.measure(
+            lambda: matcher.find(text), options['repeat']
+        )
+        self.stdout.write(
+            f'Слов: {len(terms)}, длина текста: {len(text)}\n'
+            f'Построение автомата: {build_time * 1000:.1f} мс\n'
+            f'Цикл по списку: {loop_time * 1000:.3f} мс на текст\n'
+            f'Автомат: {matcher_time * 1000:.3f} мс на текст\n'
+            f'Ускорение: {loop_time / matcher_time:.1f}x'
+        )
+
+    @staticmethod
+    def measure(func, repeat):
+        start = perf_counter()
+        for _ in range(repeat):
+            func()
+        return (perf_counter() - start) / repeat
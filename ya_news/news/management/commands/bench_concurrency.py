@@ -0,0 +1,83 @@
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.test import Client
+from django.urls import reverse
+from yanews.benchmark import (Task, format_concurrent, run_concurrent,
+                              run_concurrent_asgi)
+
+from news.models import Comment, News
+
+from .seed import USERNAME_PREFIX
+
+BENCH_TEXT = 'Комментарий нагрузочного замера'
+
+
+class Command(BaseCommand):
+    help = (
+        'Смешанная нагрузка на ленту и страницы новостей из многих потоков '
+        'через WSGI-приложение или из многих соединений через ASGI. '
+        'Сравнивает базы и профили настроек: запускайте с нужным '
+        'DJANGO_SETTINGS_MODULE на заполненной базе. Созданные '
+        'комментарии удаляются после прогона.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=50)
+        parser.add_argument('--duration', type=float, default=10)
+        parser.add_argument(
+            '--write-share', type=float, default=0.1,
+            help='Доля запросов, которые пишут комментарии.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--asgi', action='store_true',
+            help='Нагружать ASGI-приложение вместо WSGI.',
+        )
+
+    def handle(self, *args, **options):
+        news_ids = list(
+            News.objects.order_by('-date', '-pk')
+            .values_list('pk', flat=True)[:100]
+        )
+        comment = Comment.objects.filter(
+            author__username__startswith=USERNAME_PREFIX
+        ).select_related('author').first()
+        if comment is None:
+            raise CommandError('База пуста, сначала запустите seed.')
+        host = settings.ALLOWED_HOSTS[0]
+        client = Client(HTTP_HOST=host)
+        client.force_login(comment.author)
+        cookies = {
+            settings.SESSION_COOKIE_NAME:
+                client.cookies[settings.SESSION_COOKIE_NAME].value
+        }
+        detail_urls = [reverse('news:detail', args=(pk,)) for pk in news_ids]
+        reads = 1 - options['write_share']
+        tasks = [
+            Task('home', [reverse('news:home')], reads / 2, cookies=cookies),
+            Task('detail', detail_urls, reads / 2, cookies=cookies),
+            Task(
+                'detail POST', detail_urls, options['write_share'],
+                method='post', data={'text': BENCH_TEXT}, cookies=cookies,
+            ),
+        ]
+        if options['asgi']:
+            application, run = get_asgi_application(), run_concurrent_asgi
+        else:
+            application, run = get_wsgi_application(), run_concurrent
+        self.stdout.write(
+            f'{settings.DATABASES["default"]["ENGINE"]}, '
+            f'{"ASGI" if options["asgi"] else "WSGI"}, '
+            f'адреса: {settings.ROOT_URLCONF}, '
+            f'одновременно: {options["workers"]}'
+        )
+        try:
+            results = run(
+                application, tasks, options['workers'],
+                options['duration'], host, options['seed'],
+            )
+        finally:
+            Comment.objects.filter(text=BENCH_TEXT).delete()
+        self.stdout.write(format_concurrent(results))
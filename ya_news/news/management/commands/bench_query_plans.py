@@ -0,0 +1,103 @@
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from news.models import Comment, News
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает планы запросов главной страницы и страницы новости '
+        'без составных индексов и с ними. Данные и удаление индексов '
+        'откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--news', type=int, default=10_000)
+        parser.add_argument('--comments', type=int, default=1_000_000)
+        parser.add_argument('--batch-size', type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        # Схему SQLite меняют только без проверки внешних ключей, а
+        # внутри транзакции PRAGMA foreign_keys уже не действует.
+        connection.disable_constraint_checking()
+        try:
+            with transaction.atomic():
+                self.compare(options)
+                transaction.set_rollback(True)
+        finally:
+            connection.enable_constraint_checking()
+
+    def compare(self, options):
+        self.fill(options['news'], options['comments'], options['batch_size'])
+        news = News.objects.order_by('-comment_count').first()
+        author = User.objects.get(username='bench')
+        queries = {
+            'Главная': News.objects.order_by('-date', '-pk')[:10],
+            'Комментарии новости': (
+                Comment.objects.filter(
+                    news=news, status=Comment.Status.APPROVED
+                ).order_by('created', 'pk')[:50]
+            ),
+            'Комментарии автора': (
+                Comment.objects.filter(author=author).order_by('pk')[:50]
+            ),
+        }
+        indexes = [
+            (model, index)
+            for model in (News, Comment)
+            for index in model._meta.indexes
+        ]
+        with connection.schema_editor() as editor:
+            for model, index in indexes:
+                editor.remove_index(model, index)
+        try:
+            self.report('Без индексов', queries)
+        finally:
+            with connection.schema_editor() as editor:
+                for model, index in indexes:
+                    editor.add_index(model, index)
+        self.report('С индексами', queries)
+
+    def fill(self, news_count, comments_count, batch_size):
+        """Дозаполняет базу до нужного количества строк."""
+        author, _ = User.objects.get_or_create(username='bench')
+        existing = News.objects.count()
+        for start in range(existing, news_count, batch_size):
+            News.objects.bulk_create(
+                News(title=f'Новость {i}', text='Текст')
+                for i in range(start, min(start + batch_size, news_count))
+            )
+        news_ids = list(News.objects.values_list('pk', flat=True))
+        existing = Comment.objects.count()
+        for start in range(existing, comments_count, batch_size):
+            Comment.objects.bulk_create(
+                Comment(
+                    news_id=news_ids[i % len(news_ids)],
+                    author=author,
+                    text=f'Комментарий {i}',
+                    status=Comment.Status.APPROVED,
+                )
+                for i in range(start, min(start + batch_size, comments_count))
+            )
+        News.objects.sync_comment_count()
+
+    def best_time(self, queryset, repeat=5):
+        """Лучшее время выполнения запроса в миллисекундах."""
+        timings = []
+        for _ in range(repeat):
+            start = perf_counter()
+            list(queryset.all())
+            timings.append((perf_counter() - start) * 1000)
+        return min(timings)
+
+    def report(self, title, queries):
+        self.stdout.write(self.style.MIGRATE_HEADING(title))
+        for name, queryset in queries.items():
+            elapsed = self.best_time(queryset)
+            self.stdout.write(f'{name}: {elapsed:.2f} мс')
+            self.stdout.write(queryset.explain())
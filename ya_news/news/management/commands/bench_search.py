@@ -0,0 +1,58 @@
+import random
+from time import perf_counter
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from news.models import News
+from news.search import IcontainsBackend, SQLiteFTSBackend
+
+from .seed import Vocabulary
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает поиск по индексу FTS5 и через icontains. '
+        'Новости для замера создаются в транзакции и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--news', type=int, default=100_000)
+        parser.add_argument('--queries', type=int, default=20)
+        parser.add_argument('--batch-size', type=int, default=5_000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.compare(options)
+            transaction.set_rollback(True)
+
+    def compare(self, options):
+        rng = random.Random(options['seed'])
+        vocabulary = Vocabulary(rng, min_length=4)
+        self.fill(options['news'], options['batch_size'], vocabulary)
+        call_command('rebuild_search_index', stdout=self.stdout)
+        queries = rng.sample(vocabulary.words, options['queries'])
+        for backend in (IcontainsBackend(), SQLiteFTSBackend()):
+            start = perf_counter()
+            found = sum(
+                len(backend.search(query, limit=10)) for query in queries
+            )
+            elapsed = (perf_counter() - start) / len(queries) * 1000
+            self.stdout.write(
+                f'{type(backend).__name__}: {elapsed:.2f} мс на запрос, '
+                f'найдено {found}'
+            )
+
+    def fill(self, news_count, batch_size, vocabulary):
+        """Дозаполняет базу новостями из случайных слов."""
+        existing = News.objects.count()
+        for start in range(existing, news_count, batch_size):
+            News.objects.bulk_create(
+                News(
+                    title=vocabulary.text(3)[:50],
+                    text=vocabulary.text(60),
+                )
+                for _ in range(start, min(start + batch_size, news_count))
+            )
@@ -0,0 +1,154 @@
+import random
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client
+from django.urls import reverse
+from yanews.benchmark import (BenchmarkError, Scenario, format_results,
+                              load_results, run_scenario, save_results)
+
+from news.models import Comment, News
+from news.pagination import KeysetPaginator
+
+from .seed import zipf_weights
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Прогоняет все адреса news/urls.py через тестовый клиент: '
+        'p50/p99, запросы и пропускная способность. Сначала заполните '
+        'базу командой seed. Изменения откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=1)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--json', help='Куда сохранить результаты.')
+        parser.add_argument(
+            '--compare', help='Результаты прошлого прогона для сравнения.'
+        )
+
+    def handle(self, *args, **options):
+        if not News.objects.exists():
+            raise CommandError('База пуста, сначала запустите seed.')
+        self.rng = random.Random(options['seed'])
+        baseline = load_results(options['compare']) if options[
+            'compare'
+        ] else None
+        with transaction.atomic():
+            try:
+                results = [
+                    run_scenario(
+                        scenario, options['requests'], options['warmup']
+                    )
+                    for scenario in self.scenarios(options['requests'])
+                ]
+            except BenchmarkError as error:
+                raise CommandError(str(error)) from error
+            transaction.set_rollback(True)
+        self.stdout.write(format_results(results, baseline))
+        if options['json']:
+            save_results(options['json'], results)
+
+    def client(self, user=None):
+        client = Client(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+        if user is not None:
+            client.force_login(user)
+        return client
+
+    def popular_news(self, count):
+        """Адреса новостей: свежие открывают чаще, как на живом сайте."""
+        news_ids = list(
+            News.objects.order_by('-date', '-pk')
+            .values_list('pk', flat=True)[:1_000]
+        )
+        return [
+            reverse('news:detail', args=(pk,))
+            for pk in self.rng.choices(
+                news_ids, cum_weights=zipf_weights(len(news_ids)), k=count
+            )
+        ]
+
+    def list_pages(self, depth):
+        """Адреса страниц ленты со второй по depth."""
+        paginator = KeysetPaginator(
+            News.objects.all(), 'date', settings.NEWS_COUNT_ON_HOME_PAGE,
+            descending=True,
+        )
+        urls = []
+        cursor = paginator.page().next_cursor
+        while cursor is not None and len(urls) < depth:
+            urls.append(reverse('news:home_page', args=(cursor,)))
+            cursor = paginator.page(cursor).next_cursor
+        return urls
+
+    def comment_pages(self):
+        """Вторая страница комментариев самой обсуждаемой новости."""
+        news = News.objects.order_by('-comment_count').first()
+        cursor = KeysetPaginator(
+            news.comment_set.filter(status=Comment.Status.APPROVED),
+            'created',
+            settings.COMMENTS_COUNT_ON_DETAIL_PAGE,
+        ).page().next_cursor
+        if cursor is None:
+            return []
+        return [reverse('news:detail_page', args=(news.pk, cursor))]
+
+    def editor(self):
+        editor = User.objects.create(username='bench-editor')
+        editor.user_permissions.set(Permission.objects.filter(
+            content_type__app_label='news',
+            codename__in=('add_news', 'view_news'),
+        ))
+        return editor
+
+    def scenarios(self, requests):
+        anonymous = self.client()
+        comment = Comment.objects.filter(
+            status=Comment.Status.APPROVED
+        ).order_by('-pk').first()
+        author = self.client(comment.author)
+        editor = self.client(self.editor())
+        news_urls = self.popular_news(requests)
+        words = News.objects.order_by('-date').values_list(
+            'title', flat=True
+        )[:requests]
+        search_urls = [
+            f'{reverse("news:search")}?q={title.split()[0]}'
+            for title in words
+        ]
+        scenarios = [
+            Scenario('home (аноним)', [reverse('news:home')], anonymous),
+            Scenario('home (автор)', [reverse('news:home')], author),
+            Scenario('home_page', self.list_pages(5), author),
+            Scenario('detail (аноним)', news_urls, anonymous),
+            Scenario('detail (автор)', news_urls, author),
+            Scenario('detail_page', self.comment_pages(), author),
+            Scenario(
+                'detail POST', news_urls, author, method='post',
+                data={'text': 'Комментарий для замера'},
+            ),
+            Scenario(
+                'edit', [reverse('news:edit', args=(comment.pk,))], author
+            ),
+            Scenario(
+                'edit POST', [reverse('news:edit', args=(comment.pk,))],
+                author, method='post', data={'text': 'Исправленный текст'},
+            ),
+            Scenario(
+                'delete', [reverse('news:delete', args=(comment.pk,))],
+                author,
+            ),
+            Scenario('search', search_urls, anonymous),
+            Scenario('ingest', [reverse('news:ingest')], editor),
+            Scenario(
+                'archive', [reverse('news:archive')], editor, requests=1
+            ),
+        ]
+        return [scenario for scenario in scenarios if scenario.urls]
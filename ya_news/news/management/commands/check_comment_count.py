@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from news.models import News
+
+
+class Command(BaseCommand):
+    help = 'Проверяет, что News.comment_count совпадает с реальным числом.'
+
+    def handle(self, *args, **options):
+        broken = News.objects.with_wrong_comment_count().values_list(
+            'pk', 'comment_count', 'actual_comment_count'
+        )
+        errors = [
+            f'Новость {pk}: счётчик {stored}, комментариев {actual}'
+            for pk, stored, actual in broken
+        ]
+        if errors:
+            raise CommandError('\n'.join(errors))
+        self.stdout.write(
+            self.style.SUCCESS('Счётчики комментариев в порядке')
+        )
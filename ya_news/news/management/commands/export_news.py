@@ -0,0 +1,28 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from news.transfer import EXPORT_FORMATS, export_lines
+
+
+class Command(BaseCommand):
+    help = 'Выгружает архив новостей с комментариями.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format', choices=EXPORT_FORMATS, default='jsonl'
+        )
+        parser.add_argument(
+            '--output', help='Файл для выгрузки, по умолчанию stdout.'
+        )
+        parser.add_argument('--chunk-size', type=int, default=2_000)
+
+    def handle(self, *args, **options):
+        lines = export_lines(options['format'], options['chunk_size'])
+        if options['output'] is None:
+            sys.stdout.writelines(lines)
+            return
+        with open(
+            options['output'], 'w', encoding='utf-8', newline=''
+        ) as output:
+            output.writelines(lines)
@@ -0,0 +1,48 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from news.transfer import FEED_FORMATS, ingest_news
+
+EXTENSIONS = {'.csv': 'csv', '.xml': 'rss', '.rss': 'rss'}
+
+
+class Command(BaseCommand):
+    help = 'Загружает ленту новостей из JSON Lines, CSV или RSS.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=FEED_FORMATS)
+        parser.add_argument('--batch-size', type=int, default=1_000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or next(
+            (
+                file_format
+                for extension, file_format in EXTENSIONS.items()
+                if path.endswith(extension)
+            ),
+            'jsonl',
+        )
+        try:
+            if file_format == 'rss':
+                stream = open(path, 'rb')
+            else:
+                stream = open(path, encoding='utf-8-sig', newline='')
+            with stream:
+                result = ingest_news(
+                    stream, file_format, options['batch_size']
+                )
+        except (
+            OSError, SyntaxError, UnicodeDecodeError, csv.Error
+        ) as error:
+            raise CommandError(str(error)) from error
+        for error in result.errors:
+            self.stderr.write(error)
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано: {result.created}, обновлено: {result.updated}, '
+            f'без изменений: {result.unchanged}, '
+            f'пропущено: {result.skipped} '
+            f'за {result.seconds:.1f} с ({result.per_second:.0f} в секунду)'
+        ))
@@ -0,0 +1,37 @@
+from time import sleep
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from news.moderation import moderate_pending
+
+
+class Command(BaseCommand):
+    help = 'Обрабатывает очередь комментариев на модерацию.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.MODERATION_BATCH_SIZE
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=1.0,
+            help='Пауза в секундах, когда очередь пуста.',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Разобрать очередь и завершиться.',
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            processed = moderate_pending(options['batch_size'])
+            total += processed
+            if processed:
+                continue
+            if options['once']:
+                break
+            sleep(options['sleep'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Проверено комментариев: {total}')
+        )
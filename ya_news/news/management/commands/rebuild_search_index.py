@@ -0,0 +1,42 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from news.models import Comment, News
+from news.search import chunked, get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает поисковый индекс новостей и комментариев.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2_000)
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        backend = get_search_backend()
+        start = perf_counter()
+        with transaction.atomic():
+            backend.clear()
+            news_rows = News.objects.only(
+                'pk', 'title', 'text'
+            ).order_by('pk').iterator(chunk_size=chunk_size)
+            news_count = 0
+            for chunk in chunked(news_rows, chunk_size):
+                backend.index_news(chunk)
+                news_count += len(chunk)
+            comment_rows = Comment.objects.filter(
+                status=Comment.Status.APPROVED
+            ).only('pk', 'news_id', 'text').order_by('pk').iterator(
+                chunk_size=chunk_size
+            )
+            comments_count = 0
+            for chunk in chunked(comment_rows, chunk_size):
+                backend.index_comments(chunk)
+                comments_count += len(chunk)
+        self.stdout.write(self.style.SUCCESS(
+            f'Проиндексировано новостей: {news_count}, '
+            f'комментариев: {comments_count} '
+            f'за {perf_counter() - start:.1f} с'
+        ))
@@ -0,0 +1,170 @@
+import random
+from datetime import date, timedelta
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from news.models import Comment, News
+from news.page_cache import bump_data_version
+
+User = get_user_model()
+
+ALPHABET = 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
+# Доли статусов комментариев: большая часть уже прошла модерацию.
+STATUSES = (
+    (Comment.Status.APPROVED, 0.9),
+    (Comment.Status.PENDING, 0.07),
+    (Comment.Status.REJECTED, 0.03),
+)
+USERNAME_PREFIX = 'seed-'
+PASSWORD = 'seed-password'
+
+
+def zipf_weights(count):
+    """Накопленные веса: первые элементы выбираются чаще всего."""
+    total = 0.0
+    weights = []
+    for rank in range(1, count + 1):
+        total += 1 / rank
+        weights.append(total)
+    return weights
+
+
+def random_words(rng, count, min_length=3, max_length=10):
+    """Список из count случайных слов из букв ALPHABET."""
+    return [
+        ''.join(rng.choices(ALPHABET, k=rng.randint(min_length, max_length)))
+        for _ in range(count)
+    ]
+
+
+class Vocabulary:
+    """Словарь случайных слов с частотами по закону Ципфа."""
+
+    def __init__(self, rng, size=20_000, min_length=3, max_length=10):
+        self.rng = rng
+        self.words = random_words(rng, size, min_length, max_length)
+        self.weights = zipf_weights(size)
+
+    def text(self, count):
+        """Текст из count слов с частотами, как в живом тексте."""
+        return ' '.join(self.rng.choices(
+            self.words, cum_weights=self.weights, k=count
+        ))
+
+
+class Command(BaseCommand):
+    help = (
+        'Дозаполняет базу пользователями, новостями и комментариями '
+        'для нагрузочных замеров. Запускайте на отдельной базе.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1_000)
+        parser.add_argument('--news', type=int, default=10_000)
+        parser.add_argument('--comments', type=int, default=200_000)
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='За сколько дней до сегодня распределены новости.',
+        )
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.vocabulary = Vocabulary(self.rng)
+        for name, fill in (
+            ('пользователей', lambda: self.fill_users(options['users'])),
+            ('новостей', lambda: self.fill_news(
+                options['news'], options['days']
+            )),
+            ('комментариев', lambda: self.fill_comments(
+                options['comments']
+            )),
+        ):
+            start = perf_counter()
+            created = fill()
+            elapsed = perf_counter() - start
+            self.stdout.write(
+                f'Создано {name}: {created} за {elapsed:.1f} с '
+                f'({created / elapsed if elapsed else 0:.0f} в секунду)'
+            )
+        News.objects.sync_comment_count()
+        call_command('rebuild_search_index', stdout=self.stdout)
+        bump_data_version()
+
+    def fill_users(self, count):
+        existing = User.objects.filter(
+            username__startswith=USERNAME_PREFIX
+        ).count()
+        # Один хеш на всех: хеширование пароля дороже самой вставки.
+        password = make_password(PASSWORD)
+        User.objects.bulk_create(
+            (
+                User(username=f'{USERNAME_PREFIX}{index}', password=password)
+                for index in range(existing, count)
+            ),
+            batch_size=self.batch_size,
+        )
+        return max(count - existing, 0)
+
+    def fill_news(self, count, days):
+        """Новости за days дней, свежих дней больше, чем старых."""
+        existing = News.objects.count()
+        today = date.today()
+        for start in range(existing, count, self.batch_size):
+            stop = min(start + self.batch_size, count)
+            News.objects.bulk_create(
+                News(
+                    title=self.vocabulary.text(3)[:50],
+                    text=self.vocabulary.text(
+                        int(self.rng.lognormvariate(4, 0.6))
+                    ),
+                    date=today - timedelta(days=min(
+                        int(self.rng.expovariate(4 / days)), days
+                    )),
+                )
+                for _ in range(start, stop)
+            )
+        return max(count - existing, 0)
+
+    def fill_comments(self, count):
+        """
+        Комментарии: у свежих новостей и активных авторов их больше.
+
+        Популярность новости убывает по закону Ципфа от самой свежей.
+        """
+        existing = Comment.objects.count()
+        news_ids = list(
+            News.objects.order_by('-date', '-pk').values_list('pk', flat=True)
+        )
+        user_ids = list(
+            User.objects.filter(username__startswith=USERNAME_PREFIX)
+            .order_by('pk').values_list('pk', flat=True)
+        )
+        news_weights = zipf_weights(len(news_ids))
+        user_weights = zipf_weights(len(user_ids))
+        statuses, status_weights = zip(*STATUSES)
+        rng = self.rng
+        for start in range(existing, count, self.batch_size):
+            size = min(start + self.batch_size, count) - start
+            Comment.objects.bulk_create(
+                Comment(
+                    news_id=news_id,
+                    author_id=author_id,
+                    status=status,
+                    text=self.vocabulary.text(
+                        int(rng.lognormvariate(2.5, 0.8)) + 1
+                    ),
+                )
+                for news_id, author_id, status in zip(
+                    rng.choices(news_ids, cum_weights=news_weights, k=size),
+                    rng.choices(user_ids, cum_weights=user_weights, k=size),
+                    rng.choices(statuses, weights=status_weights, k=size),
+                )
+            )
+        return max(count - existing, 0)
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.1 on 2026-10-18 19:57
+
+from django.db import migrations, models
+
+INITIAL_BAD_WORDS = ('редиска', 'негодяй')
+
+
+def add_initial_bad_words(apps, schema_editor):
+    BadWord = apps.get_model('news', 'BadWord')
+    BadWord.objects.bulk_create(
+        BadWord(word=word) for word in INITIAL_BAD_WORDS
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0004_fragment_versions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BadWord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('word', models.CharField(max_length=100, unique=True, verbose_name='Слово')),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Запрещённое слово',
+                'verbose_name_plural': 'Запрещённые слова',
+                'ordering': ('word',),
+            },
+        ),
+        migrations.RunPython(add_initial_bad_words, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations
+
+
+def create_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        'CREATE VIRTUAL TABLE IF NOT EXISTS news_search USING fts5('
+        'news_id UNINDEXED, title, text, '
+        "tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    schema_editor.execute(
+        'INSERT INTO news_search (rowid, news_id, title, text) '
+        'SELECT id * 2, id, title, text FROM news_news'
+    )
+    schema_editor.execute(
+        'INSERT INTO news_search (rowid, news_id, title, text) '
+        "SELECT id * 2 + 1, news_id, '', text FROM news_comment "
+        "WHERE status = 'approved'"
+    )
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS news_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0006_comment_moderation_status'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 20:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0007_news_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='external_id',
+            field=models.CharField(blank=True, help_text='Идентификатор новости в загруженной ленте', max_length=255, null=True, unique=True, verbose_name='Внешний идентификатор'),
+        ),
+    ]
@@ -1,16 +1,81 @@
 from datetime import datetime
+from uuid import uuid4
 
 from django.conf import settings
 from django.db import models
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 
 
-class News(models.Model):
+class NewsQuerySet(models.QuerySet):
+
+    def _actual_comment_count(self):
+        """Подзапрос с реальным числом комментариев к новости."""
+        return Coalesce(
+            Subquery(
+                Comment.objects.filter(
+                    news=OuterRef('pk'), status=Comment.Status.APPROVED
+                )
+                .order_by()
+                .values('news')
+                .annotate(total=Count('pk'))
+                .values('total')
+            ),
+            0,
+        )
+
+    def sync_comment_count(self):
+        """Пересчитывает счётчик комментариев одним UPDATE."""
+        return self.update(comment_count=self._actual_comment_count())
+
+    def with_wrong_comment_count(self):
+        """Новости, у которых счётчик разошёлся с реальным числом."""
+        return self.annotate(
+            actual_comment_count=self._actual_comment_count()
+        ).filter(~Q(comment_count=F('actual_comment_count')))
+
+
+class VersionedModel(models.Model):
+    """
+    Модель с версией, которая меняется при каждом сохранении.
+
+    Версия входит в ключи кеша фрагментов шаблонов, поэтому после
+    изменения записи старый фрагмент больше не используется.
+    """
+    version = models.UUIDField(default=uuid4, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        self.version = uuid4()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'version'}
+        super().save(*args, **kwargs)
+
+
+class News(VersionedModel):
     title = models.CharField(max_length=50)
     text = models.TextField()
     date = models.DateField(default=datetime.today)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    external_id = models.CharField(
+        'Внешний идентификатор',
+        max_length=255,
+        unique=True,
+        null=True,
+        blank=True,
+        help_text='Идентификатор новости в загруженной ленте',
+    )
+
+    objects = NewsQuerySet.as_manager()
 
     class Meta:
         ordering = ('-date',)
+        indexes = (
+            models.Index(fields=('-date', '-id'), name='news_date_id_idx'),
+        )
         verbose_name_plural = 'Новости'
         verbose_name = 'Новость'
 
@@ -18,7 +83,13 @@ class News(models.Model):
         return self.title
 
 
-class Comment(models.Model):
+class Comment(VersionedModel):
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'На модерации'
+        APPROVED = 'approved', 'Опубликован'
+        REJECTED = 'rejected', 'Отклонён'
+
     news = models.ForeignKey(
         News,
         on_delete=models.CASCADE
@@ -29,9 +100,54 @@ class Comment(models.Model):
     )
     text = models.TextField()
     created = models.DateTimeField(auto_now_add=True)
+    status = models.CharField(
+        'Статус',
+        max_length=10,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
 
     class Meta:
         ordering = ('created',)
+        indexes = (
+            models.Index(
+                fields=('news', 'created', 'id'),
+                name='comment_approved_idx',
+                condition=Q(status='approved'),
+            ),
+            models.Index(
+                fields=('id',),
+                name='comment_pending_idx',
+                condition=Q(status='pending'),
+            ),
+            models.Index(
+                fields=('author', 'id'), name='comment_author_id_idx'
+            ),
+        )
 
     def __str__(self):
         return self.text[:50]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминаем статус из базы, чтобы видеть его смену."""
+        instance = super().from_db(db, field_names, values)
+        instance.loaded_status = dict(zip(field_names, values)).get('status')
+        return instance
+
+
+class BadWord(models.Model):
+    word = models.CharField('Слово', max_length=100, unique=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ('word',)
+        verbose_name = 'Запрещённое слово'
+        verbose_name_plural = 'Запрещённые слова'
+
+    def __str__(self):
+        return self.word
+
+    def save(self, *args, **kwargs):
+        self.word = self.word.lower()
+        super().save(*args, **kwargs)
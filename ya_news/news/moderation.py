@@ -0,0 +1,205 @@
+import re
+from collections import Counter, deque
+from time import monotonic
+from urllib.parse import urlsplit
+
+import snowballstemmer
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Max
+
+from .models import BadWord, Comment, News
+from .page_cache import bump_data_version
+from .search import get_search_backend
+
+# Латинские буквы, которыми подменяют похожие кириллические.
+LOOKALIKES = str.maketrans('aeopcxyktmbh', 'аеорсхуктмвн')
+WORD_RE = re.compile(r'\w+')
+URL_RE = re.compile(r'(?:https?://|www\.)\S+', re.IGNORECASE)
+
+stemmer = snowballstemmer.stemmer('russian')
+
+
+def normalize(text):
+    """Нижний регистр, «ё» как «е» и кириллица вместо латинских двойников."""
+    return text.lower().replace('ё', 'е').translate(LOOKALIKES)
+
+
+def squeeze(text):
+    """Схлопывает повторы букв: «рeдииискa» → «редиска»."""
+    return re.sub(r'(\w)\1+', r'\1', normalize(text))
+
+
+def stems(text):
+    """Основы слов текста после нормализации."""
+    return set(stemmer.stemWords(WORD_RE.findall(normalize(text))))
+
+
+class BadWordsMatcher:
+    """
+    Автомат Ахо — Корасик для поиска запрещённых слов.
+
+    Строится один раз по списку слов и находит все вхождения
+    за один проход по тексту, сколько бы слов ни было в списке.
+    """
+
+    def __init__(self, words):
+        self.words = tuple(dict.fromkeys(word.lower() for word in words))
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+        for word in self.words:
+            self._add(word)
+        self._link()
+
+    def _add(self, word):
+        state = 0
+        for char in word:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        self._output[state] += (word,)
+
+    def _link(self):
+        """Проставляет переходы по неудаче обходом бора в ширину."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] += (
+                    self._output[self._fail[next_state]]
+                )
+
+    def find(self, text):
+        """Возвращает множество запрещённых слов, найденных в тексте."""
+        goto, fail, output = self._goto, self._fail, self._output
+        found = set()
+        state = 0
+        for char in text.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+        return found
+
+
+class BadWordsCache:
+    """
+    Автомат по словарю из базы, закешированный в процессе.
+
+    Раз в BAD_WORDS_RELOAD_INTERVAL секунд процесс сверяет штамп версии
+    словаря (число слов и время последнего изменения) и перестраивает
+    автомат, только если штамп изменился. Между проверками валидация
+    комментария не обращается к базе.
+    """
+
+    def __init__(self):
+        self.matcher = None
+        self.squeezed_matcher = None
+        self.stems = frozenset()
+        self.version = None
+        self.checked_at = None
+
+    def invalidate(self):
+        """Сбрасывает проверку: словарь изменился в этом процессе."""
+        self.checked_at = None
+
+    def get_matcher(self):
+        self._refresh()
+        return self.matcher
+
+    def get_squeezed_matcher(self):
+        """Автомат по словам без повторов букв."""
+        self._refresh()
+        return self.squeezed_matcher
+
+    def get_stems(self):
+        """Основы запрещённых слов для поиска словоформ."""
+        self._refresh()
+        return self.stems
+
+    def _refresh(self):
+        now = monotonic()
+        if (
+            self.checked_at is None
+            or now - self.checked_at >= settings.BAD_WORDS_RELOAD_INTERVAL
+        ):
+            version = BadWord.objects.aggregate(
+                count=Count('pk'), updated=Max('updated')
+            )
+            if self.matcher is None or version != self.version:
+                words = list(BadWord.objects.values_list('word', flat=True))
+                self.matcher = BadWordsMatcher(words)
+                self.squeezed_matcher = BadWordsMatcher(map(squeeze, words))
+                self.stems = frozenset().union(*map(stems, words))
+                self.version = version
+            self.checked_at = now
+
+
+bad_words = BadWordsCache()
+
+
+def check_comment(text):
+    """Тяжёлые проверки комментария, возвращает итоговый статус."""
+    urls = URL_RE.findall(text)
+    if len(urls) > settings.MODERATION_MAX_LINKS:
+        return Comment.Status.REJECTED
+    for url in urls:
+        if not url.lower().startswith('http'):
+            url = f'http://{url}'
+        host = (urlsplit(url).hostname or '').removeprefix('www.')
+        if host in settings.MODERATION_BLOCKED_DOMAINS:
+            return Comment.Status.REJECTED
+    letters = [char for char in text if char.isalpha()]
+    if (
+        len(letters) >= 20
+        and sum(char.isupper() for char in letters) / len(letters) > 0.7
+    ):
+        return Comment.Status.REJECTED
+    if bad_words.get_squeezed_matcher().find(squeeze(text)):
+        return Comment.Status.REJECTED
+    if stems(text) & bad_words.get_stems():
+        return Comment.Status.REJECTED
+    return Comment.Status.APPROVED
+
+
+def moderate_pending(batch_size):
+    """
+    Проверяет пачку комментариев из очереди на модерацию.
+
+    Возвращает количество обработанных комментариев.
+    """
+    with transaction.atomic():
+        comments = list(
+            Comment.objects.filter(status=Comment.Status.PENDING)
+            .select_for_update(skip_locked=True)
+            .order_by('pk')[:batch_size]
+        )
+        for comment in comments:
+            comment.status = check_comment(comment.text)
+        Comment.objects.bulk_update(comments, ('status',))
+        approved = [
+            comment
+            for comment in comments
+            if comment.status == Comment.Status.APPROVED
+        ]
+        get_search_backend().index_comments(approved)
+        counts = Counter(comment.news_id for comment in approved)
+        for news_id, count in counts.items():
+            News.objects.filter(pk=news_id).update(
+                comment_count=F('comment_count') + count
+            )
+        if comments:
+            transaction.on_commit(bump_data_version)
+    return len(comments)
@@ -0,0 +1,202 @@
+"""
+Кеш целых страниц для анонимных пользователей.
+
+Ключ страницы состоит из адреса и версии данных. Версия — время
+последнего изменения любой новости или комментария, её обновляют
+сигналы, поэтому после изменения старые страницы больше не отдаются.
+Версия и страницы лежат в кеше default: без общего бэкенда (в
+settings.py это память процесса) изменение в одном процессе сбрасывает
+только его страницы, остальные отдают старые до истечения
+ANONYMOUS_PAGE_CACHE_TIMEOUT.
+
+Валидаторы считаются по данным один раз, при рендеринге, и хранятся
+рядом со страницей: попадание в кеш не делает запросов к базе. ETag —
+хеш страницы, Last-Modified — дата новости и последнего комментария.
+Ответ 304 выдаётся только по ETag: Last-Modified точен до секунды и не
+меняется при правке комментария, по If-Modified-Since клиент получил
+бы устаревшую страницу.
+"""
+import asyncio
+from datetime import datetime, time
+from hashlib import md5
+from time import time as now
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from django.utils.timezone import get_current_timezone
+
+from .models import Comment, News
+
+DATA_VERSION_KEY = 'news:data-version'
+
+
+def get_data_version():
+    """Время последнего изменения данных, запоминается при промахе."""
+    version = cache.get(DATA_VERSION_KEY)
+    if version is None:
+        cache.add(DATA_VERSION_KEY, now(), None)
+        version = cache.get(DATA_VERSION_KEY)
+    return version
+
+
+async def aget_data_version():
+    version = await cache.aget(DATA_VERSION_KEY)
+    if version is None:
+        await cache.aadd(DATA_VERSION_KEY, now(), None)
+        version = await cache.aget(DATA_VERSION_KEY)
+    return version
+
+
+def bump_data_version():
+    """Отмечает изменение данных: закешированные страницы устаревают."""
+    cache.set(DATA_VERSION_KEY, now(), None)
+
+
+def _timestamp(value):
+    """Секунды эпохи для даты (полночь по TIME_ZONE) или даты со временем."""
+    if value is None:
+        return 0
+    if not isinstance(value, datetime):
+        value = datetime.combine(
+            value, time.min, tzinfo=get_current_timezone()
+        )
+    return value.timestamp()
+
+
+def _use_page_cache(request, user):
+    return (
+        settings.ANONYMOUS_PAGE_CACHE_TIMEOUT
+        and request.method in ('GET', 'HEAD')
+        and not user.is_authenticated
+    )
+
+
+def _page_key(request, version):
+    url_hash = md5(request.get_full_path().encode()).hexdigest()
+    return f'news:page:{version:.6f}:{url_hash}'
+
+
+def _finish(request, entry):
+    """Ответ из записи кеша или 304, если у клиента та же страница."""
+    etag, last_modified, response = entry
+    response = get_conditional_response(request, etag=etag) or response
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    patch_vary_headers(response, ('Cookie',))
+    return response
+
+
+def _store(request, key, response, last_modified):
+    """
+    Кладёт отрисованную страницу в кеш вместе с её валидаторами.
+
+    ETag — хеш содержимого, поэтому он не зависит от процесса и версии
+    данных и меняется при любой видимой правке.
+    """
+    if response.status_code != 200 or response.cookies:
+        return response
+    entry = (
+        quote_etag(md5(response.content).hexdigest()),
+        int(last_modified),
+        response,
+    )
+    cache.set(key, entry, settings.ANONYMOUS_PAGE_CACHE_TIMEOUT)
+    return _finish(request, entry)
+
+
+def _store_after_render(request, key, response, last_modified):
+    """Шаблонный ответ кладётся в кеш после рендеринга."""
+    if callable(getattr(response, 'render', None)):
+        response.add_post_render_callback(
+            lambda rendered: _store(request, key, rendered, last_modified)
+        )
+        return response
+    return _store(request, key, response, last_modified)
+
+
+class AnonymousPageCacheMixin:
+    """
+    Отдаёт анонимным пользователям страницу из кеша.
+
+    Авторизованные пользователи всегда получают живую страницу.
+    Таймаут задаётся ANONYMOUS_PAGE_CACHE_TIMEOUT, пустое значение
+    отключает кеш.
+    """
+
+    def get_last_modified(self):
+        """Время последнего изменения показанных на странице данных."""
+        return 0
+
+    def dispatch(self, request, *args, **kwargs):
+        if not _use_page_cache(request, request.user):
+            return super().dispatch(request, *args, **kwargs)
+        key = _page_key(request, get_data_version())
+        entry = cache.get(key)
+        if entry is not None:
+            return _finish(request, entry)
+        last_modified = self.get_last_modified()
+        return _store_after_render(
+            request, key, super().dispatch(request, *args, **kwargs),
+            last_modified,
+        )
+
+
+class AsyncAnonymousPageCacheMixin:
+    """AnonymousPageCacheMixin для асинхронных представлений."""
+
+    async def aget_last_modified(self):
+        return 0
+
+    async def dispatch(self, request, *args, **kwargs):
+        # Шаблон и контекстные процессоры читают request.user
+        # синхронно: подставляем уже загруженного пользователя, иначе
+        # сессия и пользователь выбирались бы из базы второй раз.
+        request.user = await request.auser()
+        if not _use_page_cache(request, request.user):
+            return await super().dispatch(request, *args, **kwargs)
+        key = _page_key(request, await aget_data_version())
+        entry = await cache.aget(key)
+        if entry is not None:
+            return _finish(request, entry)
+        last_modified = await self.aget_last_modified()
+        return _store_after_render(
+            request, key, await super().dispatch(request, *args, **kwargs),
+            last_modified,
+        )
+
+
+def news_last_modified():
+    """Дата самой свежей новости."""
+    return _timestamp(News.objects.aggregate(latest=Max('date'))['latest'])
+
+
+def news_detail_last_modified(news_id):
+    """Дата новости или её последнего опубликованного комментария."""
+    news_date = News.objects.filter(pk=news_id).values_list(
+        'date', flat=True
+    ).first()
+    latest_comment = Comment.objects.filter(
+        news_id=news_id, status=Comment.Status.APPROVED
+    ).aggregate(latest=Max('created'))['latest']
+    return max(_timestamp(news_date), _timestamp(latest_comment))
+
+
+async def anews_last_modified():
+    latest = await News.objects.aaggregate(latest=Max('date'))
+    return _timestamp(latest['latest'])
+
+
+async def anews_detail_last_modified(news_id):
+    """Асинхронная news_detail_last_modified, запросы идут одновременно."""
+    news_date, latest_comment = await asyncio.gather(
+        News.objects.filter(pk=news_id).values_list(
+            'date', flat=True
+        ).afirst(),
+        Comment.objects.filter(
+            news_id=news_id, status=Comment.Status.APPROVED
+        ).aaggregate(latest=Max('created')),
+    )
+    return max(_timestamp(news_date), _timestamp(latest_comment['latest']))
@@ -0,0 +1,100 @@
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import Http404
+
+
+class KeysetPage:
+    """Страница выборки, полученная по курсору, а не через OFFSET."""
+
+    def __init__(self, paginator, object_list):
+        self.paginator = paginator
+        self.object_list = object_list
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    @property
+    def next_cursor(self):
+        """Курсор следующей страницы или None, если страница последняя."""
+        if not hasattr(self, '_next_cursor'):
+            self._next_cursor = self.paginator.next_cursor(
+                list(self.object_list)
+            )
+        return self._next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+class KeysetPaginator:
+    """
+    Постраничный вывод по паре (поле, pk).
+
+    Страница выбирается условием «строго после курсора», поэтому
+    стоимость N-й страницы не отличается от стоимости первой.
+    """
+
+    def __init__(self, queryset, field_name, per_page, descending=False):
+        self.queryset = queryset
+        self.field_name = field_name
+        self.field = queryset.model._meta.get_field(field_name)
+        self.per_page = per_page
+        self.descending = descending
+        prefix = '-' if descending else ''
+        self.ordering = (prefix + field_name, prefix + 'pk')
+
+    def _after(self, value, pk):
+        lookup = 'lt' if self.descending else 'gt'
+        return self.queryset.filter(
+            Q(**{f'{self.field_name}__{lookup}': value})
+            | Q(**{self.field_name: value, f'pk__{lookup}': pk})
+        )
+
+    def page(self, cursor=None):
+        """Возвращает страницу, начинающуюся сразу после курсора."""
+        queryset = self.queryset
+        if cursor is not None:
+            raw_value, pk = cursor
+            try:
+                value = self.field.to_python(raw_value)
+            except ValidationError:
+                raise Http404('Некорректный курсор.')
+            queryset = self._after(value, pk)
+        return KeysetPage(
+            self, queryset.order_by(*self.ordering)[:self.per_page]
+        )
+
+    async def apage(self, cursor=None):
+        """
+        Асинхронный вариант page.
+
+        Строки страницы и курсор следующей выбираются сразу, чтобы
+        шаблон не обращался к базе.
+        """
+        page = self.page(cursor)
+        page.object_list = [
+            obj async for obj in page.object_list.aiterator()
+        ]
+        page._next_cursor = await self.anext_cursor(page.object_list)
+        return page
+
+    def _last_key(self, object_list):
+        """Поле и pk последнего объекта полной страницы."""
+        if len(object_list) < self.per_page:
+            return None
+        last = object_list[-1]
+        return getattr(last, self.field_name), last.pk
+
+    def next_cursor(self, object_list):
+        """Курсор по последнему объекту, если за ним ещё есть записи."""
+        key = self._last_key(object_list)
+        if key is None or not self._after(*key).exists():
+            return None
+        return key[0].isoformat(), key[1]
+
+    async def anext_cursor(self, object_list):
+        key = self._last_key(object_list)
+        if key is None or not await self._after(*key).aexists():
+            return None
+        return key[0].isoformat(), key[1]
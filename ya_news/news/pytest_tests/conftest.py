@@ -2,38 +2,136 @@ from datetime import timedelta
 
 import pytest
 from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.test import override_settings
 from django.test.client import Client
 from django.urls import reverse
 from django.utils import timezone
-from news.models import Comment, News
+from news.models import BadWord, Comment, News
+from news.moderation import bad_words
+from news.search import get_search_backend
+
+# Пользователи, которые создаются один раз на всю сессию тестов.
+SESSION_USERS = {
+    'author': 'Автор',
+    'not_author': 'Не автор',
+    'editor': 'Редактор',
+}
+
+# Своё слово в словаре, чтобы не зависеть от слов из миграции.
+BAD_WORD = 'негодник'
+
+
+def logged_in_client(session_key):
+    """Клиент с готовой сессией: вход без запросов к базе."""
+    client = Client()
+    client.cookies[settings.SESSION_COOKIE_NAME] = session_key
+    return client
+
+
+@pytest.fixture(scope='session', autouse=True)
+def fast_password_hasher():
+    """Стойкий хеш пароля в тестах не нужен, а PBKDF2 медленный."""
+    with override_settings(PASSWORD_HASHERS=(
+        'django.contrib.auth.hashers.MD5PasswordHasher',
+    )):
+        yield
+
+
+@pytest.fixture(scope='session')
+def session_users(django_db_setup, django_db_blocker):
+    """
+    Пользователи и их сессии, общие для всех тестов.
+
+    Записи создаются вне транзакций тестов и не откатываются, поэтому
+    вход выполняется один раз, а не в каждом тесте.
+    """
+    with django_db_blocker.unblock():
+        users = {
+            key: get_user_model().objects.create(username=username)
+            for key, username in SESSION_USERS.items()
+        }
+        users['editor'].user_permissions.set(Permission.objects.filter(
+            content_type__app_label='news',
+            codename__in=('add_news', 'view_news'),
+        ))
+        sessions = {}
+        for key, user in users.items():
+            client = Client()
+            client.force_login(user)
+            sessions[key] = client.cookies[settings.SESSION_COOKIE_NAME].value
+    return users, sessions
+
+
+@pytest.fixture(autouse=True)
+def strict_query_budget(settings):
+    """Превышение бюджета запросов роняет тест."""
+    settings.QUERY_BUDGET_STRICT = True
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Кеш не переживает границы тестов."""
+    cache.clear()
+
+
+@pytest.fixture
+def page_cache(settings):
+    """Кеш страниц анонимов включён, как с общим кешем в production."""
+    settings.ANONYMOUS_PAGE_CACHE_TIMEOUT = 60
+
+
+@pytest.fixture(autouse=True)
+def loaded_bad_words(db, settings):
+    """Словарь со словом bad_word загружен заранее и не перечитывается."""
+    settings.BAD_WORDS_RELOAD_INTERVAL = 3600
+    BadWord.objects.get_or_create(word=BAD_WORD)
+    bad_words.invalidate()
+    bad_words.get_matcher()
+
+
+@pytest.fixture
+def bad_word():
+    """Запрещённое слово, которое тесты сами кладут в словарь."""
+    return BAD_WORD
 
 
 @pytest.fixture
-def author(django_user_model):
-    """Фикстура создания автора."""
-    return django_user_model.objects.create(username='Автор')
+def author(db, session_users):
+    """Фикстура автора."""
+    return session_users[0]['author']
 
 
 @pytest.fixture
-def not_author(django_user_model):
-    """Фикстура создания другого пользователя."""
-    return django_user_model.objects.create(username='Не автор')
+def not_author(db, session_users):
+    """Фикстура другого пользователя."""
+    return session_users[0]['not_author']
 
 
 @pytest.fixture
-def author_client(author):
+def author_client(db, session_users):
     """Фикстура логина автора."""
-    client = Client()
-    client.force_login(author)
-    return client
+    return logged_in_client(session_users[1]['author'])
 
 
 @pytest.fixture
-def not_author_client(not_author):
+def not_author_client(db, session_users):
     """Фикструа логина другого пользователя."""
-    client = Client()
-    client.force_login(not_author)
-    return client
+    return logged_in_client(session_users[1]['not_author'])
+
+
+@pytest.fixture
+def editor(db, session_users):
+    """Фикстура редактора, который загружает ленты."""
+    return session_users[0]['editor']
+
+
+@pytest.fixture
+def editor_client(db, session_users):
+    """Фикстура логина редактора."""
+    return logged_in_client(session_users[1]['editor'])
 
 
 @pytest.fixture
@@ -48,11 +146,12 @@ def news():
 
 @pytest.fixture
 def comment(news, author):
-    """Фикстура создания комментария."""
+    """Фикстура создания опубликованного комментария."""
     comment = Comment.objects.create(
         text='Текст комментария',
         news=news,
         author=author,
+        status=Comment.Status.APPROVED,
     )
     return comment
 
@@ -75,18 +174,28 @@ def created_news():
 
 @pytest.fixture
 def created_comments(news, author):
-    """Фикстура создания 10-ти комментариев."""
+    """
+    Фикстура создания 10-ти комментариев.
+
+    bulk_create не отправляет сигналы, поэтому счётчик и поисковый
+    индекс обновляются явно. created задаётся вторым запросом:
+    при вставке его перезаписывает auto_now_add.
+    """
     now = timezone.now()
-    comments = []
-    for index in range(10):
-        comment = Comment.objects.create(
+    comments = Comment.objects.bulk_create(
+        Comment(
             news=news,
             author=author,
             text=f'Tекст {index}',
+            status=Comment.Status.APPROVED,
         )
+        for index in range(10)
+    )
+    for index, comment in enumerate(comments):
         comment.created = now + timedelta(days=index)
-        comment.save()
-        comments.append(comment)
+    Comment.objects.bulk_update(comments, ('created',))
+    News.objects.filter(pk=news.pk).sync_comment_count()
+    get_search_backend().index_comments(comments)
     return comments
 
 
@@ -0,0 +1,108 @@
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.test import AsyncClient
+from django.urls import reverse
+from news.models import Comment, News
+from news.views import AsyncNewsList
+from yanews.profiling import samples
+
+pytestmark = pytest.mark.django_db
+
+FORM_DATA = {'text': 'Текст комментария'}
+
+
+@pytest.fixture
+def async_views(settings):
+    """Лента и страница новости обслуживаются асинхронными представлениями."""
+    settings.ROOT_URLCONF = 'yanews.urls_async'
+
+
+def get(client, url):
+    return async_to_sync(client.get)(url)
+
+
+@pytest.fixture
+def async_client(async_views):
+    return AsyncClient()
+
+
+@pytest.fixture
+def async_author_client(async_views, session_users):
+    client = AsyncClient()
+    client.cookies[settings.SESSION_COOKIE_NAME] = session_users[1]['author']
+    return client
+
+
+def test_news_list(async_client, created_news, redirect_news_home):
+    """Тест лента и её вторая страница совпадают с синхронными."""
+    expected = list(
+        News.objects.order_by('-date', '-pk').values_list('pk', flat=True)
+    )
+    response = get(async_client, redirect_news_home)
+    assert response.resolver_match.func.view_class is AsyncNewsList
+    page = response.context['page']
+    assert [news.pk for news in response.context['object_list']] == (
+        expected[:settings.NEWS_COUNT_ON_HOME_PAGE]
+    )
+    response = get(
+        async_client, reverse('news:home_page', args=(page.next_cursor,))
+    )
+    assert [news.pk for news in response.context['page']] == expected[
+        settings.NEWS_COUNT_ON_HOME_PAGE:
+    ]
+    assert not response.context['page'].has_next
+
+
+def test_news_detail(async_author_client, created_comments,
+                     redirect_news_detail):
+    """Тест новость, комментарии по порядку и форма для автора."""
+    response = get(async_author_client, redirect_news_detail)
+    assert response.status_code == HTTPStatus.OK
+    assert response.context['news'] == created_comments[0].news
+    assert [comment.pk for comment in response.context['comments']] == [
+        comment.pk for comment in created_comments
+    ]
+    assert 'form' in response.context
+
+
+def test_news_detail_not_found(async_client):
+    """Тест несуществующая новость — 404."""
+    url = reverse('news:detail', args=(0,))
+    assert get(async_client, url).status_code == HTTPStatus.NOT_FOUND
+
+
+def test_post_comment(async_author_client, news, redirect_to_comments,
+                      redirect_news_detail):
+    """Тест комментарий отправляется на ту же страницу новости."""
+    response = async_to_sync(async_author_client.post)(
+        redirect_news_detail, FORM_DATA
+    )
+    assert response.status_code == HTTPStatus.FOUND
+    assert response['Location'] == redirect_to_comments
+    assert Comment.objects.get().text == FORM_DATA['text']
+
+
+def test_queries_counted_like_sync(client, settings, created_comments,
+                                   redirect_news_detail, async_client):
+    """Тест профилировщик видит запросы асинхронного ORM."""
+    get(async_client, redirect_news_detail)
+    assert samples[-1].view_name == 'news:detail'
+    async_queries = samples[-1].queries
+    settings.ROOT_URLCONF = 'yanews.urls'
+    client.get(redirect_news_detail)
+    assert samples[-1].queries == async_queries == 2
+
+
+def test_anonymous_page_cache(
+    page_cache, async_client, news, redirect_news_detail
+):
+    """Тест повторная страница для анонима берётся из кеша."""
+    first = get(async_client, redirect_news_detail)
+    second = get(async_client, redirect_news_detail)
+    assert second.content == first.content
+    assert second['ETag'] == first['ETag']
+    # Страница и её валидаторы берутся из кеша без запросов к базе.
+    assert samples[-1].queries == 0
@@ -0,0 +1,78 @@
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.test.client import Client
+from django.urls import reverse
+from yanews.auth import USER_KEY
+
+pytestmark = pytest.mark.django_db
+
+FORM_DATA = {'text': 'Текст комментария'}
+
+
+@pytest.fixture
+def cached_auth(settings):
+    """Сессии cached_db и пользователь из кеша, как с CACHED_AUTH=1."""
+    settings.SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+    settings.AUTHENTICATION_BACKENDS = ['yanews.auth.CachedModelBackend']
+
+
+@pytest.fixture
+def user(django_user_model):
+    return django_user_model.objects.create(username='Читатель')
+
+
+@pytest.fixture
+def user_client(cached_auth, user):
+    client = Client()
+    client.force_login(user)
+    return client
+
+
+def test_comment_without_auth_queries(
+    user_client, redirect_news_detail, django_assert_num_queries
+):
+    """Тест после первого запроса сессия и пользователь берутся из кеша."""
+    user_client.get(redirect_news_detail)
+    with django_assert_num_queries(2):
+        user_client.post(redirect_news_detail, data=FORM_DATA)
+
+
+def test_password_change_logs_out(
+    settings, user, user_client, redirect_news_detail
+):
+    """Тест после смены пароля кеш не держит старую сессию."""
+    # Выход с удалением сессии — разовый запрос, дороже бюджета страницы.
+    settings.QUERY_BUDGET_STRICT = False
+    assert 'form' in user_client.get(redirect_news_detail).context
+    user.set_password('новый пароль')
+    user.save()
+    assert 'form' not in user_client.get(redirect_news_detail).context
+
+
+def test_permission_changes_apply(user, user_client):
+    """Тест права из кеша сбрасываются при изменении прав и групп."""
+    url = reverse('news:ingest')
+    assert user_client.get(url).status_code == HTTPStatus.FORBIDDEN
+    group = Group.objects.create(name='Редакторы')
+    group.permissions.set(
+        Permission.objects.filter(codename__in=('add_news', 'view_news'))
+    )
+    user.groups.add(group)
+    assert user_client.get(url).status_code == HTTPStatus.OK
+    group.permissions.clear()
+    assert user_client.get(url).status_code == HTTPStatus.FORBIDDEN
+
+
+def test_cache_cleared_after_commit(
+    user, django_capture_on_commit_callbacks
+):
+    """Тест пользователь, закешированный до фиксации, удаляется после неё."""
+    key = USER_KEY.format(user.pk)
+    with django_capture_on_commit_callbacks(execute=True):
+        user.save()
+        # Параллельный запрос кеширует пользователя до фиксации.
+        cache.set(key, user)
+    assert cache.get(key) is None
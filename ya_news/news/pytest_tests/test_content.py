@@ -1,5 +1,9 @@
+from http import HTTPStatus
+
 import pytest
 from django.conf import settings
+from django.urls import reverse
+from django.utils.http import http_date
 from news.forms import CommentForm
 
 pytestmark = pytest.mark.django_db
@@ -47,3 +51,108 @@ def test_authorized_client_has_form(
     response = author_client.get(redirect_news_detail)
     assert 'form' in response.context
     assert isinstance(response.context['form'], CommentForm)
+
+
+def test_news_next_page(client, created_news, redirect_news_home):
+    """Тест вторая страница продолжает первую без повторов."""
+    first_page = client.get(redirect_news_home).context['page']
+    assert first_page.has_next
+    response = client.get(
+        reverse('news:home_page', args=(first_page.next_cursor,))
+    )
+    second_page = response.context['page']
+    assert [news.pk for news in second_page] == [created_news[-1].pk]
+    assert not second_page.has_next
+
+
+def test_comments_next_page(
+    client, settings, created_comments, news, redirect_news_detail
+):
+    """Тест комментарии выводятся постранично по курсору."""
+    settings.COMMENTS_COUNT_ON_DETAIL_PAGE = 4
+    comments = client.get(redirect_news_detail).context['comments']
+    shown = [comment.pk for comment in comments]
+    while comments.has_next:
+        url = reverse(
+            'news:detail_page', args=(news.pk, comments.next_cursor)
+        )
+        comments = client.get(url).context['comments']
+        shown += [comment.pk for comment in comments]
+    assert shown == [comment.pk for comment in created_comments]
+
+
+def test_broken_cursor(client, news):
+    """Тест некорректный курсор приводит к 404."""
+    url = reverse('news:home_page', args=(('не дата', 1),))
+    assert client.get(url).status_code == HTTPStatus.NOT_FOUND
+
+
+def test_news_card_cache_follows_changes(client, news, redirect_news_home):
+    """Тест после изменения новости кеш карточки не отдаёт старые данные."""
+    client.get(redirect_news_home)
+    news.title = 'Новый заголовок'
+    news.save()
+    assert 'Новый заголовок' in client.get(redirect_news_home).content.decode()
+
+
+def test_comment_cache_follows_changes(
+    client, comment, redirect_news_detail
+):
+    """Тест после изменения комментария кеш не отдаёт старый текст."""
+    client.get(redirect_news_detail)
+    comment.text = 'Исправленный комментарий'
+    comment.save(update_fields=('text',))
+    response = client.get(redirect_news_detail)
+    assert 'Исправленный комментарий' in response.content.decode()
+
+
+def test_anonymous_page_served_from_cache(
+    page_cache, client, news, redirect_news_detail, django_assert_num_queries
+):
+    """Тест повторный анонимный запрос не рендерит страницу заново."""
+    client.get(redirect_news_detail)
+    with django_assert_num_queries(0):
+        response = client.get(redirect_news_detail)
+    assert response.status_code == HTTPStatus.OK
+    assert response.context is None
+
+
+def test_anonymous_page_not_modified(
+    page_cache, client, news, redirect_news_home
+):
+    """Тест по ETag анонимный клиент получает 304, пока страница та же."""
+    etag = client.get(redirect_news_home)['ETag']
+    response = client.get(redirect_news_home, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    # Данные изменились, а страница нет: ETag прежний.
+    news.save()
+    response = client.get(redirect_news_home, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    news.title = 'Новый заголовок'
+    news.save()
+    response = client.get(redirect_news_home, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert response['ETag'] != etag
+
+
+def test_anonymous_page_validators_from_data(
+    page_cache, client, comment, redirect_news_detail
+):
+    """Тест Last-Modified по комментарию, If-Modified-Since не даёт 304."""
+    response = client.get(redirect_news_detail)
+    assert response['Last-Modified'] == http_date(
+        int(comment.created.timestamp())
+    )
+    response = client.get(
+        redirect_news_detail,
+        HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+    )
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_authorized_page_is_live(author_client, news, redirect_news_home):
+    """Тест авторизованный пользователь получает живую страницу."""
+    author_client.get(redirect_news_home)
+    response = author_client.get(redirect_news_home)
+    assert response.context is not None
+    assert not response.has_header('ETag')
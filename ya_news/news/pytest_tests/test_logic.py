@@ -1,8 +1,9 @@
 from http import HTTPStatus
 
 import pytest
-from news.forms import BAD_WORDS, WARNING
-from news.models import Comment
+from django.core.management import CommandError, call_command
+from news.forms import WARNING
+from news.models import Comment, News
 from pytest_django.asserts import assertFormError, assertRedirects
 
 FORM_DATA = {
@@ -33,11 +34,14 @@ def test_user_can_create_comment(
     assert comment.text == FORM_DATA['text']
     assert comment.news == news
     assert comment.author == author
+    assert comment.status == Comment.Status.PENDING
 
 
-def test_user_cant_use_bad_words(author_client, redirect_news_detail):
+def test_user_cant_use_bad_words(
+    author_client, bad_word, redirect_news_detail
+):
     """Тест фильтр запрещенных слов"""
-    bad_words_data = {'text': f'Какой-то текст, {BAD_WORDS[0]}, еще текст'}
+    bad_words_data = {'text': f'Какой-то текст, {bad_word}, еще текст'}
     response = author_client.post(redirect_news_detail, data=bad_words_data)
     form = response.context['form']
     assertFormError(
@@ -98,3 +102,30 @@ def test_user_cant_edit_comment_of_another_user(
     assert updated_comment.text == comment.text
     assert updated_comment.author_id == comment.author_id
     assert updated_comment.news_id == comment.news_id
+
+
+def test_comment_count_follows_moderation_and_delete(
+    author_client, redirect_news_detail, redirect_comment_delete, news
+):
+    """Тест счётчик учитывает только одобренные комментарии."""
+    author_client.post(redirect_news_detail, data=FORM_DATA)
+    news.refresh_from_db()
+    assert news.comment_count == 1
+    call_command('moderate_comments', once=True)
+    news.refresh_from_db()
+    assert news.comment_count == 2
+    author_client.post(redirect_comment_delete)
+    news.refresh_from_db()
+    assert news.comment_count == 1
+
+
+def test_comment_count_commands(news, created_comments):
+    """Тест проверки и пересчёта счётчика комментариев."""
+    call_command('check_comment_count')
+    News.objects.update(comment_count=0)
+    with pytest.raises(CommandError):
+        call_command('check_comment_count')
+    call_command('backfill_comment_count')
+    news.refresh_from_db()
+    assert news.comment_count == len(created_comments)
+    call_command('check_comment_count')
@@ -0,0 +1,64 @@
+import pytest
+from django.core.management import call_command
+from news.forms import CommentForm
+from news.models import BadWord, Comment
+from news.moderation import BadWordsMatcher
+
+
+def test_matcher_finds_overlapping_words():
+    """Тест автомат находит пересекающиеся и вложенные слова."""
+    matcher = BadWordsMatcher(('он', 'она', 'нал', 'Анал'))
+    assert matcher.find('ОНА НАЛИЛА') == {'он', 'она', 'нал'}
+    assert matcher.find('канал') == {'анал', 'нал'}
+    assert matcher.find('ничего такого') == set()
+
+
+@pytest.mark.django_db
+def test_new_bad_word_takes_effect():
+    """Тест слово, добавленное в словарь, сразу запрещено."""
+    form = CommentForm(data={'text': 'Какой-то балбес'})
+    assert form.is_valid()
+    BadWord.objects.create(word='Балбес')
+    form = CommentForm(data={'text': 'Какой-то балбес'})
+    assert not form.is_valid()
+
+
+@pytest.mark.django_db
+def test_clean_text_without_queries(django_assert_num_queries):
+    """Тест проверка комментария не обращается к базе."""
+    with django_assert_num_queries(0):
+        form = CommentForm(data={'text': 'Просто текст'})
+        assert form.is_valid()
+
+
+@pytest.mark.parametrize(
+    'text, status',
+    (
+        ('Хорошая новость, спасибо!', Comment.Status.APPROVED),
+        ('Эти {bad_word}ами оказались', Comment.Status.REJECTED),
+        ('Ну ты и {disguised}', Comment.Status.REJECTED),
+        ('http://a.ru http://b.ru http://c.ru', Comment.Status.REJECTED),
+        ('ПОКУПАЙТЕ НАШИ ТОВАРЫ ПРЯМО СЕЙЧАС', Comment.Status.REJECTED),
+    ),
+)
+def test_moderation_worker(news, author, bad_word, text, status):
+    """Тест воркер проверяет словоформы, подмену букв, ссылки и капс."""
+    # Латинские «e» и «o», буква «о» повторена.
+    disguised = bad_word.replace('е', 'e').replace('о', 'oo')
+    comment = Comment.objects.create(
+        news=news,
+        author=author,
+        text=text.format(bad_word=bad_word, disguised=disguised),
+    )
+    call_command('moderate_comments', once=True)
+    comment.refresh_from_db()
+    assert comment.status == status
+
+
+def test_detail_shows_only_approved(
+    client, news, author, redirect_news_detail
+):
+    """Тест на странице новости только одобренные комментарии."""
+    Comment.objects.create(news=news, author=author, text='На проверке')
+    response = client.get(redirect_news_detail)
+    assert list(response.context['comments']) == []
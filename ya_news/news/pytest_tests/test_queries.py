@@ -0,0 +1,141 @@
+from http import HTTPStatus
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from news.forms import WARNING
+from news.models import Comment, News
+from yanews.environment import READ_ALIAS
+from yanews.profiling import QueryBudgetExceeded
+
+FORM_DATA = {'text': 'Текст комментария'}
+
+pytestmark = pytest.mark.django_db
+
+# Сессия и пользователь загружаются на каждом авторизованном запросе.
+AUTH_QUERIES = 2
+
+
+@pytest.fixture
+def read_replica(settings):
+    """Алиас read на тестовую базу и ReadWriteRouter, как в production."""
+    settings.DATABASE_ROUTERS = ['yanews.routers.ReadWriteRouter']
+    replica = connections.create_connection(DEFAULT_DB_ALIAS)
+    with mock.patch.dict(
+        connections.settings, {READ_ALIAS: replica.settings_dict}
+    ):
+        connections[READ_ALIAS] = replica
+        yield replica
+        replica.close()
+        del connections[READ_ALIAS]
+
+
+def test_create_comment_queries(
+    author_client, redirect_news_detail, django_assert_num_queries
+):
+    """Создание: новость и вставка комментария в очередь модерации."""
+    with django_assert_num_queries(AUTH_QUERIES + 2):
+        author_client.post(redirect_news_detail, data=FORM_DATA)
+
+
+def test_detail_queries(
+    author_client, created_comments, redirect_news_detail,
+    django_assert_num_queries
+):
+    """Страница: новость и комментарии вместе с авторами."""
+    with django_assert_num_queries(AUTH_QUERIES + 2):
+        author_client.get(redirect_news_detail)
+
+
+def test_invalid_comment_queries(
+    author_client, bad_word, created_comments, redirect_news_detail,
+    django_assert_num_queries
+):
+    """Форма с ошибкой показывается за те же запросы, что и страница."""
+    with django_assert_num_queries(AUTH_QUERIES + 2):
+        response = author_client.post(
+            redirect_news_detail, data={'text': bad_word}
+        )
+    assert response.context['form'].errors['text'] == [WARNING]
+    assert len(response.context['comments'].object_list) == len(
+        created_comments
+    )
+
+
+def test_edit_comment_queries(
+    author_client, redirect_comment_edit, django_assert_num_queries
+):
+    """Редактирование: загрузка, обновление, счётчик и поисковый индекс."""
+    with django_assert_num_queries(AUTH_QUERIES + 4):
+        author_client.post(redirect_comment_edit, data=FORM_DATA)
+
+
+def test_delete_comment_queries(
+    author_client, redirect_comment_delete, django_assert_num_queries
+):
+    """Удаление: загрузка, удаление, счётчик и поисковый индекс."""
+    with django_assert_num_queries(AUTH_QUERIES + 4):
+        author_client.post(redirect_comment_delete)
+
+
+def test_query_budget_exceeded(client, settings, news, redirect_news_home):
+    """Тест превышение бюджета запросов роняет запрос в тестах."""
+    settings.QUERY_BUDGETS = {'news:home': 0}
+    with pytest.raises(QueryBudgetExceeded):
+        client.get(redirect_news_home)
+
+
+def test_query_budget_warning(
+    caplog, client, settings, news, redirect_news_home
+):
+    """Тест вне строгого режима превышение бюджета пишется в лог."""
+    settings.QUERY_BUDGETS = {'news:home': 0}
+    settings.QUERY_BUDGET_STRICT = False
+    with caplog.at_level('WARNING', logger='yanews.profiling'):
+        assert client.get(redirect_news_home).status_code == HTTPStatus.OK
+    assert 'news:home' in caplog.text
+
+
+@pytest.mark.django_db(transaction=True)
+def test_query_budget_counts_replica(
+    read_replica, client, settings, news, redirect_news_home
+):
+    """Тест запросы через алиас read тоже входят в бюджет."""
+    settings.QUERY_BUDGETS = {'news:home': 0}
+    with CaptureQueriesContext(read_replica) as reads:
+        with pytest.raises(QueryBudgetExceeded):
+            client.get(redirect_news_home)
+    assert reads.captured_queries
+
+
+def test_profiling_report_for_staff_only(
+    admin_client, author_client, redirect_news_home
+):
+    """Тест отчёт о стоимости представлений виден только персоналу."""
+    admin_client.get(redirect_news_home)
+    url = reverse('query_profiling_json')
+    assert author_client.get(url).status_code == HTTPStatus.FOUND
+    response = admin_client.get(url)
+    views = {row['view_name']: row for row in response.json()['views']}
+    assert views['news:home']['requests'] >= 1
+    response = admin_client.get(reverse('query_profiling'))
+    assert response.status_code == HTTPStatus.OK
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bench_query_plans_rolls_back():
+    """Тест замер планов не оставляет в базе строк и не теряет индексы."""
+    call_command('bench_query_plans', news=5, comments=20, stdout=StringIO())
+    assert not News.objects.exists()
+    assert not Comment.objects.exists()
+    for model in (News, Comment):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, model._meta.db_table
+            )
+        for index in model._meta.indexes:
+            assert index.name in constraints
@@ -0,0 +1,99 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from news.models import Comment, News
+from news.search import IcontainsBackend, SearchBackend, get_search_backend
+from news.views import NewsSearch
+
+pytestmark = pytest.mark.django_db
+
+SEARCH_URL = reverse('news:search')
+
+
+def search(client, query, page=1):
+    response = client.get(SEARCH_URL, {'q': query, 'page': page})
+    return response.context['results'], response.context['has_next']
+
+
+def test_search_finds_news_and_comments(client, news, comment):
+    """Тест поиск находит новость по тексту и комментарий по словоформе."""
+    results, _ = search(client, 'заголов')
+    assert results == [(news, None)]
+    results, _ = search(client, 'комментария')
+    assert results == [(news, comment)]
+
+
+def test_search_index_follows_changes(client, news, author):
+    """Тест индекс обновляется при изменениях и не видит модерацию."""
+    news.title = 'Метеорит'
+    news.save()
+    assert search(client, 'метеорит')[0] == [(news, None)]
+    pending = Comment.objects.create(news=news, author=author, text='Комета')
+    assert search(client, 'комета')[0] == []
+    call_command('moderate_comments', once=True)
+    assert search(client, 'комета')[0] == [(news, pending)]
+    news.delete()
+    assert search(client, 'метеорит')[0] == []
+
+
+def test_search_ranking(client, created_news):
+    """Тест совпадение в заголовке ранжируется выше совпадения в тексте."""
+    get_search_backend().index_news(created_news)
+    in_text = News.objects.create(title='Другое', text='Метеорит, метеорит')
+    in_title = News.objects.create(title='Метеорит', text='Просто текст')
+    results, _ = search(client, 'метеорит')
+    assert results == [(in_title, None), (in_text, None)]
+
+
+def test_search_pages(client, settings, created_news):
+    """Тест результаты поиска выводятся постранично."""
+    settings.NEWS_SEARCH_RESULTS_PER_PAGE = 5
+    get_search_backend().index_news(created_news)
+    found = []
+    page, has_next = 0, True
+    while has_next:
+        page += 1
+        results, has_next = search(client, 'новость', page)
+        found += [news for news, _ in results]
+    assert page == 3
+    assert sorted(found, key=lambda news: news.pk) == created_news
+
+
+@pytest.mark.parametrize(
+    'page, status',
+    (
+        (NewsSearch.max_page, HTTPStatus.OK),
+        (NewsSearch.max_page + 1, HTTPStatus.NOT_FOUND),
+        ('99999999999999999999', HTTPStatus.NOT_FOUND),
+    ),
+)
+def test_search_page_limit(client, news, page, status):
+    """Тест слишком далёкая страница поиска — 404, а не ошибка базы."""
+    response = client.get(SEARCH_URL, {'q': 'заголовок', 'page': page})
+    assert response.status_code == status
+
+
+def test_rebuild_search_index(client, news, comment):
+    """Тест команда перестраивает индекс с нуля."""
+    get_search_backend().clear()
+    assert search(client, 'заголовок')[0] == []
+    call_command('rebuild_search_index', chunk_size=1)
+    assert search(client, 'заголовок')[0] == [(news, None)]
+
+
+def test_bench_search_rolls_back(client, news):
+    """Тест замер поиска не оставляет в базе новостей и не портит индекс."""
+    call_command('bench_search', news=5, queries=2, stdout=StringIO())
+    assert list(News.objects.all()) == [news]
+    assert search(client, 'заголовок')[0] == [(news, None)]
+
+
+def test_backend_follows_setting(settings):
+    """Тест бэкенд берётся из текущего значения настройки."""
+    settings.NEWS_SEARCH_BACKEND = 'news.search.IcontainsBackend'
+    assert isinstance(get_search_backend(), IcontainsBackend)
+    with pytest.raises(TypeError):
+        SearchBackend()
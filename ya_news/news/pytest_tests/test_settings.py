@@ -0,0 +1,152 @@
+import importlib
+import sys
+from pathlib import Path
+from unittest import mock
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, transaction
+from django.template import engines
+from news.models import News
+from yanews.environment import database_settings
+from yanews.routers import ReadWriteRouter
+from yanews.template_cache import template_names, warm_templates
+
+BASE_DIR = Path('/srv/yanews')
+POSTGRES = {'POSTGRES_DB': 'yanews', 'POSTGRES_HOST': 'db'}
+PRODUCTION = 'yanews.settings_production'
+
+
+@pytest.fixture
+def production_settings(monkeypatch):
+    """Загружает профиль заново с окружением из monkeypatch."""
+    monkeypatch.delitem(sys.modules, PRODUCTION, raising=False)
+    yield lambda: importlib.import_module(PRODUCTION)
+    sys.modules.pop(PRODUCTION, None)
+
+
+def test_sqlite_without_postgres():
+    database = database_settings({}, BASE_DIR)
+    assert database['ENGINE'] == 'django.db.backends.sqlite3'
+    assert database['NAME'] == str(BASE_DIR / 'db.sqlite3')
+    assert database['CONN_MAX_AGE'] > 0
+    assert database['CONN_HEALTH_CHECKS']
+
+
+def test_postgres_persistent_connections():
+    database = database_settings(
+        {**POSTGRES, 'DB_CONN_MAX_AGE': '300'}, BASE_DIR
+    )
+    assert database['ENGINE'] == 'django.db.backends.postgresql'
+    assert (database['NAME'], database['HOST'], database['PORT']) == (
+        'yanews', 'db', '5432'
+    )
+    assert database['CONN_MAX_AGE'] == 300
+    assert database['CONN_HEALTH_CHECKS']
+    assert 'pool' not in database['OPTIONS']
+
+
+def test_postgres_pool_disables_persistent_connections():
+    database = database_settings(
+        {**POSTGRES, 'DB_POOL_MAX_SIZE': '20', 'DB_CONN_MAX_AGE': '300'},
+        BASE_DIR,
+    )
+    assert database['CONN_MAX_AGE'] == 0
+    assert database['OPTIONS']['pool'] == {
+        'min_size': 2, 'max_size': 20, 'timeout': 10
+    }
+
+
+def test_invalid_number():
+    with pytest.raises(ImproperlyConfigured):
+        database_settings({**POSTGRES, 'DB_POOL_MAX_SIZE': 'many'}, BASE_DIR)
+
+
+def test_production_requires_secret_key(monkeypatch, production_settings):
+    monkeypatch.delenv('DJANGO_SECRET_KEY', raising=False)
+    with pytest.raises(ImproperlyConfigured):
+        production_settings()
+
+
+def test_production_profile(monkeypatch, production_settings):
+    monkeypatch.setenv('DJANGO_SECRET_KEY', 'secret')
+    monkeypatch.setenv('DJANGO_ALLOWED_HOSTS', 'news.example.com, example.com')
+    for name, value in POSTGRES.items():
+        monkeypatch.setenv(name, value)
+    profile = production_settings()
+    assert profile.SECRET_KEY == 'secret'
+    assert not profile.DEBUG
+    assert profile.ALLOWED_HOSTS == ['news.example.com', 'example.com']
+    assert profile.DATABASES['default']['NAME'] == 'yanews'
+    assert profile.NEWS_SEARCH_BACKEND == 'news.search.IcontainsBackend'
+
+
+@pytest.mark.parametrize('backend, timeout', (
+    ('', 0),
+    ('django.core.cache.backends.redis.RedisCache', 60),
+))
+def test_production_page_cache_needs_shared_cache(
+    monkeypatch, production_settings, backend, timeout
+):
+    monkeypatch.setenv('DJANGO_SECRET_KEY', 'secret')
+    monkeypatch.setenv('DJANGO_CACHE_BACKEND', backend)
+    profile = production_settings()
+    assert profile.ANONYMOUS_PAGE_CACHE_TIMEOUT == timeout
+
+
+def test_production_async_views(monkeypatch, production_settings):
+    monkeypatch.setenv('DJANGO_SECRET_KEY', 'secret')
+    monkeypatch.setenv('NEWS_ASYNC_VIEWS', '1')
+    assert production_settings().ROOT_URLCONF == 'yanews.urls_async'
+
+
+def test_production_cached_templates(monkeypatch, production_settings):
+    monkeypatch.setenv('DJANGO_SECRET_KEY', 'secret')
+    profile = production_settings()
+    templates = profile.TEMPLATES[0]
+    assert not templates['APP_DIRS']
+    assert templates['OPTIONS']['loaders'][0][0] == (
+        'django.template.loaders.cached.Loader'
+    )
+    assert profile.TEMPLATE_WARMUP
+
+
+def test_sqlite_performance_profile(monkeypatch, production_settings):
+    monkeypatch.setenv('DJANGO_SECRET_KEY', 'secret')
+    monkeypatch.setenv('SQLITE_PATH', '/srv/yanews/db.sqlite3')
+    monkeypatch.setenv('SQLITE_PERFORMANCE', '1')
+    profile = production_settings()
+    default = profile.DATABASES['default']
+    read = profile.DATABASES['read']
+    assert 'PRAGMA journal_mode=WAL' in default['OPTIONS']['init_command']
+    assert 'PRAGMA synchronous=NORMAL' in default['OPTIONS']['init_command']
+    assert 'PRAGMA busy_timeout=5000' in default['OPTIONS']['init_command']
+    assert default['OPTIONS']['transaction_mode'] == 'IMMEDIATE'
+    assert read['NAME'] == 'file:/srv/yanews/db.sqlite3?mode=ro'
+    assert 'PRAGMA query_only=1' in read['OPTIONS']['init_command']
+    assert read['TEST'] == {'MIRROR': 'default'}
+    assert profile.DATABASE_ROUTERS == ['yanews.routers.ReadWriteRouter']
+
+
+def test_router_reads_from_replica():
+    router = ReadWriteRouter()
+    # Общие фикстуры открывают транзакцию, здесь нужен режим без неё.
+    with mock.patch.object(connection, 'in_atomic_block', False):
+        assert router.db_for_read(News) == 'read'
+    assert router.db_for_write(News) == 'default'
+    assert not router.allow_migrate('read', 'news')
+
+
+@pytest.mark.django_db
+def test_router_reads_from_default_in_transaction():
+    with transaction.atomic():
+        assert ReadWriteRouter().db_for_read(News) == 'default'
+
+
+def test_warm_templates(settings):
+    """Тест все шаблоны из DIRS уже в кеше загрузчика."""
+    names = template_names(settings.TEMPLATES[0]['DIRS'][0])
+    assert 'news/detail.html' in names
+    assert warm_templates()[0] == len(names)
+    loader = engines['django'].engine.template_loaders[0]
+    assert set(names) <= set(loader.get_template_cache)
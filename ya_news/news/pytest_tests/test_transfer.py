@@ -0,0 +1,117 @@
+import csv
+import json
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from news.models import News
+from news.search import get_search_backend
+
+pytestmark = pytest.mark.django_db
+
+INGEST_URL = reverse('news:ingest')
+ARCHIVE_URL = reverse('news:archive')
+
+FEED = [
+    {'external_id': 'a-1', 'title': 'Первая', 'text': 'Про луну',
+     'date': '2024-05-01'},
+    {'external_id': 'a-2', 'title': 'Вторая', 'text': 'Про марс'},
+    {'title': 'Без идентификатора', 'text': 'Пропускается'},
+]
+RSS = '''<?xml version="1.0" encoding="utf-8"?>
+<rss version="2.0"><channel><title>Лента</title>
+  <item>
+    <guid>rss-1</guid><title>Из RSS</title>
+    <description>Про венеру</description>
+    <pubDate>Wed, 01 May 2024 10:00:00 +0300</pubDate>
+  </item>
+  <item><link>https://example.com/2</link><title>Вторая из RSS</title>
+    <description>Про юпитер</description></item>
+</channel></rss>
+'''
+
+
+def upload(client, content, file_format):
+    return client.post(INGEST_URL, {
+        'format': file_format,
+        'file': SimpleUploadedFile(f'feed.{file_format}', content.encode()),
+    })
+
+
+def jsonl(items):
+    return ''.join(json.dumps(item) + '\n' for item in items)
+
+
+def test_ingest_for_editors_only(client, author_client):
+    """Тест загружать ленты может только редактор."""
+    assert client.get(INGEST_URL).status_code == HTTPStatus.FOUND
+    assert author_client.get(INGEST_URL).status_code == HTTPStatus.FORBIDDEN
+    response = upload(author_client, jsonl(FEED), 'jsonl')
+    assert response.status_code == HTTPStatus.FORBIDDEN
+    assert author_client.get(ARCHIVE_URL).status_code == HTTPStatus.FORBIDDEN
+    assert not News.objects.exists()
+
+
+def test_ingest_malformed_csv(editor_client):
+    """Тест испорченный CSV — ошибка формы, а не 500."""
+    content = 'title,text\n"' + 'x' * (csv.field_size_limit() + 1) + '"\n'
+    response = upload(editor_client, content, 'csv')
+    assert response.status_code == HTTPStatus.OK
+    assert response.context['form'].errors['file'][0].startswith(
+        'Некорректный CSV'
+    )
+    assert not News.objects.exists()
+
+
+def test_ingest_is_idempotent(editor_client):
+    """Тест повторная загрузка обновляет новости, а не дублирует их."""
+    result = upload(editor_client, jsonl(FEED), 'jsonl').context['result']
+    assert (result.created, result.skipped) == (2, 1)
+    assert len(result.errors) == 1
+    changed = [{**FEED[0], 'title': 'Первая, исправленная'}, FEED[1]]
+    result = upload(editor_client, jsonl(changed), 'jsonl').context['result']
+    assert (result.created, result.updated, result.unchanged) == (0, 1, 1)
+    assert sorted(News.objects.values_list('external_id', 'title')) == [
+        ('a-1', 'Первая, исправленная'), ('a-2', 'Вторая'),
+    ]
+    hits = get_search_backend().search('исправленная', 10)
+    assert [hit.news_id for hit in hits] == [
+        News.objects.get(external_id='a-1').pk
+    ]
+
+
+def test_ingest_rss(editor_client):
+    """Тест RSS: guid или ссылка становятся внешним идентификатором."""
+    result = upload(editor_client, RSS, 'rss').context['result']
+    assert result.created == 2
+    news = News.objects.get(external_id='rss-1')
+    assert (news.title, news.text, str(news.date)) == (
+        'Из RSS', 'Про венеру', '2024-05-01'
+    )
+    assert News.objects.filter(external_id='https://example.com/2').exists()
+
+
+def test_archive_streams_news_with_comments(editor_client, news, comment):
+    """Тест архив отдаётся потоком вместе с комментариями."""
+    response = editor_client.get(ARCHIVE_URL)
+    assert response.streaming
+    rows = [
+        json.loads(line)
+        for line in b''.join(response.streaming_content).splitlines()
+    ]
+    assert [row['title'] for row in rows] == [news.title]
+    assert [item['text'] for item in rows[0]['comments']] == [comment.text]
+
+
+def test_commands_round_trip(tmp_path, news):
+    """Тест выгрузка CSV загружается командой без дублей."""
+    News.objects.filter(pk=news.pk).update(external_id='n-1')
+    path = tmp_path / 'news.csv'
+    call_command('export_news', format='csv', output=str(path))
+    stdout = StringIO()
+    call_command('ingest_news', str(path), stdout=stdout)
+    assert 'Создано: 0, обновлено: 0, без изменений: 1' in stdout.getvalue()
+    assert News.objects.count() == 1
@@ -0,0 +1,190 @@
+"""
+Полнотекстовый поиск по новостям и опубликованным комментариям.
+
+Бэкенд выбирается настройкой NEWS_SEARCH_BACKEND, индекс обновляется
+сигналами моделей и целиком перестраивается командой
+rebuild_search_index.
+"""
+import re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from functools import cache
+from itertools import islice
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from .models import Comment, News
+
+WORD_RE = re.compile(r'\w+')
+
+
+@dataclass
+class SearchHit:
+    news_id: int
+    comment_id: int = None
+    rank: float = 0.0
+
+
+def chunked(iterable, size):
+    """Разбивает поток на списки длиной не больше size."""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class SearchBackend(ABC):
+    """Интерфейс бэкенда поиска."""
+
+    @abstractmethod
+    def index_news(self, news_list):
+        """Добавляет или обновляет новости в индексе."""
+
+    @abstractmethod
+    def index_comments(self, comments):
+        """Добавляет или обновляет комментарии в индексе."""
+
+    @abstractmethod
+    def remove_news(self, news_id):
+        """Убирает новость из индекса."""
+
+    @abstractmethod
+    def remove_comment(self, comment_id):
+        """Убирает комментарий из индекса."""
+
+    @abstractmethod
+    def clear(self):
+        """Очищает индекс."""
+
+    @abstractmethod
+    def search(self, query, limit, offset=0):
+        """Возвращает список SearchHit, от самых релевантных."""
+
+
+class SQLiteFTSBackend(SearchBackend):
+    """
+    Индекс в виртуальной таблице FTS5 news_search.
+
+    Новости и комментарии лежат в одной таблице: rowid новости — pk * 2,
+    rowid комментария — pk * 2 + 1, поэтому удаление идёт по rowid.
+    Ранжирование — bm25, заголовок весит больше текста.
+    """
+
+    table = 'news_search'
+
+    def _insert(self, rows):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT OR REPLACE INTO {self.table} '
+                '(rowid, news_id, title, text) VALUES (%s, %s, %s, %s)',
+                rows,
+            )
+
+    def _delete(self, rowid):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.table} WHERE rowid = %s', (rowid,)
+            )
+
+    def index_news(self, news_list):
+        self._insert(
+            (news.pk * 2, news.pk, news.title, news.text)
+            for news in news_list
+        )
+
+    def index_comments(self, comments):
+        self._insert(
+            (comment.pk * 2 + 1, comment.news_id, '', comment.text)
+            for comment in comments
+        )
+
+    def remove_news(self, news_id):
+        self._delete(news_id * 2)
+
+    def remove_comment(self, comment_id):
+        self._delete(comment_id * 2 + 1)
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+
+    @staticmethod
+    def match_expression(query):
+        """Слова запроса в кавычках, последнее ищется как префикс."""
+        words = WORD_RE.findall(query)
+        if not words:
+            return None
+        return ' '.join(f'"{word}"' for word in words) + '*'
+
+    def search(self, query, limit, offset=0):
+        expression = self.match_expression(query)
+        if expression is None:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid, news_id, bm25({self.table}, 0, 10.0, 1.0) '
+                f'AS rank FROM {self.table} WHERE {self.table} MATCH %s '
+                'ORDER BY rank LIMIT %s OFFSET %s',
+                (expression, limit, offset),
+            )
+            return [
+                SearchHit(
+                    news_id=news_id,
+                    comment_id=rowid // 2 if rowid % 2 else None,
+                    rank=rank,
+                )
+                for rowid, news_id, rank in cursor.fetchall()
+            ]
+
+
+class IcontainsBackend(SearchBackend):
+    """Поиск без индекса, для баз без FTS и для сравнения скорости."""
+
+    def index_news(self, news_list):
+        pass
+
+    def index_comments(self, comments):
+        pass
+
+    def remove_news(self, news_id):
+        pass
+
+    def remove_comment(self, comment_id):
+        pass
+
+    def clear(self):
+        pass
+
+    def search(self, query, limit, offset=0):
+        words = WORD_RE.findall(query)
+        if not words:
+            return []
+        news_filter = Q()
+        comment_filter = Q(status=Comment.Status.APPROVED)
+        for word in words:
+            news_filter &= Q(title__icontains=word) | Q(text__icontains=word)
+            comment_filter &= Q(text__icontains=word)
+        hits = [
+            SearchHit(news_id=pk)
+            for pk in News.objects.filter(news_filter).values_list(
+                'pk', flat=True
+            )[:offset + limit]
+        ] + [
+            SearchHit(news_id=news_id, comment_id=pk)
+            for pk, news_id in Comment.objects.filter(
+                comment_filter
+            ).values_list('pk', 'news_id')[:offset + limit]
+        ]
+        return hits[offset:offset + limit]
+
+
+@cache
+def _load_backend(path):
+    return import_string(path)()
+
+
+def get_search_backend():
+    """Бэкенд из NEWS_SEARCH_BACKEND, свой экземпляр на каждое значение."""
+    return _load_backend(settings.NEWS_SEARCH_BACKEND)
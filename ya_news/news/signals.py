@@ -0,0 +1,68 @@
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import BadWord, Comment, News
+from .moderation import bad_words
+from .page_cache import bump_data_version
+from .search import get_search_backend
+
+
+def _change_comment_count(news_id, delta):
+    News.objects.filter(pk=news_id).update(
+        comment_count=F('comment_count') + delta
+    )
+
+
+def _is_approved(status):
+    return status == Comment.Status.APPROVED
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, raw=False, **kwargs):
+    """Счётчик новости учитывает только одобренные комментарии."""
+    old_status = None if created else getattr(instance, 'loaded_status', None)
+    delta = _is_approved(instance.status) - _is_approved(old_status)
+    if delta and not raw:
+        _change_comment_count(instance.news_id, delta)
+    if _is_approved(instance.status):
+        get_search_backend().index_comments((instance,))
+    elif _is_approved(old_status):
+        get_search_backend().remove_comment(instance.pk)
+    instance.loaded_status = instance.status
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    """Удалённый одобренный комментарий уменьшает счётчик."""
+    if _is_approved(instance.status):
+        _change_comment_count(instance.news_id, -1)
+        get_search_backend().remove_comment(instance.pk)
+
+
+@receiver(post_save, sender=News)
+def news_saved(sender, instance, **kwargs):
+    """Обновляем новость в поисковом индексе."""
+    get_search_backend().index_news((instance,))
+
+
+@receiver(post_delete, sender=News)
+def news_deleted(sender, instance, **kwargs):
+    """Убираем новость из поискового индекса."""
+    get_search_backend().remove_news(instance.pk)
+
+
+@receiver(post_save, sender=News)
+@receiver(post_delete, sender=News)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def data_changed(sender, **kwargs):
+    """Сбрасываем кеш страниц для анонимных пользователей."""
+    bump_data_version()
+
+
+@receiver(post_save, sender=BadWord)
+@receiver(post_delete, sender=BadWord)
+def bad_words_changed(sender, **kwargs):
+    """Словарь изменился: автомат перестроится при следующей проверке."""
+    bad_words.invalidate()
@@ -0,0 +1,247 @@
+"""
+Загрузка лент новостей и выгрузка архива.
+
+Ленты JSON Lines, CSV и RSS читаются потоком и сохраняются пачками:
+новые новости — bulk_create, уже загруженные с тем же external_id —
+bulk_update, поэтому повторная загрузка ленты ничего не дублирует.
+Архив выгружается iterator() по chunk_size новостей, комментарии
+дочитываются одним запросом на пачку.
+"""
+import csv
+import json
+import xml.etree.ElementTree as ElementTree
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date
+from email.utils import parsedate_to_datetime
+from time import perf_counter
+from uuid import uuid4
+
+from django.db import transaction
+
+from .models import Comment, News
+from .page_cache import bump_data_version
+from .search import chunked, get_search_backend
+
+FEED_FORMATS = ('jsonl', 'csv', 'rss')
+EXPORT_FORMATS = ('jsonl', 'csv')
+FIELDS = ('external_id', 'title', 'text', 'date')
+UPDATE_FIELDS = ('title', 'text', 'date')
+CONTENT_TYPES = {
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+# Сколько ошибок разбора сохраняется в отчёте о загрузке.
+MAX_REPORTED_ERRORS = 20
+
+
+class FeedItemError(ValueError):
+    """Запись ленты не разобрана или не прошла проверку."""
+
+    def __init__(self, position, message):
+        self.position = position
+        super().__init__(f'Запись {position}: {message}')
+
+
+@dataclass
+class IngestResult:
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    skipped: int = 0
+    seconds: float = 0.0
+    errors: list = field(default_factory=list)
+
+    @property
+    def total(self):
+        return self.created + self.updated + self.unchanged + self.skipped
+
+    @property
+    def per_second(self):
+        return self.total / self.seconds if self.seconds else 0.0
+
+
+def _read_jsonl(stream):
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError:
+            yield number, FeedItemError(number, 'некорректный JSON')
+            continue
+        yield number, item
+
+
+def _read_csv(stream):
+    reader = csv.DictReader(stream)
+    for item in reader:
+        yield reader.line_num, item
+
+
+def _read_rss(stream):
+    """Элементы <item> RSS, разобранные элементы сразу удаляются."""
+    number = 0
+    parents = []
+    for event, element in ElementTree.iterparse(stream, ('start', 'end')):
+        if event == 'start':
+            parents.append(element)
+            continue
+        parents.pop()
+        if element.tag != 'item':
+            continue
+        number += 1
+        yield number, {
+            'external_id': (
+                element.findtext('guid') or element.findtext('link')
+            ),
+            'title': element.findtext('title'),
+            'text': element.findtext('description'),
+            'date': element.findtext('pubDate'),
+        }
+        if parents:
+            parents[-1].remove(element)
+
+
+READERS = {'jsonl': _read_jsonl, 'csv': _read_csv, 'rss': _read_rss}
+
+
+def parse_date(value):
+    """Дата из ISO-формата или из формата RFC 2822, принятого в RSS."""
+    value = (value or '').strip()
+    if not value:
+        return date.today()
+    try:
+        return date.fromisoformat(value[:10])
+    except ValueError:
+        pass
+    try:
+        return parsedate_to_datetime(value).date()
+    except (TypeError, ValueError):
+        raise ValueError(f'некорректная дата {value}') from None
+
+
+def build_news(position, item):
+    """Новость из записи ленты, слишком длинный заголовок обрезается."""
+    if not isinstance(item, dict):
+        raise FeedItemError(position, 'ожидается объект')
+    external_id = str(item.get('external_id') or '').strip()
+    title = str(item.get('title') or '').strip()
+    text = str(item.get('text') or '').strip()
+    if not external_id or not title or not text:
+        raise FeedItemError(position, 'нет external_id, заголовка или текста')
+    if len(external_id) > News._meta.get_field('external_id').max_length:
+        raise FeedItemError(position, 'слишком длинный external_id')
+    try:
+        news_date = parse_date(item.get('date'))
+    except ValueError as error:
+        raise FeedItemError(position, str(error)) from None
+    return News(
+        external_id=external_id,
+        title=title[:News._meta.get_field('title').max_length],
+        text=text,
+        date=news_date,
+    )
+
+
+def read_feed(stream, file_format, result):
+    """Поток новостей из ленты; ошибочные записи учитываются в result."""
+    for position, item in READERS[file_format](stream):
+        try:
+            if isinstance(item, FeedItemError):
+                raise item
+            yield build_news(position, item)
+        except FeedItemError as error:
+            result.skipped += 1
+            if len(result.errors) < MAX_REPORTED_ERRORS:
+                result.errors.append(str(error))
+
+
+def _save_batch(batch, result):
+    """Создаёт новые и обновляет изменившиеся новости пачки."""
+    incoming = {news.external_id: news for news in batch}
+    result.unchanged += len(batch) - len(incoming)
+    existing = News.objects.only(*FIELDS).in_bulk(
+        incoming, field_name='external_id'
+    )
+    changed = []
+    for external_id, stored in existing.items():
+        news = incoming.pop(external_id)
+        if all(
+            getattr(stored, name) == getattr(news, name) for name in FIELDS
+        ):
+            result.unchanged += 1
+            continue
+        for name in UPDATE_FIELDS:
+            setattr(stored, name, getattr(news, name))
+        stored.version = uuid4()
+        changed.append(stored)
+    with transaction.atomic():
+        created = News.objects.bulk_create(incoming.values())
+        News.objects.bulk_update(changed, (*UPDATE_FIELDS, 'version'))
+        get_search_backend().index_news([*created, *changed])
+        if created or changed:
+            transaction.on_commit(bump_data_version)
+    result.created += len(created)
+    result.updated += len(changed)
+
+
+def ingest_news(stream, file_format, batch_size):
+    """
+    Загружает ленту новостей пачками по batch_size.
+
+    Каждая пачка сохраняется в своей транзакции: прерванную загрузку
+    можно просто запустить заново.
+    """
+    result = IngestResult()
+    start = perf_counter()
+    for batch in chunked(read_feed(stream, file_format, result), batch_size):
+        _save_batch(batch, result)
+    result.seconds = perf_counter() - start
+    return result
+
+
+class _Echo:
+    """Файлоподобный объект для csv.writer: возвращает строку обратно."""
+
+    def write(self, value):
+        return value
+
+
+def _comments_by_news(news_ids):
+    comments = defaultdict(list)
+    for news_id, author, text, created in Comment.objects.filter(
+        news_id__in=news_ids, status=Comment.Status.APPROVED
+    ).order_by('news_id', 'created', 'id').values_list(
+        'news_id', 'author__username', 'text', 'created'
+    ):
+        comments[news_id].append({
+            'author': author, 'text': text, 'created': created.isoformat()
+        })
+    return comments
+
+
+def export_lines(file_format, chunk_size):
+    """
+    Поток строк архива новостей.
+
+    В JSON Lines у каждой новости есть список опубликованных
+    комментариев, CSV совпадает с форматом загрузки и содержит
+    только новости.
+    """
+    rows = News.objects.order_by('pk').values_list(
+        'pk', *FIELDS
+    ).iterator(chunk_size=chunk_size)
+    if file_format == 'csv':
+        writer = csv.writer(_Echo())
+        yield writer.writerow(FIELDS)
+        for _, *row in rows:
+            yield writer.writerow(row)
+        return
+    for chunk in chunked(rows, chunk_size):
+        comments = _comments_by_news([row[0] for row in chunk])
+        for pk, *row in chunk:
+            item = dict(zip(FIELDS, row))
+            item['date'] = item['date'].isoformat()
+            item['comments'] = comments.get(pk, [])
+            yield json.dumps(item, ensure_ascii=False) + '\n'
@@ -1,15 +1,48 @@
-from django.urls import path
-from news import views
+"""
+Адреса новостей с синхронными лентой и страницей новости.
+
+Асинхронные варианты — в news.urls_async, их подключает
+yanews.urls_async.
+"""
+from django.urls import path, register_converter
+from news import converters, views
 
 app_name = 'news'
 
-urlpatterns = [
-    path('', views.NewsList.as_view(), name='home'),
-    path('news/<int:pk>/', views.NewsDetailView.as_view(), name='detail'),
-    path(
-        'delete_comment/<int:pk>/',
-        views.CommentDelete.as_view(),
-        name='delete'
-    ),
-    path('edit_comment/<int:pk>/', views.CommentUpdate.as_view(), name='edit'),
-]
+register_converter(converters.CursorConverter, 'cursor')
+
+
+def news_patterns(news_list, news_detail):
+    """Адреса приложения с заданными лентой и страницей новости."""
+    return [
+        path('', news_list, name='home'),
+        path(
+            'page/<cursor:cursor>/',
+            news_list,
+            name='home_page'
+        ),
+        path('news/<int:pk>/', news_detail, name='detail'),
+        path(
+            'news/<int:pk>/comments/<cursor:cursor>/',
+            news_detail,
+            name='detail_page'
+        ),
+        path(
+            'delete_comment/<int:pk>/',
+            views.CommentDelete.as_view(),
+            name='delete'
+        ),
+        path(
+            'edit_comment/<int:pk>/',
+            views.CommentUpdate.as_view(),
+            name='edit'
+        ),
+        path('search/', views.NewsSearch.as_view(), name='search'),
+        path('ingest/', views.NewsIngest.as_view(), name='ingest'),
+        path('archive/', views.NewsArchive.as_view(), name='archive'),
+    ]
+
+
+urlpatterns = news_patterns(
+    views.NewsList.as_view(), views.NewsDetail.as_view()
+)
@@ -0,0 +1,7 @@
+"""Адреса новостей с асинхронными лентой и страницей новости."""
+from news import views
+from news.urls import app_name, news_patterns  # noqa: F401
+
+urlpatterns = news_patterns(
+    views.AsyncNewsList.as_view(), views.AsyncNewsDetail.as_view()
+)
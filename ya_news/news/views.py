@@ -1,81 +1,167 @@
+import asyncio
+import csv
+from io import TextIOWrapper
+
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from django.contrib.auth.mixins import LoginRequiredMixin
-from django.shortcuts import get_object_or_404
+from django.contrib.auth.mixins import (LoginRequiredMixin,
+                                        PermissionRequiredMixin)
+from django.contrib.auth.views import redirect_to_login
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse
 from django.views import generic
 
-from .forms import CommentForm
+from .forms import CommentForm, NewsFeedForm
 from .models import Comment, News
+from .page_cache import (AnonymousPageCacheMixin,
+                         AsyncAnonymousPageCacheMixin,
+                         anews_detail_last_modified, anews_last_modified,
+                         news_detail_last_modified, news_last_modified)
+from .pagination import KeysetPaginator
+from .search import get_search_backend
+from .transfer import CONTENT_TYPES, EXPORT_FORMATS, export_lines, ingest_news
+
+
+def news_paginator():
+    return KeysetPaginator(
+        News.objects.all(),
+        'date',
+        settings.NEWS_COUNT_ON_HOME_PAGE,
+        descending=True,
+    )
+
 
+def comments_paginator(news_id):
+    return KeysetPaginator(
+        Comment.objects.filter(
+            news_id=news_id, status=Comment.Status.APPROVED
+        ).select_related('author'),
+        'created',
+        settings.COMMENTS_COUNT_ON_DETAIL_PAGE,
+    )
 
-class NewsList(generic.ListView):
+
+class NewsList(AnonymousPageCacheMixin, generic.ListView):
     """Список новостей."""
     model = News
     template_name = 'news/home.html'
 
+    def get_last_modified(self):
+        return news_last_modified()
+
     def get_queryset(self):
         """
         Выводим только несколько последних новостей.
 
-        Их количество определяется в настройках проекта.
+        Их количество определяется в настройках проекта, следующие
+        страницы выбираются по курсору из адреса.
         """
-        return self.model.objects.prefetch_related(
-            'comment_set'
-        )[:settings.NEWS_COUNT_ON_HOME_PAGE]
+        self.page = news_paginator().page(self.kwargs.get('cursor'))
+        return self.page.object_list
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['page'] = self.page
+        return context
 
 
-class NewsDetail(generic.DetailView):
+class NewsDetail(AnonymousPageCacheMixin, generic.DetailView):
+    """
+    Страница новости с комментариями и отправка комментария.
+
+    GET и POST находят новость одним запросом и строят страницу
+    комментариев одним кодом, поэтому форма с ошибками показывается за
+    то же число запросов, что и обычная страница.
+    """
     model = News
     template_name = 'news/detail.html'
 
+    def get_last_modified(self):
+        return news_detail_last_modified(self.kwargs['pk'])
+
     def get_object(self, queryset=None):
-        obj = get_object_or_404(
-            self.model.objects.prefetch_related('comment_set__author'),
-            pk=self.kwargs['pk']
-        )
-        return obj
+        return get_object_or_404(self.model, pk=self.kwargs['pk'])
 
-    def get_context_data(self, **kwargs):
+    def get_context_data(self, form=None, **kwargs):
         context = super().get_context_data(**kwargs)
+        context['comments'] = comments_paginator(self.object.pk).page(
+            self.kwargs.get('cursor')
+        )
         if self.request.user.is_authenticated:
-            context['form'] = CommentForm()
+            context['form'] = form or CommentForm()
         return context
 
-
-class NewsComment(
-        LoginRequiredMixin,
-        generic.detail.SingleObjectMixin,
-        generic.FormView
-):
-    model = News
-    form_class = CommentForm
-    template_name = 'news/detail.html'
-
     def post(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
         self.object = self.get_object()
-        return super().post(request, *args, **kwargs)
-
-    def form_valid(self, form):
+        form = CommentForm(request.POST)
+        if not form.is_valid():
+            return self.render_to_response(self.get_context_data(form=form))
         comment = form.save(commit=False)
         comment.news = self.object
-        comment.author = self.request.user
+        comment.author = request.user
         comment.save()
-        return super().form_valid(form)
+        return redirect(reverse(
+            'news:detail', kwargs={'pk': self.object.pk}
+        ) + '#comments')
 
-    def get_success_url(self):
-        post = self.get_object()
-        return reverse('news:detail', kwargs={'pk': post.pk}) + '#comments'
 
+class AsyncNewsList(
+        AsyncAnonymousPageCacheMixin,
+        generic.base.TemplateResponseMixin,
+        generic.base.ContextMixin,
+        generic.View
+):
+    """NewsList на асинхронном ORM, для запуска под ASGI."""
+    template_name = 'news/home.html'
 
-class NewsDetailView(generic.View):
+    async def aget_last_modified(self):
+        return await anews_last_modified()
 
-    def get(self, request, *args, **kwargs):
-        view = NewsDetail.as_view()
-        return view(request, *args, **kwargs)
+    async def get(self, request, *args, **kwargs):
+        page = await news_paginator().apage(kwargs.get('cursor'))
+        return self.render_to_response(self.get_context_data(
+            object_list=page.object_list, page=page
+        ))
 
-    def post(self, request, *args, **kwargs):
-        view = NewsComment.as_view()
-        return view(request, *args, **kwargs)
+
+class AsyncNewsDetail(
+        AsyncAnonymousPageCacheMixin,
+        generic.base.TemplateResponseMixin,
+        generic.base.ContextMixin,
+        generic.View
+):
+    """
+    NewsDetail на асинхронном ORM, для запуска под ASGI.
+
+    Новость и страница её комментариев выбираются одновременно.
+    Комментарий сохраняет синхронное NewsDetail.
+    """
+    template_name = 'news/detail.html'
+    sync_view = staticmethod(NewsDetail.as_view())
+
+    async def aget_last_modified(self):
+        return await anews_detail_last_modified(self.kwargs['pk'])
+
+    async def get(self, request, *args, **kwargs):
+        try:
+            news, comments = await asyncio.gather(
+                News.objects.aget(pk=kwargs['pk']),
+                comments_paginator(kwargs['pk']).apage(kwargs.get('cursor')),
+            )
+        except News.DoesNotExist:
+            raise Http404('Новость не найдена.')
+        context = self.get_context_data(
+            object=news, news=news, comments=comments
+        )
+        if request.user.is_authenticated:
+            context['form'] = CommentForm()
+        return self.render_to_response(context)
+
+    async def post(self, request, *args, **kwargs):
+        return await sync_to_async(self.sync_view)(request, *args, **kwargs)
 
 
 class CommentBase(LoginRequiredMixin):
@@ -83,14 +169,15 @@ class CommentBase(LoginRequiredMixin):
     model = Comment
 
     def get_success_url(self):
-        comment = self.get_object()
         return reverse(
-            'news:detail', kwargs={'pk': comment.news.pk}
+            'news:detail', kwargs={'pk': self.object.news_id}
         ) + '#comments'
 
     def get_queryset(self):
         """Пользователь может работать только со своими комментариями."""
-        return self.model.objects.filter(author=self.request.user)
+        return self.model.objects.select_related('news').filter(
+            author=self.request.user
+        )
 
 
 class CommentUpdate(CommentBase, generic.UpdateView):
@@ -98,7 +185,103 @@ class CommentUpdate(CommentBase, generic.UpdateView):
     template_name = 'news/edit.html'
     form_class = CommentForm
 
+    def form_valid(self, form):
+        """Изменённый текст снова проходит модерацию."""
+        form.instance.status = Comment.Status.PENDING
+        return super().form_valid(form)
+
 
 class CommentDelete(CommentBase, generic.DeleteView):
     """Удаление комментария."""
     template_name = 'news/delete.html'
+
+
+class NewsSearch(generic.TemplateView):
+    """Поиск по новостям и комментариям."""
+    template_name = 'news/search.html'
+    # Дальние страницы не нужны читателю, а смещение для слишком большого
+    # номера не помещается в целое базы.
+    max_page = 1_000
+
+    def get_page_number(self):
+        try:
+            page_number = max(int(self.request.GET.get('page', 1)), 1)
+        except ValueError:
+            return 1
+        if page_number > self.max_page:
+            raise Http404('Такой страницы поиска нет.')
+        return page_number
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.get('q', '').strip()
+        per_page = settings.NEWS_SEARCH_RESULTS_PER_PAGE
+        page_number = self.get_page_number()
+        hits = get_search_backend().search(
+            query, limit=per_page + 1, offset=(page_number - 1) * per_page
+        ) if query else []
+        has_next = len(hits) > per_page
+        hits = hits[:per_page]
+        news = News.objects.in_bulk({hit.news_id for hit in hits})
+        comments = Comment.objects.in_bulk(
+            {hit.comment_id for hit in hits if hit.comment_id}
+        )
+        context.update({
+            'query': query,
+            'results': [
+                (news[hit.news_id], comments.get(hit.comment_id))
+                for hit in hits
+                if hit.news_id in news
+            ],
+            'page_number': page_number,
+            'has_previous': page_number > 1,
+            'has_next': has_next,
+        })
+        return context
+
+
+class NewsIngest(PermissionRequiredMixin, generic.FormView):
+    """Загрузка ленты новостей редактором."""
+    permission_required = 'news.add_news'
+    template_name = 'news/ingest.html'
+    form_class = NewsFeedForm
+
+    def form_valid(self, form):
+        file_format = form.cleaned_data['format']
+        stream = form.cleaned_data['file'].file
+        if file_format != 'rss':
+            stream = TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+        try:
+            result = ingest_news(
+                stream, file_format, settings.NEWS_TRANSFER_CHUNK_SIZE
+            )
+        except UnicodeDecodeError:
+            form.add_error('file', 'Файл должен быть в кодировке UTF-8.')
+            return self.form_invalid(form)
+        except SyntaxError as error:
+            form.add_error('file', f'Некорректный XML: {error}')
+            return self.form_invalid(form)
+        except csv.Error as error:
+            form.add_error('file', f'Некорректный CSV: {error}')
+            return self.form_invalid(form)
+        return self.render_to_response(
+            self.get_context_data(form=self.form_class(), result=result)
+        )
+
+
+class NewsArchive(PermissionRequiredMixin, generic.View):
+    """Выгрузка архива новостей с комментариями потоком."""
+    permission_required = 'news.view_news'
+
+    def get(self, request, *args, **kwargs):
+        file_format = request.GET.get('format', 'jsonl')
+        if file_format not in EXPORT_FORMATS:
+            raise Http404
+        response = StreamingHttpResponse(
+            export_lines(file_format, settings.NEWS_TRANSFER_CHUNK_SIZE),
+            content_type=CONTENT_TYPES[file_format],
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="news.{file_format}"'
+        )
+        return response
@@ -0,0 +1,115 @@
+"""
+Кеш пользователя сессии и его прав.
+
+CachedModelBackend берёт пользователя и его права из кеша, а не из базы
+на каждом авторизованном запросе. Записи удаляются сигналами, когда
+меняется пользователь (в том числе пароль, активность и last_login),
+его группы и права или права его групп. Подключается профилем
+settings_production вместе с сессиями cached_db.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+
+User = get_user_model()
+
+USER_KEY = 'auth:user:{}'
+PERMISSIONS_KEY = 'auth:permissions:{}'
+
+
+def _timeout():
+    return getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 300)
+
+
+def invalidate_users(user_ids):
+    """
+    Удаляет из кеша пользователей и их права.
+
+    В транзакции удаление повторяется после фиксации: иначе параллельный
+    запрос успел бы положить в кеш ещё не изменённого пользователя.
+    """
+    keys = [
+        key.format(pk)
+        for pk in user_ids
+        for key in (USER_KEY, PERMISSIONS_KEY)
+    ]
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, который читает пользователя и права из кеша."""
+
+    def get_user(self, user_id):
+        key = USER_KEY.format(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, _timeout())
+        return user
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if (
+            not user_obj.is_active
+            or user_obj.is_anonymous
+            or obj is not None
+            or hasattr(user_obj, '_perm_cache')
+        ):
+            return super().get_all_permissions(user_obj, obj)
+        key = PERMISSIONS_KEY.format(user_obj.pk)
+        permissions = cache.get(key)
+        if permissions is None:
+            permissions = super().get_all_permissions(user_obj)
+            cache.set(key, permissions, _timeout())
+        user_obj._perm_cache = permissions
+        return permissions
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    invalidate_users((instance.pk,))
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def user_relations_changed(sender, instance, action, reverse, pk_set,
+                           **kwargs):
+    """Группы или права пользователя, со стороны пользователя или нет."""
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        invalidate_users((instance.pk,))
+    elif pk_set is not None:
+        invalidate_users(pk_set)
+    else:
+        invalidate_users(instance.user_set.values_list('pk', flat=True))
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def group_permissions_changed(sender, instance, action, reverse, pk_set,
+                              **kwargs):
+    """Права группы меняют права всех её участников."""
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        groups = (instance.pk,)
+    elif pk_set is not None:
+        groups = pk_set
+    else:
+        groups = instance.group_set.values_list('pk', flat=True)
+    invalidate_users(
+        User.objects.filter(groups__in=groups).values_list('pk', flat=True)
+    )
+
+
+@receiver(pre_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    invalidate_users(instance.user_set.values_list('pk', flat=True))
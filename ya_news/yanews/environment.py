@@ -0,0 +1,144 @@
+"""
+Чтение настроек из переменных окружения.
+
+Функции принимают словарь окружения явно, чтобы профиль настроек можно
+было проверить без подмены os.environ.
+"""
+from urllib.parse import quote
+
+from django.core.exceptions import ImproperlyConfigured
+
+TRUE_VALUES = ('1', 'true', 'yes', 'on')
+# Сколько секунд держать соединение открытым между запросами.
+DEFAULT_CONN_MAX_AGE = 60
+READ_ALIAS = 'read'
+SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+# Отрицательный cache_size — размер в КиБ, а не в страницах.
+SQLITE_CACHE_SIZE_KIB = 64 * 1024
+SQLITE_BUSY_TIMEOUT_MS = 5000
+
+
+def env_str(environ, name, default=None):
+    value = environ.get(name, '').strip()
+    if value:
+        return value
+    if default is None:
+        raise ImproperlyConfigured(f'Не задана переменная окружения {name}.')
+    return default
+
+
+def env_bool(environ, name, default=False):
+    value = environ.get(name, '').strip()
+    if not value:
+        return default
+    return value.lower() in TRUE_VALUES
+
+
+def env_int(environ, name, default):
+    value = environ.get(name, '').strip()
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ImproperlyConfigured(
+            f'{name} должна быть целым числом, а не {value!r}.'
+        ) from None
+
+
+def env_list(environ, name, default=()):
+    value = environ.get(name, '')
+    items = [item.strip() for item in value.split(',') if item.strip()]
+    return items or list(default)
+
+
+def database_settings(environ, base_dir):
+    """
+    Настройки базы default.
+
+    Если задана POSTGRES_DB — PostgreSQL. С DB_POOL_MAX_SIZE соединения
+    берутся из пула psycopg, без него живут DB_CONN_MAX_AGE секунд и
+    проверяются перед повторным использованием. Без POSTGRES_DB остаётся
+    SQLite в SQLITE_PATH, как в настройках для разработки.
+    """
+    if not environ.get('POSTGRES_DB', '').strip():
+        return {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': env_str(
+                environ, 'SQLITE_PATH', str(base_dir / 'db.sqlite3')
+            ),
+            'CONN_MAX_AGE': env_int(
+                environ, 'DB_CONN_MAX_AGE', DEFAULT_CONN_MAX_AGE
+            ),
+            'CONN_HEALTH_CHECKS': True,
+        }
+    database = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': env_str(environ, 'POSTGRES_DB'),
+        'USER': env_str(environ, 'POSTGRES_USER', 'postgres'),
+        'PASSWORD': environ.get('POSTGRES_PASSWORD', ''),
+        'HOST': env_str(environ, 'POSTGRES_HOST', 'localhost'),
+        'PORT': env_str(environ, 'POSTGRES_PORT', '5432'),
+        'CONN_MAX_AGE': env_int(
+            environ, 'DB_CONN_MAX_AGE', DEFAULT_CONN_MAX_AGE
+        ),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {},
+    }
+    pool_size = env_int(environ, 'DB_POOL_MAX_SIZE', 0)
+    if pool_size:
+        # Пул сам проверяет и переиспользует соединения, постоянные
+        # соединения Django вместе с ним запрещены.
+        database['CONN_MAX_AGE'] = 0
+        database['OPTIONS']['pool'] = {
+            'min_size': min(env_int(environ, 'DB_POOL_MIN_SIZE', 2),
+                            pool_size),
+            'max_size': pool_size,
+            'timeout': env_int(environ, 'DB_POOL_TIMEOUT', 10),
+        }
+    return database
+
+
+def _pragmas(environ, *pragmas):
+    sizes = (
+        ('mmap_size', 'SQLITE_MMAP_SIZE', SQLITE_MMAP_SIZE, ''),
+        ('cache_size', 'SQLITE_CACHE_SIZE_KIB', SQLITE_CACHE_SIZE_KIB, '-'),
+        ('busy_timeout', 'SQLITE_BUSY_TIMEOUT_MS', SQLITE_BUSY_TIMEOUT_MS, ''),
+    )
+    return ';'.join([*pragmas, *(
+        f'PRAGMA {pragma}={sign}{env_int(environ, name, default)}'
+        for pragma, name, default, sign in sizes
+    )])
+
+
+def sqlite_performance_databases(environ, default):
+    """
+    Базы SQLite в режиме WAL: запись через default, чтение через read.
+
+    В WAL читатели не ждут писателя, synchronous=NORMAL сбрасывает журнал
+    на диск только при контрольных точках. Прагмы выполняются при
+    открытии каждого соединения. Транзакции записи берут блокировку
+    сразу (IMMEDIATE): иначе две транзакции, начавшие с чтения, не могут
+    перейти к записи и падают с «database is locked» без ожидания.
+    Соединение read открывается только для чтения и в тестах заменяется
+    соединением default.
+    """
+    default = {
+        **default,
+        'OPTIONS': {
+            **default.get('OPTIONS', {}),
+            'init_command': _pragmas(
+                environ, 'PRAGMA journal_mode=WAL', 'PRAGMA synchronous=NORMAL'
+            ),
+            'transaction_mode': 'IMMEDIATE',
+        },
+    }
+    read = {
+        **default,
+        'NAME': f'file:{quote(str(default["NAME"]))}?mode=ro',
+        'OPTIONS': {
+            'init_command': _pragmas(environ, 'PRAGMA query_only=1'),
+        },
+        'TEST': {'MIRROR': 'default'},
+    }
+    return {'default': default, READ_ALIAS: read}
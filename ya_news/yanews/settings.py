@@ -22,6 +22,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'yanews.profiling.QueryProfilingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -30,6 +31,8 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# yanews.urls_async подключает асинхронные NewsList и NewsDetail для
+# запуска под ASGI, под WSGI быстрее синхронные.
 ROOT_URLCONF = 'yanews.urls'
 
 TEMPLATES = [
@@ -79,4 +82,45 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('news:home')
 
+# Компиляция всех шаблонов из DIRS при старте процесса, см.
+# yanews.template_cache.
+TEMPLATE_WARMUP = False
+
 NEWS_COUNT_ON_HOME_PAGE = 10
+
+COMMENTS_COUNT_ON_DETAIL_PAGE = 50
+
+# Кеш страниц анонимов в кеше default, 0 отключает его. Без общего
+# бэкенда версия данных своя у каждого процесса и изменения из команд
+# (moderate_comments, ingest_news) не видны, см. news.page_cache,
+# поэтому по умолчанию он выключен.
+ANONYMOUS_PAGE_CACHE_TIMEOUT = 0
+
+BAD_WORDS_RELOAD_INTERVAL = 5
+
+MODERATION_BATCH_SIZE = 100
+
+MODERATION_MAX_LINKS = 2
+
+MODERATION_BLOCKED_DOMAINS = ()
+
+NEWS_SEARCH_BACKEND = 'news.search.SQLiteFTSBackend'
+
+NEWS_SEARCH_RESULTS_PER_PAGE = 10
+
+NEWS_TRANSFER_CHUNK_SIZE = 1000
+
+QUERY_PROFILING_BUFFER_SIZE = 1000
+
+QUERY_BUDGET_STRICT = False
+
+QUERY_BUDGETS = {
+    'news:home': 4,
+    'news:home_page': 4,
+    'news:detail': 5,
+    'news:detail_page': 5,
+    'news:edit': 6,
+    'news:delete': 6,
+    'news:search': 5,
+    'news:archive': 4,
+}
@@ -0,0 +1,70 @@
+"""
+Кеш скомпилированных шаблонов и его прогрев при старте процесса.
+
+Кеширующий загрузчик разбирает шаблон один раз на процесс, но лениво:
+первый запрос к каждой странице платит за поиск файлов и компиляцию
+её шаблона и всех подключённых в него. warm_templates компилирует все
+шаблоны из каталогов DIRS заранее, из AppConfig.ready, когда включён
+TEMPLATE_WARMUP.
+"""
+import copy
+import logging
+from pathlib import Path
+from time import perf_counter
+
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+
+logger = logging.getLogger(__name__)
+
+LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
+
+def cached_templates(templates):
+    """
+    TEMPLATES с явным кеширующим загрузчиком.
+
+    Кеш включается независимо от DEBUG, APP_DIRS заменяется загрузчиком
+    app_directories: Django не разрешает задавать их вместе.
+    """
+    templates = copy.deepcopy(templates)
+    for template in templates:
+        if template['BACKEND'] != (
+            'django.template.backends.django.DjangoTemplates'
+        ):
+            continue
+        template['APP_DIRS'] = False
+        template.setdefault('OPTIONS', {})['loaders'] = [
+            ('django.template.loaders.cached.Loader', LOADERS),
+        ]
+    return templates
+
+
+def template_names(directory):
+    """Имена всех шаблонов каталога, как их передают в get_template."""
+    directory = Path(directory)
+    return sorted(
+        path.relative_to(directory).as_posix()
+        for path in directory.rglob('*.html')
+    )
+
+
+def warm_templates():
+    """Компилирует шаблоны из DIRS, возвращает их число и время в с."""
+    start = perf_counter()
+    count = 0
+    for engine in engines.all():
+        if not isinstance(engine, DjangoTemplates):
+            continue
+        for directory in engine.engine.dirs:
+            for name in template_names(directory):
+                engine.get_template(name)
+                count += 1
+    elapsed = perf_counter() - start
+    logger.info(
+        'Прогрето шаблонов: %d за %.1f мс', count, elapsed * 1000
+    )
+    return count, elapsed
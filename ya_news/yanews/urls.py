@@ -3,9 +3,19 @@ from django.contrib.auth import views as auth_views
 from django.contrib.auth.forms import UserCreationForm
 from django.urls import include, path
 from django.views.generic import CreateView
+from yanews import profiling
 
-urlpatterns = [
-    path('', include('news.urls')),
+site_patterns = [
+    path(
+        'admin/profiling/',
+        profiling.report_page,
+        name='query_profiling',
+    ),
+    path(
+        'admin/profiling/json/',
+        profiling.report_json,
+        name='query_profiling_json',
+    ),
     path('admin/', admin.site.urls),
 ]
 
@@ -33,4 +43,6 @@ auth_urls = ([
     ),
 ], 'users')
 
-urlpatterns += [path('auth/', include(auth_urls))]
+site_patterns += [path('auth/', include(auth_urls))]
+
+urlpatterns = [path('', include('news.urls')), *site_patterns]
@@ -0,0 +1,10 @@
+"""
+Адреса проекта с асинхронными лентой и страницей новости.
+
+Подключается как ROOT_URLCONF для запуска под ASGI, см.
+NEWS_ASYNC_VIEWS в settings_production.
+"""
+from django.urls import include, path
+from yanews.urls import site_patterns
+
+urlpatterns = [path('', include('news.urls_async')), *site_patterns]
@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class NotesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'notes'
+
+    def ready(self):
+        from yanote import auth  # noqa: F401
+
+        from . import signals  # noqa: F401
+
+        if settings.TEMPLATE_WARMUP:
+            from yanote.template_cache import warm_templates
+
+            warm_templates()
@@ -1,8 +1,8 @@
 from django import forms
 from django.core.exceptions import ValidationError
-from pytils.translit import slugify
 
 from .models import Note
+from .transfer import FORMATS
 
 WARNING = ' - такой slug уже существует, придумайте уникальное значение!'
 
@@ -15,14 +15,36 @@ class NoteForm(forms.ModelForm):
         fields = ('title', 'text', 'slug')
 
     def clean_slug(self):
-        """Обрабатывает случай, если slug не уникален."""
+        """
+        Обрабатывает случай, если slug не уникален.
+
+        Пустой slug выдаёт модель при сохранении, подбирая суффикс.
+        Прежний slug заметки уникален по индексу, его не проверяем.
+        """
         cleaned_data = super().clean()
         slug = cleaned_data.get('slug')
-        if not slug:
-            title = cleaned_data.get('title')
-            slug = slugify(title)[:100]
+        if not slug or slug == self.instance.slug:
+            return slug
         if Note.objects.filter(
                 slug=slug
         ).exclude(id=self.instance.pk).exists():
             raise ValidationError(slug + WARNING)
         return slug
+
+    def validate_unique(self):
+        """Уникальность slug уже проверена в clean_slug."""
+        exclude = self._get_validation_exclusions() | {'slug'}
+        try:
+            self.instance.validate_unique(exclude=exclude)
+        except ValidationError as error:
+            self._update_errors(error)
+
+
+class NoteImportForm(forms.Form):
+    """Форма загрузки файла с заметками."""
+
+    file = forms.FileField(label='Файл')
+    format = forms.ChoiceField(
+        label='Формат',
+        choices=[(file_format, file_format) for file_format in FORMATS],
+    )
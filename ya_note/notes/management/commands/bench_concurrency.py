@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.test import Client
+from django.urls import reverse
+from yanote.benchmark import Task, format_concurrent, run_concurrent
+
+from notes.models import Note
+
+from .seed import USERNAME_PREFIX
+
+BENCH_TEXT = 'Заметка нагрузочного замера'
+
+
+class Command(BaseCommand):
+    help = (
+        'Смешанная нагрузка на список и страницы заметок из многих потоков '
+        'через WSGI-приложение. Сравнивает базы и профили настроек: '
+        'запускайте с нужным DJANGO_SETTINGS_MODULE на заполненной базе. '
+        'Созданные заметки удаляются после прогона.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=50)
+        parser.add_argument('--duration', type=float, default=10)
+        parser.add_argument(
+            '--write-share', type=float, default=0.1,
+            help='Доля запросов, которые создают заметки.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        note = Note.objects.filter(
+            author__username__startswith=USERNAME_PREFIX
+        ).select_related('author').order_by('-pk').first()
+        if note is None:
+            raise CommandError('База пуста, сначала запустите seed.')
+        client = Client()
+        client.force_login(note.author)
+        cookies = {
+            settings.SESSION_COOKIE_NAME:
+                client.cookies[settings.SESSION_COOKIE_NAME].value
+        }
+        detail_urls = [
+            reverse('notes:detail', args=(slug,))
+            for slug in Note.objects.filter(author=note.author)
+            .values_list('slug', flat=True)[:100]
+        ]
+        reads = 1 - options['write_share']
+        tasks = [
+            Task('list', [reverse('notes:list')], reads / 2, cookies=cookies),
+            Task('detail', detail_urls, reads / 2, cookies=cookies),
+            Task(
+                'add POST', [reverse('notes:add')], options['write_share'],
+                method='post',
+                data={'title': 'Список покупок', 'text': BENCH_TEXT},
+                cookies=cookies,
+            ),
+        ]
+        self.stdout.write(
+            f'{settings.DATABASES["default"]["ENGINE"]}, '
+            f'потоков: {options["workers"]}'
+        )
+        try:
+            results = run_concurrent(
+                get_wsgi_application(), tasks, options['workers'],
+                options['duration'], 'localhost', options['seed'],
+            )
+        finally:
+            Note.objects.filter(
+                author=note.author, text=BENCH_TEXT
+            ).delete()
+        self.stdout.write(format_concurrent(results))
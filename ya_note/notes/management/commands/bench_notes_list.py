@@ -0,0 +1,67 @@
+import tracemalloc
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.test import Client
+from django.urls import reverse
+
+from notes.models import Note
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает полный список заметок с полными строками и '
+        'постраничный список без текста: время, память и размер ответа. '
+        'Данные создаются в транзакции и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--counts', type=int, nargs='+', default=(100, 1_000, 10_000)
+        )
+        parser.add_argument('--text-size', type=int, default=5_000)
+
+    def handle(self, *args, **options):
+        for count in options['counts']:
+            with transaction.atomic():
+                author = User.objects.create(username='bench-list')
+                Note.objects.bulk_create(
+                    (
+                        Note(
+                            title=f'Заметка {index}',
+                            text='т' * options['text_size'],
+                            slug=f'bench-list-{index}',
+                            author=author,
+                        )
+                        for index in range(count)
+                    ),
+                    batch_size=1_000,
+                )
+                self.report(count, 'весь список', lambda: render_to_string(
+                    'notes/list.html',
+                    {'object_list': Note.objects.filter(author=author)},
+                ).encode())
+                client = Client()
+                client.force_login(author)
+                url = reverse('notes:list')
+                self.report(
+                    count, 'страница', lambda: client.get(url).content
+                )
+                transaction.set_rollback(True)
+
+    def report(self, count, title, render):
+        tracemalloc.start()
+        start = perf_counter()
+        content = render()
+        elapsed = (perf_counter() - start) * 1000
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self.stdout.write(
+            f'{count} заметок, {title}: {elapsed:.1f} мс, '
+            f'{len(content)} байт, пик памяти {peak // 1024} КБ'
+        )
@@ -0,0 +1,94 @@
+import random
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from notes.models import Note
+from notes.search import IcontainsBackend, SQLiteFTSBackend
+
+from .seed import Vocabulary, zipf_weights
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает поиск по заметкам пользователя через FTS5 и icontains. '
+        'Данные для замера создаются в транзакции и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10_000)
+        parser.add_argument('--notes', type=int, default=1_000_000)
+        parser.add_argument('--queries', type=int, default=200)
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.compare(options)
+            transaction.set_rollback(True)
+
+    def compare(self, options):
+        rng = random.Random(options['seed'])
+        vocabulary = Vocabulary(rng, 5_000, min_length=4)
+        user_ids = self.fill(options, vocabulary, rng)
+        call_command('rebuild_notes_index', stdout=self.stdout)
+        heaviest = Note.objects.filter(author_id=user_ids[0]).count()
+        self.stdout.write(f'Заметок у самого активного автора: {heaviest}')
+        authors = rng.choices(
+            user_ids,
+            cum_weights=zipf_weights(len(user_ids)),
+            k=options['queries'],
+        )
+        queries = [
+            (author_id, rng.choice(vocabulary.words)) for author_id in authors
+        ]
+        for backend in (SQLiteFTSBackend(), IcontainsBackend()):
+            timings = []
+            for author_id, query in queries:
+                start = perf_counter()
+                backend.search(author_id, query, limit=20)
+                timings.append((perf_counter() - start) * 1000)
+            timings.sort()
+            self.stdout.write(
+                f'{type(backend).__name__}: '
+                f'p50 {timings[len(timings) // 2]:.2f} мс, '
+                f'p99 {timings[int(len(timings) * 0.99)]:.2f} мс'
+            )
+
+    def fill(self, options, vocabulary, rng):
+        """Дозаполняет базу пользователями и заметками."""
+        batch_size = options['batch_size']
+        existing = User.objects.filter(username__startswith='bench').count()
+        User.objects.bulk_create(
+            (
+                User(username=f'bench-{index}')
+                for index in range(existing, options['users'])
+            ),
+            batch_size=batch_size,
+        )
+        user_ids = list(
+            User.objects.filter(username__startswith='bench')
+            .order_by('pk').values_list('pk', flat=True)
+        )
+        weights = zipf_weights(len(user_ids))
+        existing = Note.objects.count()
+        for start in range(existing, options['notes'], batch_size):
+            stop = min(start + batch_size, options['notes'])
+            authors = rng.choices(
+                user_ids, cum_weights=weights, k=stop - start
+            )
+            Note.objects.bulk_create(
+                Note(
+                    title=vocabulary.text(3),
+                    text=vocabulary.text(40),
+                    slug=f'bench-{index}',
+                    author_id=author_id,
+                )
+                for index, author_id in zip(range(start, stop), authors)
+            )
+        return user_ids
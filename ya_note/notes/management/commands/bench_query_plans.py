@@ -0,0 +1,88 @@
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from notes.models import Note
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает план запроса списка заметок пользователя без индекса '
+        '(author, id) и с ним. Данные и удаление индексов откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1_000)
+        parser.add_argument('--notes', type=int, default=1_000_000)
+        parser.add_argument('--batch-size', type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        # Схему SQLite меняют только без проверки внешних ключей, а
+        # внутри транзакции PRAGMA foreign_keys уже не действует.
+        connection.disable_constraint_checking()
+        try:
+            with transaction.atomic():
+                self.compare(options)
+                transaction.set_rollback(True)
+        finally:
+            connection.enable_constraint_checking()
+
+    def compare(self, options):
+        self.fill(options['users'], options['notes'], options['batch_size'])
+        author = User.objects.filter(username__startswith='bench').first()
+        queryset = Note.objects.filter(author=author).order_by('pk')
+        with connection.schema_editor() as editor:
+            for index in Note._meta.indexes:
+                editor.remove_index(Note, index)
+        try:
+            self.report('Без индексов', queryset)
+        finally:
+            with connection.schema_editor() as editor:
+                for index in Note._meta.indexes:
+                    editor.add_index(Note, index)
+        self.report('С индексами', queryset)
+
+    def fill(self, users_count, notes_count, batch_size):
+        """Дозаполняет базу до нужного количества строк."""
+        missing = users_count - User.objects.filter(
+            username__startswith='bench'
+        ).count()
+        User.objects.bulk_create(
+            (User(username=f'bench-{i}') for i in range(missing)),
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+        user_ids = list(
+            User.objects.filter(username__startswith='bench')
+            .values_list('pk', flat=True)
+        )
+        existing = Note.objects.count()
+        for start in range(existing, notes_count, batch_size):
+            Note.objects.bulk_create(
+                Note(
+                    title=f'Заметка {i}',
+                    text='Текст',
+                    slug=f'bench-{i}',
+                    author_id=user_ids[i % len(user_ids)],
+                )
+                for i in range(start, min(start + batch_size, notes_count))
+            )
+
+    def best_time(self, queryset, repeat=5):
+        """Лучшее время выполнения запроса в миллисекундах."""
+        timings = []
+        for _ in range(repeat):
+            start = perf_counter()
+            list(queryset.all())
+            timings.append((perf_counter() - start) * 1000)
+        return min(timings)
+
+    def report(self, title, queryset):
+        self.stdout.write(self.style.MIGRATE_HEADING(title))
+        elapsed = self.best_time(queryset)
+        self.stdout.write(f'Заметки автора: {elapsed:.2f} мс')
+        self.stdout.write(queryset.explain())
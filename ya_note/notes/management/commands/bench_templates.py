@@ -0,0 +1,47 @@
+import random
+
+from django.core.management.base import CommandError
+from django.db import transaction
+from yanote.benchmark import (BenchmarkError, format_template_results,
+                              reset_templates, run_template_scenario)
+from yanote.template_cache import warm_templates
+
+from notes.models import Note
+
+from .bench_urls import Command as UrlsCommand
+
+
+class Command(UrlsCommand):
+    help = (
+        'Время загрузки и отрисовки шаблонов на GET-адресах bench_urls: '
+        'с пустым кешем шаблонов перед каждым запросом и с прогретым, '
+        'а также время прогрева всех шаблонов при старте. Изменения '
+        'откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        if not Note.objects.exists():
+            raise CommandError('База пуста, сначала запустите seed.')
+        self.rng = random.Random(options['seed'])
+        reset_templates()
+        count, elapsed = warm_templates()
+        self.stdout.write(
+            f'Прогрев: {count} шаблонов за {elapsed * 1000:.1f} мс'
+        )
+        with transaction.atomic():
+            try:
+                results = [
+                    run_template_scenario(scenario, options['requests'])
+                    for scenario in self.scenarios(options['requests'])
+                    if scenario.method == 'get'
+                ]
+            except BenchmarkError as error:
+                raise CommandError(str(error)) from error
+            transaction.set_rollback(True)
+        self.stdout.write(format_template_results(
+            [result for result in results if result.cold_ms]
+        ))
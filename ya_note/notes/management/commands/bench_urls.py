@@ -0,0 +1,148 @@
+import random
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+from yanote.benchmark import (BenchmarkError, Scenario, format_results,
+                              load_results, run_scenario, save_results)
+
+from notes.models import Note
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Прогоняет все адреса notes/urls.py через тестовый клиент: '
+        'p50/p99, запросы и пропускная способность. Сначала заполните '
+        'базу командой seed. Изменения откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=1)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--json', help='Куда сохранить результаты.')
+        parser.add_argument(
+            '--compare', help='Результаты прошлого прогона для сравнения.'
+        )
+
+    def handle(self, *args, **options):
+        if not Note.objects.exists():
+            raise CommandError('База пуста, сначала запустите seed.')
+        self.rng = random.Random(options['seed'])
+        baseline = load_results(options['compare']) if options[
+            'compare'
+        ] else None
+        with transaction.atomic():
+            try:
+                results = [
+                    run_scenario(
+                        scenario, options['requests'], options['warmup']
+                    )
+                    for scenario in self.scenarios(options['requests'])
+                ]
+            except BenchmarkError as error:
+                raise CommandError(str(error)) from error
+            transaction.set_rollback(True)
+        self.stdout.write(format_results(results, baseline))
+        if options['json']:
+            save_results(options['json'], results)
+
+    def client(self, user=None):
+        client = Client()
+        if user is not None:
+            client.force_login(user)
+        return client
+
+    def authors(self):
+        """Самый активный автор и автор с типичным числом заметок."""
+        counts = list(
+            Note.objects.values('author').annotate(total=Count('pk'))
+            .order_by('-total').values_list('author', flat=True)
+        )
+        return (
+            User.objects.get(pk=counts[0]),
+            User.objects.get(pk=counts[len(counts) // 2]),
+        )
+
+    def note_urls(self, author, name, count):
+        slugs = list(
+            Note.objects.filter(author=author).values_list('slug', flat=True)
+        )
+        return [
+            reverse(name, args=(slug,))
+            for slug in self.rng.choices(slugs, k=count)
+        ]
+
+    def search_urls(self, author, count):
+        titles = Note.objects.filter(author=author).values_list(
+            'title', flat=True
+        )[:count]
+        return [
+            f'{reverse("notes:list")}?q={title.split()[0]}'
+            for title in titles
+        ]
+
+    def list_scenarios(self, name, author):
+        client = self.client(author)
+        url = reverse('notes:list')
+        return [
+            Scenario(f'list ({name})', [url], client),
+            Scenario(
+                f'list по названию ({name})', [f'{url}?sort=title'], client
+            ),
+            Scenario(
+                f'list поиск ({name})', self.search_urls(author, 50), client
+            ),
+        ]
+
+    def scenarios(self, requests):
+        heavy, typical = self.authors()
+        client = self.client(typical)
+        edit_urls = self.note_urls(typical, 'notes:edit', requests)
+        note = Note.objects.filter(author=typical).first()
+        return [
+            Scenario('home', [reverse('notes:home')], self.client()),
+            *self.list_scenarios('активный', heavy),
+            *self.list_scenarios('типичный', typical),
+            Scenario('add', [reverse('notes:add')], client),
+            Scenario(
+                'add POST', [reverse('notes:add')], client, method='post',
+                data={'title': 'Список покупок', 'text': 'Молоко'},
+            ),
+            Scenario(
+                'detail',
+                self.note_urls(typical, 'notes:detail', requests),
+                client,
+            ),
+            Scenario('edit', edit_urls, client),
+            Scenario(
+                'edit POST',
+                [reverse('notes:edit', args=(note.slug,))],
+                client,
+                method='post',
+                data={
+                    'title': note.title,
+                    'text': 'Новый текст',
+                    'slug': note.slug,
+                },
+            ),
+            Scenario(
+                'delete',
+                self.note_urls(typical, 'notes:delete', requests),
+                client,
+            ),
+            Scenario('success', [reverse('notes:success')], client),
+            Scenario('import', [reverse('notes:import')], client),
+            Scenario('export (типичный)', [
+                reverse('notes:export')
+            ], client),
+            Scenario(
+                'export (активный)', [reverse('notes:export')],
+                self.client(heavy), requests=3,
+            ),
+        ]
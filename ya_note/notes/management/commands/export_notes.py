@@ -0,0 +1,37 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.transfer import FORMATS, export_lines
+
+
+class Command(BaseCommand):
+    help = 'Выгружает заметки пользователя в JSON Lines или CSV.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('--format', choices=FORMATS, default='jsonl')
+        parser.add_argument(
+            '--output', help='Файл для выгрузки, по умолчанию stdout.'
+        )
+        parser.add_argument('--chunk-size', type=int, default=2_000)
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.filter(
+            username=options['username']
+        ).first()
+        if user is None:
+            raise CommandError(
+                f'Пользователь {options["username"]} не найден.'
+            )
+        lines = export_lines(
+            user.note_set.all(), options['format'], options['chunk_size']
+        )
+        if options['output'] is None:
+            sys.stdout.writelines(lines)
+            return
+        with open(
+            options['output'], 'w', encoding='utf-8', newline=''
+        ) as output:
+            output.writelines(lines)
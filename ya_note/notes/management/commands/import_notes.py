@@ -0,0 +1,47 @@
+import csv
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+from notes.transfer import (FORMATS, SLUG_CONFLICT, NoteImportError,
+                            import_notes)
+
+
+class Command(BaseCommand):
+    help = 'Загружает заметки пользователя из JSON Lines или CSV.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument('--batch-size', type=int, default=1_000)
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.filter(
+            username=options['username']
+        ).first()
+        if user is None:
+            raise CommandError(
+                f'Пользователь {options["username"]} не найден.'
+            )
+        path = options['path']
+        file_format = options['format'] or (
+            'csv' if path.endswith('.csv') else 'jsonl'
+        )
+        start = perf_counter()
+        try:
+            with open(path, encoding='utf-8-sig', newline='') as lines:
+                count = import_notes(
+                    user, lines, file_format, options['batch_size']
+                )
+        except (
+            OSError, NoteImportError, UnicodeDecodeError, csv.Error
+        ) as error:
+            raise CommandError(str(error)) from error
+        except IntegrityError as error:
+            raise CommandError(SLUG_CONFLICT) from error
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено заметок: {count} за {perf_counter() - start:.1f} с'
+        ))
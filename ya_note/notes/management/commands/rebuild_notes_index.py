@@ -0,0 +1,32 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from notes.models import Note
+from notes.search import chunked, get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает поисковый индекс заметок.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2_000)
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        backend = get_search_backend()
+        start = perf_counter()
+        count = 0
+        with transaction.atomic():
+            backend.clear()
+            notes = Note.objects.only(
+                'pk', 'author_id', 'title', 'text'
+            ).order_by('pk').iterator(chunk_size=chunk_size)
+            for chunk in chunked(notes, chunk_size):
+                backend.index_notes(chunk)
+                count += len(chunk)
+        self.stdout.write(self.style.SUCCESS(
+            f'Проиндексировано заметок: {count} '
+            f'за {perf_counter() - start:.1f} с'
+        ))
@@ -0,0 +1,143 @@
+import random
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from notes.models import Note
+
+User = get_user_model()
+
+ALPHABET = 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
+# Заголовки, которые пользователи повторяют чаще всего.
+COMMON_TITLES = (
+    'Список покупок', 'Идеи', 'Встреча', 'План на неделю', 'Книги',
+    'Фильмы', 'Рецепт', 'Пароли от Wi-Fi', 'Дела', 'Заметка',
+)
+USERNAME_PREFIX = 'seed-'
+PASSWORD = 'seed-password'
+
+
+def zipf_weights(count):
+    """Накопленные веса: первые элементы выбираются чаще всего."""
+    total = 0.0
+    weights = []
+    for rank in range(1, count + 1):
+        total += 1 / rank
+        weights.append(total)
+    return weights
+
+
+def random_words(rng, count, min_length=3, max_length=10):
+    """Список из count случайных слов из букв ALPHABET."""
+    return [
+        ''.join(rng.choices(ALPHABET, k=rng.randint(min_length, max_length)))
+        for _ in range(count)
+    ]
+
+
+class Vocabulary:
+    """Словарь случайных слов с частотами по закону Ципфа."""
+
+    def __init__(self, rng, size=20_000, min_length=3, max_length=10):
+        self.rng = rng
+        self.words = random_words(rng, size, min_length, max_length)
+        self.weights = zipf_weights(size)
+
+    def text(self, count):
+        """Текст из count слов с частотами, как в живом тексте."""
+        return ' '.join(self.rng.choices(
+            self.words, cum_weights=self.weights, k=count
+        ))
+
+
+class Command(BaseCommand):
+    help = (
+        'Дозаполняет базу пользователями и заметками для нагрузочных '
+        'замеров. Запускайте на отдельной базе.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10_000)
+        parser.add_argument('--notes', type=int, default=500_000)
+        parser.add_argument(
+            '--common-titles', type=float, default=0.2,
+            help='Доля заметок с частыми одинаковыми заголовками.',
+        )
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.vocabulary = Vocabulary(self.rng)
+        for name, fill in (
+            ('пользователей', lambda: self.fill_users(options['users'])),
+            ('заметок', lambda: self.fill_notes(
+                options['notes'], options['common_titles']
+            )),
+        ):
+            start = perf_counter()
+            created = fill()
+            elapsed = perf_counter() - start
+            self.stdout.write(
+                f'Создано {name}: {created} за {elapsed:.1f} с '
+                f'({created / elapsed if elapsed else 0:.0f} в секунду)'
+            )
+        call_command('rebuild_notes_index', stdout=self.stdout)
+
+    def fill_users(self, count):
+        existing = User.objects.filter(
+            username__startswith=USERNAME_PREFIX
+        ).count()
+        # Один хеш на всех: хеширование пароля дороже самой вставки.
+        password = make_password(PASSWORD)
+        User.objects.bulk_create(
+            (
+                User(username=f'{USERNAME_PREFIX}{index}', password=password)
+                for index in range(existing, count)
+            ),
+            batch_size=self.batch_size,
+        )
+        return max(count - existing, 0)
+
+    def title(self, common_share):
+        if self.rng.random() < common_share:
+            return self.rng.choice(COMMON_TITLES)
+        return self.vocabulary.text(self.rng.randint(1, 5))[:100]
+
+    def fill_notes(self, count, common_share):
+        """
+        Заметки: у активных авторов их на порядки больше.
+
+        Число заметок у автора убывает по закону Ципфа: первый автор —
+        самый активный. slug уникальны по номеру, без подбора.
+        """
+        existing = Note.objects.count()
+        user_ids = list(
+            User.objects.filter(username__startswith=USERNAME_PREFIX)
+            .order_by('pk').values_list('pk', flat=True)
+        )
+        weights = zipf_weights(len(user_ids))
+        rng = self.rng
+        for start in range(existing, count, self.batch_size):
+            stop = min(start + self.batch_size, count)
+            Note.objects.bulk_create(
+                Note(
+                    title=self.title(common_share),
+                    text=self.vocabulary.text(
+                        int(rng.lognormvariate(3.5, 1)) + 1
+                    ),
+                    slug=f'seed-{index}',
+                    author_id=author_id,
+                )
+                for index, author_id in zip(
+                    range(start, stop),
+                    rng.choices(
+                        user_ids, cum_weights=weights, k=stop - start
+                    ),
+                )
+            )
+        return max(count - existing, 0)
@@ -0,0 +1,31 @@
+from django.db import migrations
+
+
+def create_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        'CREATE VIRTUAL TABLE IF NOT EXISTS notes_search USING fts5('
+        'author, title, text, '
+        "tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    schema_editor.execute(
+        'INSERT INTO notes_search (rowid, author, title, text) '
+        "SELECT id, 'u' || author_id, title, text FROM notes_note"
+    )
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS notes_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0002_author_id_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
@@ -1,6 +1,55 @@
 from django.conf import settings
-from django.db import models
-from pytils.translit import slugify
+from django.db import IntegrityError, models, transaction
+
+from .slugs import allocate_slugs
+
+# Сколько раз заново выдавать slug, если его успели занять.
+SLUG_ATTEMPTS = 5
+
+
+class NoteQuerySet(models.QuerySet):
+
+    def allocate_slugs(self, notes):
+        """
+        Выдаёт свободные slug заметкам, у которых его нет.
+
+        Явные slug остальных заметок считаются занятыми.
+        """
+        reserved = {note.slug for note in notes if note.slug}
+        notes = [note for note in notes if not note.slug]
+        max_length = self.model._meta.get_field('slug').max_length
+        slugs = allocate_slugs(
+            self, [note.title for note in notes], max_length, reserved
+        )
+        for note, slug in zip(notes, slugs):
+            note.slug = slug
+
+    def bulk_create_with_slugs(self, notes, batch_size=None):
+        """
+        Массовое создание заметок с выдачей slug.
+
+        bulk_create не отправляет сигналы, поэтому заметки
+        добавляются в поисковый индекс и сбрасывают кеш авторов здесь же.
+        """
+        from .note_cache import invalidate_authors
+        from .search import get_search_backend
+
+        notes = list(notes)
+        generated = [note for note in notes if not note.slug]
+        for attempt in range(SLUG_ATTEMPTS):
+            self.allocate_slugs(notes)
+            try:
+                with transaction.atomic():
+                    created = self.bulk_create(notes, batch_size=batch_size)
+                    get_search_backend().index_notes(created)
+                    invalidate_authors(note.author_id for note in created)
+                return created
+            except IntegrityError:
+                if not generated or attempt == SLUG_ATTEMPTS - 1:
+                    raise
+                for note in generated:
+                    note.slug = ''
+                    note.pk = None
 
 
 class Note(models.Model):
@@ -27,11 +76,46 @@ class Note(models.Model):
         on_delete=models.CASCADE,
     )
 
+    objects = NoteQuerySet.as_manager()
+
+    class Meta:
+        indexes = (
+            models.Index(fields=('author', 'id'), name='note_author_id_idx'),
+            models.Index(
+                fields=('author', 'title', 'id'), name='note_author_title_idx'
+            ),
+        )
+
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        note = super().from_db(db, field_names, values)
+        # Если заметку передадут другому автору, кеш прежнего тоже сбросят.
+        note.loaded_author_id = note.__dict__.get('author_id')
+        return note
+
     def save(self, *args, **kwargs):
-        if not self.slug:
-            max_slug_length = self._meta.get_field('slug').max_length
-            self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+        """
+        Пустой slug выдаётся из заголовка с суффиксом при совпадении.
+
+        Если slug успели занять между выдачей и вставкой, уникальный
+        индекс отклоняет вставку и slug выдаётся заново.
+        """
+        if self.slug:
+            super().save(*args, **kwargs)
+        else:
+            queryset = Note.objects.exclude(pk=self.pk)
+            for attempt in range(SLUG_ATTEMPTS):
+                queryset.allocate_slugs((self,))
+                try:
+                    with transaction.atomic():
+                        super().save(*args, **kwargs)
+                    break
+                except IntegrityError:
+                    if attempt == SLUG_ATTEMPTS - 1:
+                        raise
+                    self.slug = ''
+        # Автор уже сохранён: при следующей передаче сбросят кеш его.
+        self.loaded_author_id = self.author_id
@@ -0,0 +1,133 @@
+"""
+Кеш заметок автора по slug.
+
+Заметки хранятся в LRU процесса на NOTES_CACHE_SIZE записей, ключ —
+автор, версия его заметок и slug. Любое изменение заметок автора
+выдаёт ему новую версию, старые записи больше не читаются и со
+временем вытесняются. Так устаревает и запись по прежнему slug
+переименованной заметки.
+
+Без NOTES_CACHE_ALIAS версии хранятся в процессе, и кеш верен только
+при одном процессе. С ним версии и вторая копия заметок лежат в
+указанном кеше Django: при общем бэкенде изменение в одном процессе
+видят все, а промах LRU в одном процессе не идёт в базу, если заметку
+уже загрузил другой.
+"""
+import copy
+import itertools
+import threading
+from collections import OrderedDict
+from time import time as now
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from .models import Note
+
+NOTE_KEY = 'notes:note:{}:{}:{}'
+VERSION_KEY = 'notes:version:{}'
+
+
+class LRUCache:
+    """Словарь, который вытесняет давно не читанные записи."""
+
+    def __init__(self):
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            value = self.data.get(key)
+            if value is not None:
+                self.data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.data[key] = value
+            self.data.move_to_end(key)
+            while len(self.data) > settings.NOTES_CACHE_SIZE:
+                self.data.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+
+
+notes = LRUCache()
+local_versions = {}
+local_counter = itertools.count(1)
+
+
+def _shared():
+    alias = settings.NOTES_CACHE_ALIAS
+    return caches[alias] if alias else None
+
+
+def get_version(author_id):
+    """Текущая версия заметок автора."""
+    shared = _shared()
+    if shared is None:
+        return local_versions.get(author_id, 0)
+    key = VERSION_KEY.format(author_id)
+    version = shared.get(key)
+    if version is None:
+        shared.add(key, now(), None)
+        version = shared.get(key)
+    return version
+
+
+def _bump(author_ids):
+    shared = _shared()
+    if shared is None:
+        for author_id in author_ids:
+            local_versions[author_id] = next(local_counter)
+    else:
+        version = now()
+        shared.set_many(
+            {VERSION_KEY.format(pk): version for pk in author_ids}, None
+        )
+
+
+def invalidate_authors(author_ids):
+    """
+    Сбрасывает кеш заметок авторов.
+
+    В транзакции сброс повторяется после фиксации: иначе параллельный
+    запрос успел бы положить в кеш ещё не изменённую заметку.
+    """
+    author_ids = set(author_ids)
+    if not author_ids:
+        return
+    _bump(author_ids)
+    transaction.on_commit(lambda: _bump(author_ids))
+
+
+def get_note(author_id, slug):
+    """Копия заметки автора или None; база — только при промахе."""
+    if not settings.NOTES_CACHE_SIZE:
+        return Note.objects.filter(author_id=author_id, slug=slug).first()
+    key = NOTE_KEY.format(author_id, get_version(author_id), slug)
+    note = notes.get(key)
+    if note is None:
+        shared = _shared()
+        if shared is not None:
+            note = shared.get(key)
+        if note is None:
+            note = Note.objects.filter(
+                author_id=author_id, slug=slug
+            ).first()
+            if note is None:
+                return None
+            if shared is not None:
+                shared.set(key, note)
+        notes.set(key, note)
+    # Представления меняют заметку, например UpdateView — полями формы.
+    return copy.copy(note)
+
+
+def clear():
+    """Очищает кеш процесса, общий кеш устаревает сменой версий."""
+    notes.clear()
+    local_versions.clear()
@@ -0,0 +1,137 @@
+"""
+Полнотекстовый поиск по заметкам пользователя.
+
+Бэкенд выбирается настройкой NOTES_SEARCH_BACKEND, индекс обновляется
+сигналами Note и целиком перестраивается командой rebuild_notes_index.
+"""
+import re
+from abc import ABC, abstractmethod
+from functools import cache
+from itertools import islice
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from .models import Note
+
+WORD_RE = re.compile(r'\w+')
+
+
+def chunked(iterable, size):
+    """Разбивает поток на списки длиной не больше size."""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class SearchBackend(ABC):
+    """Интерфейс бэкенда поиска."""
+
+    @abstractmethod
+    def index_notes(self, notes):
+        """Добавляет или обновляет заметки в индексе."""
+
+    @abstractmethod
+    def remove_note(self, note_id):
+        """Убирает заметку из индекса."""
+
+    @abstractmethod
+    def clear(self):
+        """Очищает индекс."""
+
+    @abstractmethod
+    def search(self, author_id, query, limit, offset=0):
+        """Возвращает pk заметок автора, от самых релевантных."""
+
+
+class SQLiteFTSBackend(SearchBackend):
+    """
+    Индекс в виртуальной таблице FTS5 notes_search, rowid — pk заметки.
+
+    Автор хранится в индексируемой колонке токеном «u<id>», поэтому
+    ограничение по автору — пересечение списков вхождений внутри FTS,
+    а не фильтрация всех найденных заметок.
+    """
+
+    table = 'notes_search'
+
+    def index_notes(self, notes):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT OR REPLACE INTO {self.table} '
+                '(rowid, author, title, text) VALUES (%s, %s, %s, %s)',
+                (
+                    (note.pk, f'u{note.author_id}', note.title, note.text)
+                    for note in notes
+                ),
+            )
+
+    def remove_note(self, note_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {self.table} WHERE rowid = %s', (note_id,)
+            )
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+
+    @staticmethod
+    def match_expression(author_id, query):
+        """Автор и слова запроса, последнее слово ищется как префикс."""
+        words = WORD_RE.findall(query)
+        if not words:
+            return None
+        terms = ' '.join(f'"{word}"' for word in words) + '*'
+        return f'author : "u{author_id}" AND {{title text}} : ({terms})'
+
+    def search(self, author_id, query, limit, offset=0):
+        expression = self.match_expression(author_id, query)
+        if expression is None:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s '
+                f'ORDER BY bm25({self.table}, 0, 10.0, 1.0) '
+                'LIMIT %s OFFSET %s',
+                (expression, limit, offset),
+            )
+            return [rowid for rowid, in cursor.fetchall()]
+
+
+class IcontainsBackend(SearchBackend):
+    """Поиск без индекса, для баз без FTS и для сравнения скорости."""
+
+    def index_notes(self, notes):
+        pass
+
+    def remove_note(self, note_id):
+        pass
+
+    def clear(self):
+        pass
+
+    def search(self, author_id, query, limit, offset=0):
+        words = WORD_RE.findall(query)
+        if not words:
+            return []
+        condition = Q(author_id=author_id)
+        for word in words:
+            condition &= Q(title__icontains=word) | Q(text__icontains=word)
+        return list(
+            Note.objects.filter(condition).order_by('pk').values_list(
+                'pk', flat=True
+            )[offset:offset + limit]
+        )
+
+
+@cache
+def _load_backend(path):
+    return import_string(path)()
+
+
+def get_search_backend():
+    """Бэкенд из NOTES_SEARCH_BACKEND, свой экземпляр на каждое значение."""
+    return _load_backend(settings.NOTES_SEARCH_BACKEND)
@@ -0,0 +1,26 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Note
+from .note_cache import invalidate_authors
+from .search import get_search_backend
+
+
+def _authors(note):
+    """Автор заметки и прежний, если заметку передали другому."""
+    return {note.author_id, getattr(note, 'loaded_author_id', None)} - {None}
+
+
+@receiver(post_save, sender=Note)
+def note_saved(sender, instance, raw=False, **kwargs):
+    """Обновляем заметку в поисковом индексе и кеше автора."""
+    if not raw:
+        get_search_backend().index_notes((instance,))
+    invalidate_authors(_authors(instance))
+
+
+@receiver(post_delete, sender=Note)
+def note_deleted(sender, instance, **kwargs):
+    """Убираем заметку из поискового индекса и кеша автора."""
+    get_search_backend().remove_note(instance.pk)
+    invalidate_authors(_authors(instance))
@@ -0,0 +1,82 @@
+"""
+Выдача уникальных slug без запроса на каждую попытку.
+
+Сначала одним запросом по уникальному индексу проверяются сами
+основы. Для занятых основ вторым запросом читаются все варианты
+«base-N»: они лежат в диапазоне индекса между «base-» и «base.».
+Свободный суффикс подбирается в памяти. Гонку между выдачей и вставкой
+закрывает уникальный индекс: при IntegrityError вызывающий код
+повторяет попытку.
+"""
+from collections import Counter
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+from pytils.translit import slugify
+
+DEFAULT_SLUG = 'note'
+# Место под суффикс «-N» у длинных slug.
+SUFFIX_RESERVE = 8
+# Сколько основ проверяется одним запросом при массовой выдаче.
+BASES_PER_QUERY = 500
+
+
+def slug_base(title, max_length):
+    """Основа slug из заголовка, к ней подбирается суффикс."""
+    return slugify(title)[:max_length] or DEFAULT_SLUG
+
+
+def _select(queryset, items, condition):
+    """Занятые slug, items проверяются пачками по BASES_PER_QUERY."""
+    taken = set()
+    for start in range(0, len(items), BASES_PER_QUERY):
+        taken.update(queryset.filter(
+            condition(items[start:start + BASES_PER_QUERY])
+        ).values_list('slug', flat=True))
+    return taken
+
+
+def _prefix_ranges(stems):
+    return reduce(or_, (
+        Q(slug__gt=f'{stem}-', slug__lt=f'{stem}.') for stem in stems
+    ))
+
+
+def allocate_slugs(queryset, titles, max_length, reserved=()):
+    """
+    Возвращает по свободному slug на каждый заголовок.
+
+    Совпадающие заголовки внутри одного вызова тоже получают
+    разные суффиксы. reserved — slug, которых ещё нет в базе, но которые
+    уже заняты, например явные slug той же пачки.
+    """
+    bases = [slug_base(title, max_length) for title in titles]
+    counts = Counter(bases)
+    taken = set(reserved) | _select(
+        queryset, list(counts), lambda chunk: Q(slug__in=chunk)
+    )
+    stems = list(dict.fromkeys(
+        base[:max_length - SUFFIX_RESERVE]
+        for base, count in counts.items()
+        if base in taken or count > 1
+    ))
+    if stems:
+        taken |= _select(queryset, stems, _prefix_ranges)
+    next_suffix = {}
+    for slug in taken:
+        stem, _, suffix = slug.rpartition('-')
+        if suffix.isdigit():
+            next_suffix[stem] = max(next_suffix.get(stem, 2), int(suffix) + 1)
+    slugs = []
+    for base in bases:
+        slug = base
+        if slug in taken:
+            stem = base[:max_length - SUFFIX_RESERVE]
+            suffix = next_suffix.get(stem, 2)
+            while (slug := f'{stem}-{suffix}') in taken:
+                suffix += 1
+            next_suffix[stem] = suffix + 1
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
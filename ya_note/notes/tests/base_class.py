@@ -1,11 +1,13 @@
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
+from notes import note_cache
 from notes.models import Note
 
 User = get_user_model()
 
 
+@override_settings(QUERY_BUDGET_STRICT=True)
 class BaseClass(TestCase):
 
     HOME_URL = reverse('notes:home')
@@ -54,3 +56,7 @@ class BaseClass(TestCase):
             'title': 'Заголовок',
             'text': cls.NOTE_TEXT
         }
+
+    def setUp(self):
+        # Откат транзакции теста не сбрасывает кеш заметок процесса.
+        note_cache.clear()
@@ -0,0 +1,47 @@
+from django.core.cache import cache
+from django.test import Client, override_settings
+from yanote.auth import USER_KEY
+
+from .base_class import BaseClass
+
+
+@override_settings(
+    SESSION_ENGINE='django.contrib.sessions.backends.cached_db',
+    AUTHENTICATION_BACKENDS=['yanote.auth.CachedModelBackend'],
+)
+class TestCachedAuth(BaseClass):
+    """Сессии cached_db и пользователь из кеша, как с CACHED_AUTH=1."""
+
+    def setUp(self):
+        super().setUp()
+        # pk пользователей повторяются между тестами, а кеш — нет.
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.author)
+
+    def test_list_without_auth_queries(self):
+        """После первого запроса сессия и пользователь берутся из кеша."""
+        # Сессия уже в кеше после входа, из базы читается только пользователь.
+        with self.assertNumQueries(1 + 2):
+            self.client.get(self.LIST_URL)
+        with self.assertNumQueries(2):
+            self.client.get(self.LIST_URL)
+
+    def test_password_change_logs_out(self):
+        """После смены пароля кеш не держит старую сессию."""
+        self.client.get(self.LIST_URL)
+        self.author.set_password('новый пароль')
+        self.author.save()
+        response = self.client.get(self.LIST_URL)
+        self.assertRedirects(
+            response, f'{self.LOGIN_URL}?next={self.LIST_URL}'
+        )
+
+    def test_cache_cleared_after_commit(self):
+        """Пользователь, закешированный до фиксации, удаляется после неё."""
+        key = USER_KEY.format(self.author.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author.save()
+            # Параллельный запрос кеширует пользователя до фиксации.
+            cache.set(key, self.author)
+        self.assertIsNone(cache.get(key))
@@ -1,5 +1,7 @@
 from django.contrib.auth import get_user_model
+from django.test import override_settings
 from notes.forms import NoteForm
+from notes.models import Note
 
 from .base_class import BaseClass
 
@@ -50,3 +52,39 @@ class TestNotesPage(BaseClass):
                 self.assertIn('form', response.context)
                 form = response.context['form']
                 self.assertIsInstance(form, NoteForm)
+
+
+class TestNotesListPages(BaseClass):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Note.objects.bulk_create(
+            Note(
+                title=f'Заметка {letter}',
+                text='Очень длинный текст',
+                slug=f'note-{index}',
+                author=cls.author,
+            )
+            for index, letter in enumerate('вба')
+        )
+
+    @override_settings(NOTES_PER_PAGE=2)
+    def test_notes_list_is_paginated(self):
+        """Список заметок разбит на страницы."""
+        response = self.author_client.get(self.LIST_URL)
+        self.assertEqual(len(response.context['object_list']), 2)
+        response = self.author_client.get(self.LIST_URL, {'page': 2})
+        self.assertEqual(len(response.context['object_list']), 2)
+
+    def test_notes_list_sorted_by_title(self):
+        """Заметки можно отсортировать по названию."""
+        response = self.author_client.get(self.LIST_URL, {'sort': '-title'})
+        titles = [note.title for note in response.context['object_list']]
+        self.assertEqual(titles, sorted(titles, reverse=True))
+
+    def test_notes_list_defers_text(self):
+        """Текст заметок в список не загружается."""
+        response = self.author_client.get(self.LIST_URL)
+        for note in response.context['object_list']:
+            self.assertIn('text', note.get_deferred_fields())
@@ -1,7 +1,10 @@
 from http import HTTPStatus
+from unittest import mock
 
 from notes.forms import WARNING
 from notes.models import Note
+from notes.search import get_search_backend
+from notes.slugs import allocate_slugs
 from pytils.translit import slugify
 
 from .base_class import BaseClass
@@ -110,3 +113,83 @@ class TestNoteCreate(BaseClass):
 
         expected_slug = slugify(self.form_data_without_slug['title'])
         self.assertEqual(note.slug, expected_slug)
+
+
+class TestSlugAllocation(BaseClass):
+
+    def test_duplicate_title_gets_suffix(self):
+        """Повторный заголовок получает slug с суффиксом, а не ошибку."""
+        for _ in range(3):
+            response = self.author_client.post(
+                self.ADD_URL, data=self.form_data_without_slug
+            )
+            self.assertRedirects(response, self.SUCCESS_URL)
+        base = slugify(self.form_data_without_slug['title'])
+        self.assertEqual(
+            set(Note.objects.filter(
+                title=self.form_data_without_slug['title']
+            ).values_list('slug', flat=True)),
+            {base, f'{base}-2', f'{base}-3'},
+        )
+
+    def test_allocation_queries_do_not_depend_on_titles(self):
+        """Основы и занятые варианты читаются двумя запросами на список."""
+        Note.objects.create(title='Копия', text='-', author=self.author)
+        Note.objects.create(
+            title='Копия', text='-', author=self.author, slug='kopiya-7'
+        )
+        with self.assertNumQueries(2):
+            slugs = allocate_slugs(
+                Note.objects.all(), ['Копия', 'Копия', 'Новая', 'Новая'], 100
+            )
+        self.assertEqual(
+            slugs, ['kopiya-8', 'kopiya-9', 'novaya', 'novaya-2']
+        )
+
+    def test_generated_slug_not_reused_as_base(self):
+        """Выданный «kopiya-2» не достаётся заголовку «Копия 2»."""
+        Note.objects.create(title='Копия', text='-', author=self.author)
+        notes = Note.objects.bulk_create_with_slugs(
+            Note(title=title, text='-', author=self.author)
+            for title in ('Копия', 'Копия 2')
+        )
+        self.assertEqual(
+            [note.slug for note in notes], ['kopiya-2', 'kopiya-2-2']
+        )
+
+    def test_long_title_suffix_fits(self):
+        """Суффикс длинного slug укладывается в длину поля."""
+        title = 'z' * 150
+        first = Note.objects.create(title=title, text='-', author=self.author)
+        second = Note.objects.create(title=title, text='-', author=self.author)
+        self.assertEqual(len(first.slug), 100)
+        self.assertLessEqual(len(second.slug), 100)
+        self.assertNotEqual(first.slug, second.slug)
+
+    def test_bulk_create_with_slugs(self):
+        """Массовое создание выдаёт slug и обновляет поисковый индекс."""
+        notes = Note.objects.bulk_create_with_slugs(
+            Note(title='Пачка', text='пакетный', author=self.author)
+            for _ in range(3)
+        )
+        self.assertEqual(
+            [note.slug for note in notes], ['pachka', 'pachka-2', 'pachka-3']
+        )
+        found = get_search_backend().search(self.author.pk, 'пакетный', 10)
+        self.assertEqual(sorted(found), sorted(note.pk for note in notes))
+
+    def test_slug_taken_concurrently_is_reallocated(self):
+        """Если slug заняли после выдачи, он выдаётся заново."""
+        taken = Note.objects.create(
+            title='Гонка', text='-', author=self.author
+        )
+        results = iter((['gonka'], ['gonka-2']))
+        with mock.patch(
+            'notes.models.allocate_slugs',
+            side_effect=lambda *args: next(results),
+        ):
+            note = Note.objects.create(
+                title='Гонка', text='-', author=self.author
+            )
+        self.assertEqual(taken.slug, 'gonka')
+        self.assertEqual(note.slug, 'gonka-2')
@@ -0,0 +1,206 @@
+from http import HTTPStatus
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from yanote.environment import READ_ALIAS
+from yanote.profiling import QueryBudgetExceeded
+
+from notes import note_cache
+from notes.models import Note
+
+from .base_class import BaseClass, User
+
+# Сессия и пользователь загружаются на каждом авторизованном запросе.
+AUTH_QUERIES = 2
+
+
+class TestWriteQueries(BaseClass):
+
+    def test_create_note_queries(self):
+        """Создание заметки: проверка slug, вставка и поисковый индекс."""
+        with self.assertNumQueries(AUTH_QUERIES + 3):
+            self.author_client.post(self.ADD_URL, data=self.form_data)
+
+    def test_create_note_without_slug_queries(self):
+        """Без slug: выдача slug и вставка в точке сохранения."""
+        with self.assertNumQueries(AUTH_QUERIES + 5):
+            self.author_client.post(
+                self.ADD_URL, data=self.form_data_without_slug
+            )
+
+    def test_edit_note_queries(self):
+        """Редактирование: загрузка, проверка slug, обновление и индекс."""
+        with self.assertNumQueries(AUTH_QUERIES + 4):
+            self.author_client.post(self.EDIT_URL, data=self.form_data)
+
+    def test_edit_note_same_slug_queries(self):
+        """С прежним slug проверка уникальности не нужна."""
+        with self.assertNumQueries(AUTH_QUERIES + 3):
+            self.author_client.post(
+                self.EDIT_URL, data={**self.form_data, 'slug': self.NOTES_SLUG}
+            )
+
+    def test_delete_note_queries(self):
+        """Удаление: загрузка заметки, удаление и индекс."""
+        with self.assertNumQueries(AUTH_QUERIES + 3):
+            self.author_client.post(self.DELETE_URL)
+
+
+@override_settings(NOTES_CACHE_SIZE=1000)
+class TestNoteCache(BaseClass):
+
+    def test_detail_from_cache(self):
+        """Повторная страница заметки не читает заметку из базы."""
+        with self.assertNumQueries(AUTH_QUERIES + 1):
+            self.author_client.get(self.DETAIL_URL)
+        with self.assertNumQueries(AUTH_QUERIES):
+            self.author_client.get(self.DETAIL_URL)
+
+    def test_edit_invalidates(self):
+        """После правки старый slug не найден, новый показывает правку."""
+        self.author_client.get(self.DETAIL_URL)
+        self.author_client.post(self.EDIT_URL, data=self.form_data)
+        response = self.author_client.get(self.DETAIL_URL)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        response = self.author_client.get(
+            reverse('notes:detail', args=(self.form_data['slug'],))
+        )
+        self.assertEqual(response.context['note'].text, self.NEW_NOTE_TEXT)
+
+    def test_delete_invalidates(self):
+        self.author_client.get(self.DETAIL_URL)
+        self.author_client.post(self.DELETE_URL)
+        response = self.author_client.get(self.DETAIL_URL)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_other_author_not_found(self):
+        """Кеш разделён по авторам: чужая заметка — 404."""
+        self.author_client.get(self.DETAIL_URL)
+        response = self.another_user_client.get(self.DETAIL_URL)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_moved_note_invalidates_previous_author(self):
+        """Заметку передали дальше: у прежнего автора её больше нет."""
+        note = Note.objects.get(pk=self.note.pk)
+        note.author = self.another_user
+        note.save()
+        response = self.another_user_client.get(self.DETAIL_URL)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        note.author = User.objects.create(username='Третий автор')
+        note.save()
+        response = self.another_user_client.get(self.DETAIL_URL)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    @override_settings(NOTES_CACHE_ALIAS='default')
+    def test_shared_cache(self):
+        """Другой процесс берёт заметку и версию из общего кеша."""
+        cache.clear()
+        self.author_client.get(self.DETAIL_URL)
+        # Пустой LRU — как в другом процессе.
+        note_cache.clear()
+        with self.assertNumQueries(AUTH_QUERIES):
+            self.author_client.get(self.DETAIL_URL)
+        self.author_client.post(
+            self.EDIT_URL, data={**self.form_data, 'slug': self.NOTES_SLUG}
+        )
+        response = self.author_client.get(self.DETAIL_URL)
+        self.assertEqual(response.context['note'].text, self.NEW_NOTE_TEXT)
+
+    @override_settings(NOTES_CACHE_SIZE=2)
+    def test_lru_evicts_least_recently_used(self):
+        lru = note_cache.LRUCache()
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+        lru.set('c', 3)
+        self.assertEqual(list(lru.data), ['a', 'c'])
+
+    @override_settings(NOTES_CACHE_SIZE=0)
+    def test_disabled(self):
+        self.author_client.get(self.DETAIL_URL)
+        with self.assertNumQueries(AUTH_QUERIES + 1):
+            self.author_client.get(self.DETAIL_URL)
+
+
+class TestQueryProfiling(BaseClass):
+
+    @override_settings(QUERY_BUDGETS={'notes:list': 0})
+    def test_query_budget_exceeded(self):
+        """Превышение бюджета запросов роняет запрос в тестах."""
+        with self.assertRaises(QueryBudgetExceeded):
+            self.author_client.get(self.LIST_URL)
+
+    @override_settings(
+        QUERY_BUDGETS={'notes:list': 0}, QUERY_BUDGET_STRICT=False
+    )
+    def test_query_budget_warning(self):
+        """Вне строгого режима превышение бюджета пишется в лог."""
+        with self.assertLogs('yanote.profiling', 'WARNING') as logs:
+            response = self.author_client.get(self.LIST_URL)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertIn('notes:list', logs.output[0])
+
+    def test_profiling_report_for_staff_only(self):
+        """Отчёт о стоимости представлений виден только персоналу."""
+        staff = User.objects.create(username='Сотрудник', is_staff=True)
+        self.client.force_login(staff)
+        self.client.get(self.LIST_URL)
+        url = reverse('query_profiling_json')
+        response = self.author_client.get(url)
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        response = self.client.get(url)
+        views = {row['view_name']: row for row in response.json()['views']}
+        self.assertGreaterEqual(views['notes:list']['requests'], 1)
+        response = self.client.get(reverse('query_profiling'))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+
+@override_settings(
+    DATABASE_ROUTERS=['yanote.routers.ReadWriteRouter'],
+    QUERY_BUDGETS={'notes:list': 0},
+    QUERY_BUDGET_STRICT=True,
+)
+class TestQueryProfilingWithReplica(TransactionTestCase):
+    """Алиас read на тестовую базу и ReadWriteRouter, как в production."""
+
+    def setUp(self):
+        # Вне транзакции ReadWriteRouter отправляет чтения на read.
+        self.replica = connections.create_connection(DEFAULT_DB_ALIAS)
+        connections.settings[READ_ALIAS] = self.replica.settings_dict
+        connections[READ_ALIAS] = self.replica
+        self.addCleanup(self.remove_replica)
+        self.client.force_login(User.objects.create(username='Автор'))
+
+    def remove_replica(self):
+        self.replica.close()
+        del connections[READ_ALIAS]
+        del connections.settings[READ_ALIAS]
+
+    def test_query_budget_counts_replica(self):
+        """Запросы через алиас read тоже входят в бюджет."""
+        with CaptureQueriesContext(self.replica) as reads:
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(BaseClass.LIST_URL)
+        self.assertTrue(reads.captured_queries)
+
+
+class TestBenchQueryPlans(TransactionTestCase):
+
+    def test_rolls_back(self):
+        """Замер планов не оставляет в базе строк и не теряет индексы."""
+        call_command(
+            'bench_query_plans', users=2, notes=20, stdout=StringIO()
+        )
+        self.assertFalse(Note.objects.exists())
+        self.assertFalse(User.objects.exists())
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(
+                cursor, Note._meta.db_table
+            )
+        for index in Note._meta.indexes:
+            self.assertIn(index.name, constraints)
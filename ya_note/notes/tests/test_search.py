@@ -0,0 +1,105 @@
+from http import HTTPStatus
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import override_settings
+from notes.models import Note
+from notes.search import IcontainsBackend, SearchBackend, get_search_backend
+from notes.views import NotesList
+
+from .base_class import BaseClass, User
+
+
+class TestNotesSearch(BaseClass):
+
+    def search(self, client, query, page=1):
+        response = client.get(self.LIST_URL, {'q': query, 'page': page})
+        return list(response.context['object_list']), response.context
+
+    def test_search_only_own_notes(self):
+        """Поиск находит только заметки самого пользователя."""
+        found, _ = self.search(self.author_client, 'заметка')
+        self.assertEqual(found, [self.note])
+        found, _ = self.search(self.another_user_client, 'заметка')
+        self.assertEqual(found, [self.another_note])
+
+    def test_search_ranking(self):
+        """Совпадение в заголовке выше совпадения в тексте."""
+        in_text = Note.objects.create(
+            title='Прочее', text='Про кактус', author=self.author
+        )
+        in_title = Note.objects.create(
+            title='Кактус', text='Полить', author=self.author
+        )
+        found, _ = self.search(self.author_client, 'кактус')
+        self.assertEqual(found, [in_title, in_text])
+
+    def test_search_index_follows_changes(self):
+        """Индекс обновляется при сохранении и удалении заметки."""
+        self.note.text = 'Купить хлеб'
+        self.note.save()
+        found, _ = self.search(self.author_client, 'хлеб')
+        self.assertEqual(found, [self.note])
+        self.note.delete()
+        found, _ = self.search(self.author_client, 'хлеб')
+        self.assertEqual(found, [])
+
+    @override_settings(NOTES_SEARCH_RESULTS_PER_PAGE=2)
+    def test_search_pages(self):
+        """Результаты поиска выводятся постранично."""
+        for index in range(3):
+            Note.objects.create(
+                title=f'Список {index}',
+                text='Текст',
+                slug=f'spisok-{index}',
+                author=self.author,
+            )
+        found, context = self.search(self.author_client, 'список')
+        self.assertEqual(len(found), 2)
+        self.assertTrue(context['has_next'])
+        found, context = self.search(self.author_client, 'список', page=2)
+        self.assertEqual(len(found), 1)
+        self.assertFalse(context['has_next'])
+
+    def test_search_page_limit(self):
+        """Слишком далёкая страница поиска — 404, а не ошибка базы."""
+        limit = NotesList.max_search_page
+        for page, status in (
+            (limit, HTTPStatus.OK),
+            (limit + 1, HTTPStatus.NOT_FOUND),
+            ('99999999999999999999', HTTPStatus.NOT_FOUND),
+        ):
+            with self.subTest(page=page):
+                response = self.author_client.get(
+                    self.LIST_URL, {'q': 'заметка', 'page': page}
+                )
+                self.assertEqual(response.status_code, status)
+
+    def test_rebuild_notes_index(self):
+        """Команда перестраивает индекс с нуля."""
+        get_search_backend().clear()
+        self.assertEqual(self.search(self.author_client, 'заметка')[0], [])
+        call_command('rebuild_notes_index', chunk_size=1)
+        found, _ = self.search(self.author_client, 'заметка')
+        self.assertEqual(found, [self.note])
+
+    def test_bench_notes_search_rolls_back(self):
+        """Замер поиска не оставляет в базе данных и не портит индекс."""
+        notes_before = list(Note.objects.all())
+        call_command(
+            'bench_notes_search', users=2, notes=10, queries=2,
+            stdout=StringIO(),
+        )
+        self.assertEqual(list(Note.objects.all()), notes_before)
+        self.assertFalse(
+            User.objects.filter(username__startswith='bench').exists()
+        )
+        found, _ = self.search(self.author_client, 'заметка')
+        self.assertEqual(found, [self.note])
+
+    @override_settings(NOTES_SEARCH_BACKEND='notes.search.IcontainsBackend')
+    def test_backend_follows_setting(self):
+        """Бэкенд берётся из текущего значения настройки."""
+        self.assertIsInstance(get_search_backend(), IcontainsBackend)
+        with self.assertRaises(TypeError):
+            SearchBackend()
@@ -0,0 +1,139 @@
+import importlib
+import os
+import sys
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, transaction
+from django.template import engines
+from django.test import SimpleTestCase, TestCase
+from notes.models import Note
+from yanote.environment import database_settings
+from yanote.routers import ReadWriteRouter
+from yanote.template_cache import template_names, warm_templates
+
+BASE_DIR = Path('/srv/yanote')
+POSTGRES = {'POSTGRES_DB': 'yanote', 'POSTGRES_HOST': 'db'}
+PRODUCTION = 'yanote.settings_production'
+
+
+class TestProductionSettings(SimpleTestCase):
+
+    def load_profile(self, **environ):
+        """Загружает профиль заново с окружением environ."""
+        sys.modules.pop(PRODUCTION, None)
+        self.addCleanup(sys.modules.pop, PRODUCTION, None)
+        with mock.patch.dict(os.environ, environ, clear=True):
+            return importlib.import_module(PRODUCTION)
+
+    def test_sqlite_without_postgres(self):
+        database = database_settings({}, BASE_DIR)
+        self.assertEqual(database['ENGINE'], 'django.db.backends.sqlite3')
+        self.assertEqual(database['NAME'], str(BASE_DIR / 'db.sqlite3'))
+        self.assertGreater(database['CONN_MAX_AGE'], 0)
+        self.assertTrue(database['CONN_HEALTH_CHECKS'])
+
+    def test_postgres_persistent_connections(self):
+        database = database_settings(
+            {**POSTGRES, 'DB_CONN_MAX_AGE': '300'}, BASE_DIR
+        )
+        self.assertEqual(database['ENGINE'], 'django.db.backends.postgresql')
+        self.assertEqual(
+            (database['NAME'], database['HOST'], database['PORT']),
+            ('yanote', 'db', '5432'),
+        )
+        self.assertEqual(database['CONN_MAX_AGE'], 300)
+        self.assertTrue(database['CONN_HEALTH_CHECKS'])
+        self.assertNotIn('pool', database['OPTIONS'])
+
+    def test_postgres_pool_disables_persistent_connections(self):
+        database = database_settings(
+            {**POSTGRES, 'DB_POOL_MAX_SIZE': '20', 'DB_CONN_MAX_AGE': '300'},
+            BASE_DIR,
+        )
+        self.assertEqual(database['CONN_MAX_AGE'], 0)
+        self.assertEqual(
+            database['OPTIONS']['pool'],
+            {'min_size': 2, 'max_size': 20, 'timeout': 10},
+        )
+
+    def test_invalid_number(self):
+        with self.assertRaises(ImproperlyConfigured):
+            database_settings(
+                {**POSTGRES, 'DB_POOL_MAX_SIZE': 'many'}, BASE_DIR
+            )
+
+    def test_production_requires_secret_key(self):
+        with self.assertRaises(ImproperlyConfigured):
+            self.load_profile()
+
+    def test_production_profile(self):
+        profile = self.load_profile(
+            DJANGO_SECRET_KEY='secret',
+            DJANGO_ALLOWED_HOSTS='notes.example.com',
+            **POSTGRES,
+        )
+        self.assertEqual(profile.SECRET_KEY, 'secret')
+        self.assertFalse(profile.DEBUG)
+        self.assertEqual(profile.ALLOWED_HOSTS, ['notes.example.com'])
+        self.assertEqual(profile.DATABASES['default']['NAME'], 'yanote')
+        self.assertEqual(
+            profile.NOTES_SEARCH_BACKEND, 'notes.search.IcontainsBackend'
+        )
+
+    def test_production_cached_templates(self):
+        profile = self.load_profile(DJANGO_SECRET_KEY='secret')
+        templates = profile.TEMPLATES[0]
+        self.assertFalse(templates['APP_DIRS'])
+        self.assertEqual(
+            templates['OPTIONS']['loaders'][0][0],
+            'django.template.loaders.cached.Loader',
+        )
+        self.assertTrue(profile.TEMPLATE_WARMUP)
+
+    def test_warm_templates(self):
+        """Все шаблоны из DIRS уже в кеше загрузчика."""
+        names = template_names(settings.TEMPLATES[0]['DIRS'][0])
+        self.assertIn('notes/detail.html', names)
+        self.assertEqual(warm_templates()[0], len(names))
+        loader = engines['django'].engine.template_loaders[0]
+        self.assertLessEqual(set(names), set(loader.get_template_cache))
+
+    def test_sqlite_performance_profile(self):
+        profile = self.load_profile(
+            DJANGO_SECRET_KEY='secret',
+            SQLITE_PATH='/srv/yanote/db.sqlite3',
+            SQLITE_PERFORMANCE='1',
+        )
+        default = profile.DATABASES['default']
+        read = profile.DATABASES['read']
+        for pragma in (
+            'PRAGMA journal_mode=WAL',
+            'PRAGMA synchronous=NORMAL',
+            'PRAGMA busy_timeout=5000',
+        ):
+            self.assertIn(pragma, default['OPTIONS']['init_command'])
+        self.assertEqual(default['OPTIONS']['transaction_mode'], 'IMMEDIATE')
+        self.assertEqual(read['NAME'], 'file:/srv/yanote/db.sqlite3?mode=ro')
+        self.assertIn('PRAGMA query_only=1', read['OPTIONS']['init_command'])
+        self.assertEqual(read['TEST'], {'MIRROR': 'default'})
+        self.assertEqual(
+            profile.DATABASE_ROUTERS, ['yanote.routers.ReadWriteRouter']
+        )
+
+
+class TestReadWriteRouter(TestCase):
+
+    def test_reads_from_replica(self):
+        router = ReadWriteRouter()
+        # TestCase держит открытую транзакцию, здесь нужен режим без неё.
+        with mock.patch.object(connection, 'in_atomic_block', False):
+            self.assertEqual(router.db_for_read(Note), 'read')
+        self.assertEqual(router.db_for_write(Note), 'default')
+        self.assertFalse(router.allow_migrate('read', 'notes'))
+
+    def test_reads_from_default_in_transaction(self):
+        with transaction.atomic():
+            self.assertEqual(ReadWriteRouter().db_for_read(Note), 'default')
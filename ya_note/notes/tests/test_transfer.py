@@ -0,0 +1,168 @@
+import json
+import tempfile
+from http import HTTPStatus
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError
+from django.urls import reverse
+from notes.models import Note
+from notes.search import get_search_backend
+from notes.transfer import SLUG_CONFLICT
+
+from .base_class import BaseClass
+
+EXPORT_URL = reverse('notes:export')
+IMPORT_URL = reverse('notes:import')
+
+
+class TestNotesTransfer(BaseClass):
+
+    def export(self, file_format):
+        response = self.author_client.get(EXPORT_URL, {'format': file_format})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def upload(self, content, file_format):
+        return self.author_client.post(IMPORT_URL, {
+            'format': file_format,
+            'file': SimpleUploadedFile(
+                f'notes.{file_format}', content.encode()
+            ),
+        })
+
+    def test_export_jsonl_only_own_notes(self):
+        """Выгрузка содержит только заметки пользователя."""
+        rows = [json.loads(line) for line in self.export('jsonl').splitlines()]
+        self.assertEqual(rows, [{
+            'title': self.note.title,
+            'text': self.NOTE_TEXT,
+            'slug': self.NOTES_SLUG,
+        }])
+
+    def test_anonymous_redirected(self):
+        """Анонимный пользователь не может выгружать и загружать."""
+        for url in (EXPORT_URL, IMPORT_URL):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, HTTPStatus.FOUND)
+
+    def test_csv_round_trip(self):
+        """Выгрузка CSV загружается обратно с новыми slug."""
+        content = self.export('csv')
+        response = self.upload(content, 'csv')
+        self.assertRedirects(response, self.SUCCESS_URL)
+        notes = Note.objects.filter(author=self.author, title=self.note.title)
+        self.assertEqual(
+            sorted(notes.values_list('slug', flat=True)),
+            [self.NOTES_SLUG, 'zametka'],
+        )
+
+    def test_csv_round_trip_long_text(self):
+        """Текст длиннее лимита поля csv по умолчанию загружается обратно."""
+        text = 'т' * 200_000
+        Note.objects.filter(pk=self.note.pk).update(text=text)
+        response = self.upload(self.export('csv'), 'csv')
+        self.assertRedirects(response, self.SUCCESS_URL)
+        self.assertEqual(
+            Note.objects.filter(author=self.author, text=text).count(), 2
+        )
+
+    @mock.patch('notes.transfer.CSV_FIELD_SIZE_LIMIT', 10)
+    def test_import_malformed_csv(self):
+        """Ошибка разбора CSV — ошибка формы и команды, а не 500."""
+        content = 'title,text\nЗаголовок,Текст длиннее лимита\n'
+        notes_before = Note.objects.count()
+        response = self.upload(content, 'csv')
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertIn(
+            'Некорректный CSV', response.context['form'].errors['file'][0]
+        )
+        with tempfile.NamedTemporaryFile(
+            'w', suffix='.csv', encoding='utf-8'
+        ) as file:
+            file.write(content)
+            file.flush()
+            with self.assertRaises(CommandError):
+                call_command('import_notes', self.author.username, file.name)
+        self.assertEqual(Note.objects.count(), notes_before)
+
+    def test_import_jsonl(self):
+        """Одинаковые заголовки и занятые slug получают свободные slug."""
+        lines = [
+            {'title': 'Импорт', 'text': 'из файла'},
+            {'title': 'Импорт', 'text': 'из файла'},
+            {'title': 'Свой', 'text': 'из файла', 'slug': 'own-slug'},
+            {'title': 'Чужой', 'text': 'из файла', 'slug': self.NOTES_SLUG},
+        ]
+        content = '\n'.join(json.dumps(line) for line in lines) + '\n'
+        response = self.upload(content, 'jsonl')
+        self.assertRedirects(response, self.SUCCESS_URL)
+        self.assertEqual(
+            sorted(Note.objects.filter(text='из файла').values_list(
+                'slug', flat=True
+            )),
+            ['chuzhoj', 'import', 'import-2', 'own-slug'],
+        )
+        found = get_search_backend().search(self.author.pk, 'файла', 10)
+        self.assertEqual(len(found), 4)
+
+    def test_import_file_slug_reserved_for_batch(self):
+        """Slug из файла не выдаётся заметке без slug из той же пачки."""
+        content = (
+            '{"title": "A", "text": "x", "slug": "kopiya"}\n'
+            '{"title": "Копия", "text": "y"}\n'
+        )
+        response = self.upload(content, 'jsonl')
+        self.assertRedirects(response, self.SUCCESS_URL)
+        self.assertEqual(
+            dict(Note.objects.filter(
+                title__in=('A', 'Копия')
+            ).values_list('title', 'slug')),
+            {'A': 'kopiya', 'Копия': 'kopiya-2'},
+        )
+
+    @mock.patch('notes.views.import_notes', side_effect=IntegrityError)
+    def test_import_slug_conflict_is_form_error(self, import_notes):
+        """Slug, занятый во время загрузки, — ошибка формы, а не 500."""
+        response = self.upload('{"title": "A", "text": "x"}\n', 'jsonl')
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertFormError(response.context['form'], 'file', SLUG_CONFLICT)
+
+    def test_import_error_rolls_back(self):
+        """Ошибка в строке отменяет весь импорт."""
+        content = '{"title": "Хорошая", "text": "строка"}\nне json\n'
+        notes_before = Note.objects.count()
+        response = self.upload(content, 'jsonl')
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertFormError(
+            response.context['form'], 'file', 'Строка 2: некорректный JSON'
+        )
+        self.assertEqual(Note.objects.count(), notes_before)
+
+    def test_commands(self):
+        """Команды выгружают и загружают заметки через файл."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'notes.jsonl'
+            call_command(
+                'export_notes', self.author.username, output=str(path)
+            )
+            call_command(
+                'import_notes', self.another_user.username, str(path),
+                stdout=StringIO(),
+            )
+        self.assertTrue(Note.objects.filter(
+            author=self.another_user, title=self.note.title
+        ).exists())
+        with self.assertRaises(CommandError):
+            call_command('import_notes', 'Нет такого', 'notes.jsonl')
+        with mock.patch(
+            'notes.management.commands.import_notes.import_notes',
+            side_effect=IntegrityError,
+        ), tempfile.NamedTemporaryFile(suffix='.jsonl') as file:
+            with self.assertRaisesMessage(CommandError, SLUG_CONFLICT):
+                call_command('import_notes', self.author.username, file.name)
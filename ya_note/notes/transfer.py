@@ -0,0 +1,145 @@
+"""
+Импорт и экспорт заметок в JSON Lines и CSV.
+
+Обе стороны работают потоком: экспорт читает заметки iterator() по
+chunk_size строк, импорт читает файл построчно и сохраняет заметки
+пачками через bulk_create_with_slugs. Память не зависит от числа
+заметок.
+"""
+import csv
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_slug
+from django.db import transaction
+
+from .models import Note
+from .search import chunked
+
+FORMATS = ('jsonl', 'csv')
+FIELDS = ('title', 'text', 'slug')
+CONTENT_TYPES = {
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+# Текст заметки — TextField без ограничения длины, а модуль csv по
+# умолчанию не читает поля длиннее 128 КиБ. Больше не везде помещается
+# в C long.
+CSV_FIELD_SIZE_LIMIT = 2**31 - 1
+# Slug из файла заняли, пока шёл импорт: уникальный индекс отклонил пачку.
+SLUG_CONFLICT = 'Slug из файла уже заняты другой заметкой, повторите загрузку.'
+
+
+class NoteImportError(ValueError):
+    """Строка файла импорта не разобрана или не прошла проверку."""
+
+    def __init__(self, line, message):
+        self.line = line
+        super().__init__(f'Строка {line}: {message}')
+
+
+class _Echo:
+    """Файлоподобный объект для csv.writer: возвращает строку обратно."""
+
+    def write(self, value):
+        return value
+
+
+def export_lines(queryset, file_format, chunk_size):
+    """Поток строк файла экспорта для заметок из queryset."""
+    rows = queryset.order_by('pk').values_list(*FIELDS).iterator(
+        chunk_size=chunk_size
+    )
+    if file_format == 'csv':
+        writer = csv.writer(_Echo())
+        yield writer.writerow(FIELDS)
+        for row in rows:
+            yield writer.writerow(row)
+        return
+    for row in rows:
+        yield json.dumps(dict(zip(FIELDS, row)), ensure_ascii=False) + '\n'
+
+
+def read_rows(lines, file_format):
+    """Разбирает строки файла, возвращает пары (номер строки, словарь)."""
+    if file_format == 'csv':
+        csv.field_size_limit(CSV_FIELD_SIZE_LIMIT)
+        reader = csv.DictReader(lines)
+        if reader.fieldnames is None or not {'title', 'text'} <= set(
+            reader.fieldnames
+        ):
+            raise NoteImportError(1, 'нужны колонки title и text')
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            raise NoteImportError(number, 'некорректный JSON') from None
+        if not isinstance(row, dict):
+            raise NoteImportError(number, 'ожидается объект')
+        yield number, row
+
+
+def build_note(author, number, row):
+    """Заметка из строки файла; slug может остаться пустым."""
+    max_length = {
+        name: Note._meta.get_field(name).max_length
+        for name in ('title', 'slug')
+    }
+    title = str(row.get('title') or '').strip()
+    text = str(row.get('text') or '')
+    slug = str(row.get('slug') or '').strip()
+    if not title or not text:
+        raise NoteImportError(number, 'пустой заголовок или текст')
+    if len(title) > max_length['title']:
+        raise NoteImportError(number, 'слишком длинный заголовок')
+    if slug:
+        try:
+            validate_slug(slug)
+        except ValidationError:
+            raise NoteImportError(
+                number, f'некорректный slug {slug}'
+            ) from None
+        if len(slug) > max_length['slug']:
+            raise NoteImportError(number, 'слишком длинный slug')
+    return Note(title=title, text=text, slug=slug, author=author)
+
+
+def _drop_taken_slugs(notes):
+    """
+    Занятые slug из файла сбрасываются, такие заметки получат
+    свободный slug из заголовка.
+    """
+    wanted = [note.slug for note in notes if note.slug]
+    taken = set(
+        Note.objects.filter(slug__in=wanted).values_list('slug', flat=True)
+    )
+    for note in notes:
+        if not note.slug:
+            continue
+        if note.slug in taken:
+            note.slug = ''
+        else:
+            taken.add(note.slug)
+
+
+def import_notes(author, lines, file_format, batch_size):
+    """
+    Импортирует заметки автора из строк файла.
+
+    Всё или ничего: ошибка в любой строке откатывает импорт целиком.
+    Возвращает количество созданных заметок.
+    """
+    rows = read_rows(lines, file_format)
+    notes = (build_note(author, number, row) for number, row in rows)
+    count = 0
+    with transaction.atomic():
+        for batch in chunked(notes, batch_size):
+            _drop_taken_slugs(batch)
+            Note.objects.bulk_create_with_slugs(batch)
+            count += len(batch)
+    return count
@@ -1,9 +1,21 @@
+import csv
+from io import TextIOWrapper
+
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import IntegrityError
+from django.http import Http404, StreamingHttpResponse
 from django.urls import reverse_lazy
 from django.views import generic
 
-from .forms import NoteForm
+from .forms import NoteForm, NoteImportForm
 from .models import Note
+from .note_cache import get_note
+from .search import get_search_backend
+from .transfer import (
+    CONTENT_TYPES, FORMATS, SLUG_CONFLICT, NoteImportError, export_lines,
+    import_notes
+)
 
 
 class Home(generic.TemplateView):
@@ -25,6 +37,15 @@ class NoteBase(LoginRequiredMixin):
         """Пользователь может работать только со своими заметками."""
         return self.model.objects.filter(author=self.request.user)
 
+    def get_object(self, queryset=None):
+        """Заметка пользователя по slug из кеша заметок."""
+        if queryset is not None:
+            return super().get_object(queryset)
+        note = get_note(self.request.user.pk, self.kwargs[self.slug_url_kwarg])
+        if note is None:
+            raise Http404('Заметка не найдена.')
+        return note
+
 
 class NoteCreate(NoteBase, generic.CreateView):
     """Добавление заметки."""
@@ -32,9 +53,7 @@ class NoteCreate(NoteBase, generic.CreateView):
     form_class = NoteForm
 
     def form_valid(self, form):
-        new_note = form.save(commit=False)
-        new_note.author = self.request.user
-        new_note.save()
+        form.instance.author = self.request.user
         return super().form_valid(form)
 
 
@@ -50,10 +69,117 @@ class NoteDelete(NoteBase, generic.DeleteView):
 
 
 class NotesList(NoteBase, generic.ListView):
-    """Список всех заметок пользователя."""
+    """Список всех заметок пользователя или поиск по ним."""
     template_name = 'notes/list.html'
+    # Шаблону списка нужны только эти поля, текст заметки не загружаем.
+    list_fields = ('id', 'slug', 'title')
+    sort_options = {
+        'id': ('id',),
+        '-id': ('-id',),
+        'title': ('title', 'id'),
+        '-title': ('-title', '-id'),
+    }
+    # Дальние страницы поиска не нужны, а смещение для слишком большого
+    # номера не помещается в целое базы.
+    max_search_page = 1_000
+
+    def get_sort(self):
+        sort = self.request.GET.get('sort', 'id')
+        return sort if sort in self.sort_options else 'id'
+
+    def get_paginate_by(self, queryset):
+        if self.query:
+            return None
+        return settings.NOTES_PER_PAGE
+
+    def get_page_number(self):
+        try:
+            page_number = max(int(self.request.GET.get('page', 1)), 1)
+        except ValueError:
+            return 1
+        if page_number > self.max_search_page:
+            raise Http404('Такой страницы поиска нет.')
+        return page_number
+
+    def get_queryset(self):
+        self.query = self.request.GET.get('q', '').strip()
+        self.has_next = False
+        queryset = super().get_queryset().only(*self.list_fields)
+        if not self.query:
+            return queryset.order_by(*self.sort_options[self.get_sort()])
+        per_page = settings.NOTES_SEARCH_RESULTS_PER_PAGE
+        self.page_number = self.get_page_number()
+        found = get_search_backend().search(
+            self.request.user.pk,
+            self.query,
+            limit=per_page + 1,
+            offset=(self.page_number - 1) * per_page,
+        )
+        self.has_next = len(found) > per_page
+        found = found[:per_page]
+        notes = queryset.in_bulk(found)
+        return [notes[pk] for pk in found if pk in notes]
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.query
+        context['sort'] = self.get_sort()
+        if self.query:
+            context['page_number'] = self.page_number
+            context['has_previous'] = self.page_number > 1
+            context['has_next'] = self.has_next
+        return context
 
 
 class NoteDetail(NoteBase, generic.DetailView):
     """Заметка подробно."""
     template_name = 'notes/detail.html'
+
+
+class NoteExport(NoteBase, generic.View):
+    """Выгрузка всех заметок пользователя потоком."""
+
+    def get(self, request, *args, **kwargs):
+        file_format = request.GET.get('format', 'jsonl')
+        if file_format not in FORMATS:
+            raise Http404
+        response = StreamingHttpResponse(
+            export_lines(
+                self.get_queryset(),
+                file_format,
+                settings.NOTES_TRANSFER_CHUNK_SIZE,
+            ),
+            content_type=CONTENT_TYPES[file_format],
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="notes.{file_format}"'
+        )
+        return response
+
+
+class NoteImport(NoteBase, generic.FormView):
+    """Загрузка заметок из файла JSON Lines или CSV."""
+    template_name = 'notes/import.html'
+    form_class = NoteImportForm
+
+    def form_valid(self, form):
+        lines = TextIOWrapper(
+            form.cleaned_data['file'].file, encoding='utf-8-sig', newline=''
+        )
+        try:
+            import_notes(
+                self.request.user,
+                lines,
+                form.cleaned_data['format'],
+                settings.NOTES_TRANSFER_CHUNK_SIZE,
+            )
+        except (NoteImportError, UnicodeDecodeError) as error:
+            form.add_error('file', str(error))
+            return self.form_invalid(form)
+        except IntegrityError:
+            form.add_error('file', SLUG_CONFLICT)
+            return self.form_invalid(form)
+        except csv.Error as error:
+            form.add_error('file', f'Некорректный CSV: {error}')
+            return self.form_invalid(form)
+        return super().form_valid(form)
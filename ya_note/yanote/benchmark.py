@@ -0,0 +1,501 @@
+"""
+Прогон адресов проекта через тестовый клиент.
+
+Каждый сценарий — адрес (или список адресов для разброса по данным),
+клиент и метод. Для сценария считаются задержка p50/p99, среднее
+число SQL-запросов и пропускная способность. Результаты сохраняются в
+JSON, чтобы сравнивать прогоны разных коммитов на одной базе.
+
+run_concurrent нагружает WSGI-приложение из нескольких потоков: у
+каждого потока своё соединение с базой, а запрос проходит весь путь
+обработки, включая открытие и закрытие соединений по CONN_MAX_AGE.
+run_concurrent_asgi подаёт ту же нагрузку на ASGI-приложение вместо
+сервера: одновременные соединения — корутины одного цикла событий.
+
+run_template_scenario отделяет от запроса время загрузки и отрисовки
+шаблонов: с пустым кешем шаблонов перед каждым запросом и с прогретым.
+"""
+import asyncio
+import json
+import logging
+import random
+import sys
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from io import BytesIO
+from time import perf_counter
+from unittest import mock
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.db import connections
+from django.template import engines
+from django.template.backends.django import DjangoTemplates, Template
+from django.test import Client
+from django.utils.crypto import get_random_string
+
+from .profiling import QueryCounter, count_queries
+
+
+class BenchmarkError(Exception):
+    """Адрес ответил ошибкой, замер не имеет смысла."""
+
+
+@dataclass
+class Scenario:
+    name: str
+    urls: list
+    client: Client
+    method: str = 'get'
+    data: dict = None
+    # Своё число запросов для тяжёлых адресов, например выгрузки.
+    requests: int = None
+
+
+@dataclass
+class Result:
+    name: str
+    requests: int
+    p50_ms: float
+    p99_ms: float
+    queries: float
+    per_second: float
+
+
+def percentile(values, share):
+    values = sorted(values)
+    return values[min(int(len(values) * share), len(values) - 1)]
+
+
+def _send(scenario, url):
+    """Один запрос: время и число SQL-запросов, поток читается целиком."""
+    counter = QueryCounter()
+    start = perf_counter()
+    with count_queries(counter):
+        response = getattr(scenario.client, scenario.method)(
+            url, scenario.data
+        )
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+    elapsed = perf_counter() - start
+    if response.status_code >= 400:
+        raise BenchmarkError(
+            f'{scenario.name}: {url} ответил {response.status_code}'
+        )
+    return elapsed, counter.queries
+
+
+def run_scenario(scenario, requests, warmup=1):
+    """Прогоняет сценарий, первые warmup запросов не учитываются."""
+    count = scenario.requests or requests
+    for index in range(warmup):
+        _send(scenario, scenario.urls[index % len(scenario.urls)])
+    timings = []
+    queries = 0
+    for index in range(count):
+        elapsed, used = _send(
+            scenario, scenario.urls[index % len(scenario.urls)]
+        )
+        timings.append(elapsed)
+        queries += used
+    return Result(
+        name=scenario.name,
+        requests=count,
+        p50_ms=percentile(timings, 0.5) * 1000,
+        p99_ms=percentile(timings, 0.99) * 1000,
+        queries=queries / count,
+        per_second=count / sum(timings),
+    )
+
+
+def save_results(path, results):
+    with open(path, 'w', encoding='utf-8') as output:
+        json.dump(
+            [asdict(result) for result in results],
+            output,
+            ensure_ascii=False,
+            indent=2,
+        )
+
+
+def load_results(path):
+    with open(path, encoding='utf-8') as source:
+        return {row['name']: Result(**row) for row in json.load(source)}
+
+
+def _change(current, previous):
+    if not previous:
+        return ''
+    return f' ({(current - previous) / previous:+.0%})'
+
+
+def format_results(results, baseline=None):
+    """Таблица результатов, с изменением относительно baseline."""
+    baseline = baseline or {}
+    lines = [
+        f'{"сценарий":<28} {"p50, мс":>16} {"p99, мс":>16} '
+        f'{"запросов":>14} {"в секунду":>10}'
+    ]
+    for result in results:
+        previous = baseline.get(result.name)
+        p50 = f'{result.p50_ms:.1f}'
+        p99 = f'{result.p99_ms:.1f}'
+        queries = f'{result.queries:.1f}'
+        if previous is not None:
+            p50 += _change(result.p50_ms, previous.p50_ms)
+            p99 += _change(result.p99_ms, previous.p99_ms)
+            if result.queries != previous.queries:
+                queries += f' ({result.queries - previous.queries:+.1f})'
+        lines.append(
+            f'{result.name:<28} {p50:>16} {p99:>16} {queries:>14} '
+            f'{result.per_second:>10.1f}'
+        )
+    return '\n'.join(lines)
+
+
+@dataclass
+class TemplateResult:
+    name: str
+    requests: int
+    cold_ms: float
+    warm_ms: float
+
+
+@contextmanager
+def _template_timer(timings):
+    """Складывает в timings[0] время get_template и render шаблонов."""
+    get_template = DjangoTemplates.get_template
+    render = Template.render
+
+    def timed(method):
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                timings[0] += perf_counter() - start
+        return wrapper
+
+    with mock.patch.object(
+        DjangoTemplates, 'get_template', timed(get_template)
+    ), mock.patch.object(Template, 'render', timed(render)):
+        yield
+
+
+def reset_templates():
+    """Очищает кеш скомпилированных шаблонов во всех движках."""
+    for engine in engines.all():
+        if isinstance(engine, DjangoTemplates):
+            for loader in engine.engine.template_loaders:
+                if hasattr(loader, 'reset'):
+                    loader.reset()
+
+
+def _template_time(scenario, url, cold):
+    if cold:
+        reset_templates()
+    timings = [0.0]
+    with _template_timer(timings):
+        _send(scenario, url)
+    return timings[0]
+
+
+def run_template_scenario(scenario, requests):
+    """
+    Время шаблонов за запрос: p50 с пустым кешем и с прогретым.
+
+    Страницы из кеша страниц шаблоны не отрисовывают, их время нулевое.
+    """
+    count = scenario.requests or requests
+    urls = [scenario.urls[index % len(scenario.urls)]
+            for index in range(count)]
+    cold = [_template_time(scenario, url, cold=True) for url in urls]
+    _template_time(scenario, urls[0], cold=False)
+    warm = [_template_time(scenario, url, cold=False) for url in urls]
+    return TemplateResult(
+        name=scenario.name,
+        requests=count,
+        cold_ms=percentile(cold, 0.5) * 1000,
+        warm_ms=percentile(warm, 0.5) * 1000,
+    )
+
+
+def format_template_results(results):
+    lines = [
+        f'{"сценарий":<28} {"без кеша, мс":>13} {"с кешем, мс":>12} '
+        f'{"разница":>8}'
+    ]
+    for result in results:
+        change = _change(result.warm_ms, result.cold_ms)
+        lines.append(
+            f'{result.name:<28} {result.cold_ms:>13.2f} '
+            f'{result.warm_ms:>12.2f} {change.strip(" ()"):>8}'
+        )
+    return '\n'.join(lines)
+
+
+@dataclass
+class Task:
+    """Вид запроса в смешанной нагрузке, выбирается с весом weight."""
+
+    name: str
+    urls: list
+    weight: float
+    method: str = 'get'
+    data: dict = None
+    cookies: dict = field(default_factory=dict)
+
+
+@dataclass
+class ConcurrentResult:
+    name: str
+    requests: int
+    errors: int
+    p50_ms: float
+    p99_ms: float
+    per_second: float
+
+
+def _request_parts(task, url, csrf_token):
+    """Путь, строка запроса, cookie и тело запроса задачи."""
+    path, _, query = url.partition('?')
+    cookies = {settings.CSRF_COOKIE_NAME: csrf_token, **task.cookies}
+    body = b''
+    if task.method == 'post':
+        body = urlencode(
+            {'csrfmiddlewaretoken': csrf_token, **(task.data or {})}
+        ).encode()
+    cookie = '; '.join(f'{name}={value}' for name, value in cookies.items())
+    return path, query, cookie, body
+
+
+def _wsgi_environ(task, url, host, csrf_token):
+    path, query, cookie, body = _request_parts(task, url, csrf_token)
+    return {
+        'REQUEST_METHOD': task.method.upper(),
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'SCRIPT_NAME': '',
+        'SERVER_NAME': host,
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': host,
+        'HTTP_COOKIE': cookie,
+        'CONTENT_TYPE': 'application/x-www-form-urlencoded',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.url_scheme': 'http',
+        'wsgi.version': (1, 0),
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+
+
+def _call(application, environ):
+    """Запрос к WSGI-приложению, ответ читается и закрывается целиком."""
+    statuses = []
+    response = application(
+        environ, lambda status, headers: statuses.append(status)
+    )
+    try:
+        for _ in response:
+            pass
+    finally:
+        # close() отправляет request_finished: Django закрывает или
+        # возвращает в пул соединение, как после настоящего запроса.
+        response.close()
+    return int(statuses[0].split()[0])
+
+
+async def _acall(application, task, url, host, csrf_token):
+    """
+    Запрос к ASGI-приложению, как его передал бы сервер.
+
+    После тела запроса receive ждёт бесконечно: соединение открыто,
+    пока приложение не ответит.
+    """
+    path, query, cookie, body = _request_parts(task, url, csrf_token)
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': task.method.upper(),
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query.encode(),
+        'root_path': '',
+        'headers': [
+            (b'host', host.encode()),
+            (b'cookie', cookie.encode()),
+            (b'content-type', b'application/x-www-form-urlencoded'),
+            (b'content-length', str(len(body)).encode()),
+        ],
+        'client': ('127.0.0.1', 50000),
+        'server': (host, 80),
+    }
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    statuses = []
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            statuses.append(message['status'])
+
+    await application(scope, receive, send)
+    return statuses[0]
+
+
+class _Load:
+    """Общее состояние прогона: задачи, срок и собранные замеры."""
+
+    def __init__(self, tasks, duration, host):
+        self.tasks = tasks
+        self.weights = [task.weight for task in tasks]
+        self.host = host
+        self.csrf_token = get_random_string(32)
+        self.timings = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.duration = duration
+
+    def start(self):
+        self.started = perf_counter()
+        self.deadline = self.started + self.duration
+
+    def next(self, rng):
+        task = rng.choices(self.tasks, weights=self.weights)[0]
+        return task, rng.choice(task.urls)
+
+    def record(self, task, status, elapsed):
+        if status >= 400:
+            self.errors[task.name] += 1
+        else:
+            self.timings[task.name].append(elapsed)
+
+    def results(self):
+        elapsed = perf_counter() - self.started
+        return [
+            ConcurrentResult(
+                name=task.name,
+                requests=len(self.timings[task.name]),
+                errors=self.errors[task.name],
+                p50_ms=percentile(self.timings[task.name] or [0], 0.5) * 1000,
+                p99_ms=percentile(
+                    self.timings[task.name] or [0], 0.99
+                ) * 1000,
+                per_second=len(self.timings[task.name]) / elapsed,
+            )
+            for task in self.tasks
+        ]
+
+
+@contextmanager
+def _quiet_request_log():
+    """Трассировки ошибок 500 засыпали бы вывод, они посчитаны в errors."""
+    request_logger = logging.getLogger('django.request')
+    level = request_logger.level
+    request_logger.setLevel(logging.CRITICAL)
+    try:
+        yield
+    finally:
+        request_logger.setLevel(level)
+
+
+def _worker(application, load, seed):
+    rng = random.Random(seed)
+    try:
+        while perf_counter() < load.deadline:
+            task, url = load.next(rng)
+            environ = _wsgi_environ(task, url, load.host, load.csrf_token)
+            start = perf_counter()
+            try:
+                status = _call(application, environ)
+            except Exception:
+                status = 500
+            load.record(task, status, perf_counter() - start)
+    finally:
+        connections.close_all()
+
+
+def run_concurrent(application, tasks, workers, duration, host, seed=0):
+    """
+    Смешанная нагрузка из workers потоков в течение duration секунд.
+
+    Ответы с кодом 400 и выше, например из-за «database is locked»,
+    считаются ошибками и в задержки не попадают.
+    """
+    load = _Load(tasks, duration, host)
+    threads = [
+        threading.Thread(
+            target=_worker, args=(application, load, seed + index)
+        )
+        for index in range(workers)
+    ]
+    with _quiet_request_log():
+        load.start()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    return load.results()
+
+
+async def _connection(application, load, seed):
+    rng = random.Random(seed)
+    while perf_counter() < load.deadline:
+        task, url = load.next(rng)
+        start = perf_counter()
+        try:
+            status = await _acall(
+                application, task, url, load.host, load.csrf_token
+            )
+        except Exception:
+            status = 500
+        load.record(task, status, perf_counter() - start)
+
+
+async def _run_connections(application, load, connections_count, seed):
+    load.start()
+    await asyncio.gather(*(
+        _connection(application, load, seed + index)
+        for index in range(connections_count)
+    ))
+
+
+def run_concurrent_asgi(application, tasks, workers, duration, host, seed=0):
+    """
+    Та же нагрузка через ASGI: workers одновременных соединений.
+
+    Соединения — корутины в одном цикле событий, как у ASGI-сервера;
+    синхронный код Django выполняется в его потоках sync_to_async.
+    """
+    load = _Load(tasks, duration, host)
+    with _quiet_request_log():
+        asyncio.run(_run_connections(application, load, workers, seed))
+    return load.results()
+
+
+def format_concurrent(results):
+    lines = [
+        f'{"запрос":<28} {"ответов":>8} {"ошибок":>7} {"p50, мс":>9} '
+        f'{"p99, мс":>9} {"в секунду":>10}'
+    ]
+    for result in results:
+        lines.append(
+            f'{result.name:<28} {result.requests:>8} {result.errors:>7} '
+            f'{result.p50_ms:>9.1f} {result.p99_ms:>9.1f} '
+            f'{result.per_second:>10.1f}'
+        )
+    total = sum(result.per_second for result in results)
+    lines.append(f'{"всего":<28} {"":>8} {"":>7} {"":>9} {"":>9} '
+                 f'{total:>10.1f}')
+    return '\n'.join(lines)
@@ -0,0 +1,198 @@
+"""
+Замеры стоимости запросов к представлениям.
+
+Middleware считает SQL-запросы, время в БД, время рендеринга шаблона и
+размер ответа для каждого именованного URL. Последние замеры хранятся в
+кольцевом буфере процесса и доступны персоналу в виде HTML и JSON.
+Превышение бюджета запросов в строгом режиме роняет запрос, иначе
+пишется предупреждение в лог.
+
+Потоковые ответы, например выгрузки, записываются с размером 0, а
+запросы, выполненные при чтении потока после возврата из middleware,
+в замер не попадают.
+"""
+import logging
+from collections import deque, namedtuple
+from contextlib import ExitStack
+from time import perf_counter
+
+from asgiref.sync import (iscoroutinefunction, markcoroutinefunction,
+                          sync_to_async)
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db import connections
+from django.http import JsonResponse
+from django.shortcuts import render
+
+Sample = namedtuple(
+    'Sample', ('view_name', 'queries', 'db_time', 'render_time', 'size')
+)
+
+logger = logging.getLogger(__name__)
+
+samples = deque(maxlen=getattr(settings, 'QUERY_PROFILING_BUFFER_SIZE', 1000))
+
+
+class QueryBudgetExceeded(Exception):
+    """Представление выполнило больше запросов, чем разрешено."""
+
+
+class QueryCounter:
+    """Обёртка выполнения SQL, считающая запросы и время в БД."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += perf_counter() - start
+            self.queries += 1
+
+
+def count_queries(counter):
+    """
+    Ставит counter на соединения всех баз текущего потока.
+
+    С ReadWriteRouter чтения идут через отдельный алиас, и без этого
+    они не попали бы в замер и бюджет.
+    """
+    stack = ExitStack()
+    for alias_connection in connections.all():
+        stack.enter_context(alias_connection.execute_wrapper(counter))
+    return stack
+
+
+def _add_wrapper(counter):
+    for alias_connection in connections.all():
+        alias_connection.execute_wrappers.append(counter)
+
+
+def _remove_wrapper(counter):
+    for alias_connection in connections.all():
+        alias_connection.execute_wrappers.remove(counter)
+
+
+class QueryProfilingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        counter = QueryCounter()
+        request.render_time = 0.0
+        with count_queries(counter):
+            response = self.get_response(request)
+        return self.record(request, response, counter)
+
+    async def __acall__(self, request):
+        """
+        Тот же замер для асинхронного стека.
+
+        Соединения с базой у каждого потока свои, а асинхронный ORM
+        выполняет запросы в потоке sync_to_async этого запроса, поэтому
+        обёртка ставится на соединение того же потока.
+        """
+        counter = QueryCounter()
+        request.render_time = 0.0
+        await sync_to_async(_add_wrapper)(counter)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(_remove_wrapper)(counter)
+        return self.record(request, response, counter)
+
+    def record(self, request, response, counter):
+        match = request.resolver_match
+        if match is None or not match.url_name:
+            return response
+        sample = Sample(
+            view_name=match.view_name,
+            queries=counter.queries,
+            db_time=counter.db_time,
+            render_time=request.render_time,
+            size=0 if response.streaming else len(response.content),
+        )
+        samples.append(sample)
+        self.check_budget(sample)
+        return response
+
+    def process_template_response(self, request, response):
+        start = perf_counter()
+
+        def finish_render(rendered):
+            request.render_time = perf_counter() - start
+
+        response.add_post_render_callback(finish_render)
+        return response
+
+    def check_budget(self, sample):
+        budget = getattr(settings, 'QUERY_BUDGETS', {}).get(sample.view_name)
+        if budget is None or sample.queries <= budget:
+            return
+        message = (
+            f'{sample.view_name}: {sample.queries} запросов '
+            f'при бюджете {budget}'
+        )
+        if getattr(settings, 'QUERY_BUDGET_STRICT', False):
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+def build_report():
+    """Агрегирует замеры из буфера по именам представлений."""
+    report = {}
+    for sample in list(samples):
+        row = report.setdefault(sample.view_name, {
+            'view_name': sample.view_name,
+            'requests': 0,
+            'queries': 0,
+            'max_queries': 0,
+            'db_time_ms': 0.0,
+            'render_time_ms': 0.0,
+            'size': 0,
+        })
+        row['requests'] += 1
+        row['queries'] += sample.queries
+        row['max_queries'] = max(row['max_queries'], sample.queries)
+        row['db_time_ms'] += sample.db_time * 1000
+        row['render_time_ms'] += sample.render_time * 1000
+        row['size'] += sample.size
+    budgets = getattr(settings, 'QUERY_BUDGETS', {})
+    rows = []
+    for row in report.values():
+        requests = row['requests']
+        rows.append({
+            'view_name': row['view_name'],
+            'requests': requests,
+            'avg_queries': round(row['queries'] / requests, 2),
+            'max_queries': row['max_queries'],
+            'budget': budgets.get(row['view_name']),
+            'avg_db_time_ms': round(row['db_time_ms'] / requests, 3),
+            'avg_render_time_ms': round(row['render_time_ms'] / requests, 3),
+            'avg_size': row['size'] // requests,
+        })
+    return sorted(rows, key=lambda row: row['view_name'])
+
+
+@staff_member_required
+def report_page(request):
+    """Страница отчёта для персонала."""
+    return render(
+        request, 'admin/query_profiling.html', {'rows': build_report()}
+    )
+
+
+@staff_member_required
+def report_json(request):
+    """Тот же отчёт в JSON."""
+    return JsonResponse({'views': build_report()})
@@ -0,0 +1,28 @@
+"""Разделение чтения и записи между соединениями с одной базой SQLite."""
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from .environment import READ_ALIAS
+
+
+class ReadWriteRouter:
+    """
+    Чтение через соединение read, запись и миграции — через default.
+
+    Внутри транзакции чтение остаётся на default: соединение read не
+    видит ещё не зафиксированных изменений.
+    """
+
+    def db_for_read(self, model, **hints):
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return READ_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Оба соединения смотрят в один файл базы.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -23,6 +23,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'yanote.profiling.QueryProfilingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -87,3 +88,36 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('notes:home')
+
+# Компиляция всех шаблонов из DIRS при старте процесса, см.
+# yanote.template_cache.
+TEMPLATE_WARMUP = False
+
+NOTES_PER_PAGE = 50
+
+NOTES_SEARCH_BACKEND = 'notes.search.SQLiteFTSBackend'
+
+NOTES_SEARCH_RESULTS_PER_PAGE = 20
+
+NOTES_TRANSFER_CHUNK_SIZE = 1000
+
+# Заметок в LRU процесса для страниц заметки, 0 отключает кеш. Без
+# NOTES_CACHE_ALIAS кеш верен только при одном процессе, см.
+# notes.note_cache, поэтому по умолчанию он выключен.
+NOTES_CACHE_SIZE = 0
+
+NOTES_CACHE_ALIAS = None
+
+QUERY_PROFILING_BUFFER_SIZE = 1000
+
+QUERY_BUDGET_STRICT = False
+
+QUERY_BUDGETS = {
+    'notes:list': 4,
+    'notes:add': 8,
+    'notes:detail': 3,
+    'notes:edit': 6,
+    'notes:delete': 5,
+    'notes:success': 2,
+    'notes:export': 2,
+}
@@ -0,0 +1,105 @@
+"""
+Профиль для боевого окружения.
+
+Подключается через DJANGO_SETTINGS_MODULE=yanote.settings_production.
+
+Всё, что отличается между окружениями, берётся из переменных:
+DJANGO_SECRET_KEY (обязательна), DJANGO_ALLOWED_HOSTS, DJANGO_DEBUG,
+POSTGRES_DB/USER/PASSWORD/HOST/PORT, DB_CONN_MAX_AGE, DB_POOL_MAX_SIZE,
+DB_POOL_MIN_SIZE, DB_POOL_TIMEOUT. Без POSTGRES_DB используется SQLite;
+SQLITE_PERFORMANCE=1 включает для неё WAL, настроенные прагмы
+(SQLITE_MMAP_SIZE, SQLITE_CACHE_SIZE_KIB, SQLITE_BUSY_TIMEOUT_MS) и
+чтение через отдельное соединение только для чтения.
+
+CACHED_AUTH=1 берёт сессию (SESSION_ENGINE, по умолчанию cached_db) и
+пользователя с правами (AUTH_USER_CACHE_TIMEOUT секунд) из кеша. Кеш
+задают DJANGO_CACHE_BACKEND и DJANGO_CACHE_LOCATION; при нескольких
+процессах он должен быть общим, иначе смена пароля или прав дойдёт до
+других процессов только по истечении таймаута.
+
+Кеш заметок по slug (NOTES_CACHE_SIZE записей в процессе) включается
+сам, если задан DJANGO_CACHE_BACKEND: версии заметок авторов хранятся
+в нём (NOTES_CACHE_ALIAS). Без общего кеша NOTES_CACHE_SIZE можно
+задавать, только если процесс один.
+
+Шаблоны читаются кеширующим загрузчиком и компилируются при старте
+процесса, время прогрева пишется в лог; TEMPLATE_WARMUP=0 отключает
+прогрев.
+"""
+import os
+
+from .environment import (database_settings, env_bool, env_int, env_list,
+                          env_str, sqlite_performance_databases)
+from .settings import *  # noqa: F401,F403
+from .settings import ALLOWED_HOSTS, BASE_DIR, TEMPLATES
+from .template_cache import cached_templates
+
+SECRET_KEY = env_str(os.environ, 'DJANGO_SECRET_KEY')
+
+DEBUG = env_bool(os.environ, 'DJANGO_DEBUG')
+
+ALLOWED_HOSTS = env_list(os.environ, 'DJANGO_ALLOWED_HOSTS', ALLOWED_HOSTS)
+
+DATABASES = {'default': database_settings(os.environ, BASE_DIR)}
+
+use_sqlite = DATABASES['default']['ENGINE'].endswith('sqlite3')
+
+if use_sqlite and env_bool(os.environ, 'SQLITE_PERFORMANCE'):
+    DATABASES = sqlite_performance_databases(
+        os.environ, DATABASES['default']
+    )
+    DATABASE_ROUTERS = ['yanote.routers.ReadWriteRouter']
+
+# Таблица FTS5 есть только в SQLite, на PostgreSQL поиск идёт без индекса.
+NOTES_SEARCH_BACKEND = env_str(
+    os.environ,
+    'NOTES_SEARCH_BACKEND',
+    'notes.search.SQLiteFTSBackend'
+    if use_sqlite else 'notes.search.IcontainsBackend',
+)
+
+if env_str(os.environ, 'DJANGO_CACHE_BACKEND', ''):
+    CACHES = {
+        'default': {
+            'BACKEND': env_str(os.environ, 'DJANGO_CACHE_BACKEND'),
+            'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', ''),
+        }
+    }
+
+if env_bool(os.environ, 'CACHED_AUTH'):
+    SESSION_ENGINE = env_str(
+        os.environ,
+        'SESSION_ENGINE',
+        'django.contrib.sessions.backends.cached_db',
+    )
+    # ModelBackend остаётся для сессий, открытых до включения кеша.
+    AUTHENTICATION_BACKENDS = [
+        'yanote.auth.CachedModelBackend',
+        'django.contrib.auth.backends.ModelBackend',
+    ]
+
+AUTH_USER_CACHE_TIMEOUT = env_int(os.environ, 'AUTH_USER_CACHE_TIMEOUT', 300)
+
+# Кеш заметок по slug включается по умолчанию только с общим кешем.
+NOTES_CACHE_ALIAS = env_str(
+    os.environ,
+    'NOTES_CACHE_ALIAS',
+    'default' if env_str(os.environ, 'DJANGO_CACHE_BACKEND', '') else '',
+) or None
+
+NOTES_CACHE_SIZE = env_int(
+    os.environ, 'NOTES_CACHE_SIZE', 1000 if NOTES_CACHE_ALIAS else 0
+)
+
+TEMPLATES = cached_templates(TEMPLATES)
+
+TEMPLATE_WARMUP = env_bool(os.environ, 'TEMPLATE_WARMUP', True)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {'console': {'class': 'logging.StreamHandler'}},
+    'loggers': {
+        'yanote': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
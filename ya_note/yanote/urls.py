@@ -3,9 +3,20 @@ from django.contrib.auth import views as auth_views
 from django.contrib.auth.forms import UserCreationForm
 from django.urls import include, path
 from django.views.generic import CreateView
+from yanote import profiling
 
 urlpatterns = [
     path('', include('notes.urls')),
+    path(
+        'admin/profiling/',
+        profiling.report_page,
+        name='query_profiling',
+    ),
+    path(
+        'admin/profiling/json/',
+        profiling.report_json,
+        name='query_profiling_json',
+    ),
     path('admin/', admin.site.urls),
 ]
 